@@ -1,3 +1,15 @@
-from delfino.execution import run
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["run"]
+if TYPE_CHECKING:
+    from delfino.execution import gather_runs, run, run_async, run_chunked
+
+__all__ = ["gather_runs", "run", "run_async", "run_chunked"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use so that importing any ``delfino`` module doesn't import ``execution`` too
+    if name in __all__:
+        from delfino import execution  # noqa: PLC0415
+
+        return getattr(execution, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,84 @@
+import os
+import tempfile
+from logging import getLogger
+from pathlib import Path
+from typing import IO, Final
+
+_LOG = getLogger(__name__)
+
+HEAD_SIZE: Final[int] = 16 * 1024
+"""Number of bytes kept in memory from the beginning of the output."""
+
+TAIL_SIZE: Final[int] = 64 * 1024
+"""Number of bytes kept in memory from the end of the output."""
+
+
+class BoundedOutput:
+    """Output of a process of which only the beginning and the end are kept in memory.
+
+    Once the output doesn't fit into ``head_size + tail_size`` bytes, all of it, including what
+    was already written, is spilled into a log file, which can be kept for inspection after the process
+    finishes. The memory used never exceeds ``head_size + 2 * tail_size`` bytes, regardless of how much
+    the process writes.
+    """
+
+    def __init__(self, name: str, head_size: int = HEAD_SIZE, tail_size: int = TAIL_SIZE):
+        self.name = name
+        self.size = 0
+        self._head_size = head_size
+        self._tail_size = tail_size
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill: IO[bytes] | None = None
+
+    @property
+    def log_file(self) -> Path | None:
+        """File with the full output, if it didn't fit into memory."""
+        return Path(self._spill.name) if self._spill is not None else None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if (missing := self._head_size - len(self._head)) > 0:
+            self._head += chunk[:missing]
+            chunk = chunk[missing:]
+        self._tail += chunk
+
+        if self._spill is not None:
+            self._spill.write(chunk)
+        elif len(self._tail) > self._tail_size:
+            self._spill = tempfile.NamedTemporaryFile(  # pylint: disable=consider-using-with
+                prefix=f"delfino-{self.name}-", suffix=".log", delete=False
+            )
+            self._spill.write(self._head)
+            self._spill.write(self._tail)
+
+        # Trimming only once the tail doubles keeps the amortized cost of each write constant
+        if self._spill is not None and len(self._tail) > 2 * self._tail_size:
+            del self._tail[: -self._tail_size]
+
+    def close(self, keep_log_file: bool = False) -> None:
+        """Closes the log file and removes it, unless ``keep_log_file`` because an error message points to it."""
+        if self._spill is None:
+            return
+
+        self._spill.close()
+        if not keep_log_file:
+            try:
+                os.unlink(self._spill.name)
+            except OSError as exc:
+                _LOG.debug(f"Failed to remove the log file '{self._spill.name}': {exc}")
+
+    def getvalue(self, keep_log_file: bool = False) -> bytes:
+        """The whole output if it fit into memory, otherwise its head and tail.
+
+        The omitted middle is replaced by a marker, which points to the log file only if ``keep_log_file``,
+        which should be the same as passed to ``close``.
+        """
+        if self._spill is None:
+            return bytes(self._head + self._tail)
+
+        tail = self._tail[-self._tail_size :]
+        omitted = self.size - len(self._head) - len(tail)
+        location = f", full output in '{self._spill.name}'" if keep_log_file else ""
+        marker = f"\n[... {omitted} bytes omitted{location} ...]\n"
+        return bytes(self._head) + marker.encode() + bytes(tail)
@@ -0,0 +1,35 @@
+import importlib
+from typing import Final, NamedTuple
+
+import click
+
+
+class BuiltInCommand(NamedTuple):
+    path: str
+    """Module and attribute of the command, imported only when the command is executed."""
+
+    short_help: str
+    """Same as ``short_help`` of the command, shown in help and completion without importing it."""
+
+
+BUILT_IN_COMMANDS: Final[dict[str, BuiltInCommand]] = {
+    "daemon": BuiltInCommand(
+        "delfino.daemon:daemon_command", "Manage a daemon keeping commands loaded to start them faster."
+    ),
+    "merge-reports": BuiltInCommand(
+        "delfino.run_report:merge_reports_command", "Merge run reports of shards into one report."
+    ),
+    "stats": BuiltInCommand(
+        "delfino.history:stats_command", "Show durations, failure and cache hit rates of commands."
+    ),
+    "worker": BuiltInCommand("delfino.worker:worker_command", "Run programs sent by remote executors."),
+}
+"""Commands of delfino itself, which need neither the config nor plugins, by their name on the command line.
+
+Commands of the project or plugins with the same name take precedence.
+"""
+
+
+def load_built_in_command(name: str) -> click.Command:
+    module_name, _, attribute = BUILT_IN_COMMANDS[name].path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
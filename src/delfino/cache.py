@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+from delfino.constants import STATE_FOLDER
+
+_LOG = getLogger(__name__)
+
+FileStamp = list[int] | None
+"""Modification time in nanoseconds and size of a file or ``None`` if the file doesn't exist."""
+
+
+def state_folder(project_root: Path) -> Path:
+    return project_root / STATE_FOLDER
+
+
+def file_stamp(path: Path) -> FileStamp:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def folder_stamps(folder: Path, suffix: str = ".py") -> dict[str, FileStamp]:
+    """Stamps of the folder itself and all files with given suffix directly in it.
+
+    Stamp of the folder changes when files are added or removed. Stamps of the files
+    change when the files are modified.
+    """
+    stamps: dict[str, FileStamp] = {str(folder): file_stamp(folder)}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(suffix) and entry.is_file():
+                    stamps[entry.path] = file_stamp(Path(entry.path))
+    except OSError:
+        pass
+    return stamps
+
+
+def import_path_stamps(project_root: Path) -> dict[str, FileStamp]:
+    """Stamps of folders on ``sys.path``, which change when packages are installed or removed, and of Delfino itself.
+
+    The project root and the current working directory are left out. They change whenever any file is added
+    to or removed from them, while commands imported from them are stamped by their own modules.
+    """
+    ignored = {os.path.realpath(project_root), os.path.realpath(os.getcwd())}
+    stamps = folder_stamps(Path(__file__).parent)
+    for entry in sys.path:
+        if entry and os.path.realpath(entry) not in ignored:
+            stamps[entry] = file_stamp(Path(entry))
+    return stamps
+
+
+def stamps_are_current(stamps: dict[str, FileStamp]) -> bool:
+    return all(file_stamp(Path(path)) == stamp for path, stamp in stamps.items())
+
+
+def digest(*parts: Any) -> str:
+    """Stable hash of JSON-like objects. Objects not serializable to JSON are hashed by their ``str``."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def read_json(path: Path) -> Any | None:
+    """Reads a JSON cache file. Missing or corrupted files are treated as a cache miss."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def make_folder(folder: Path) -> None:
+    """Creates a folder in the state folder, including a ``.gitignore`` file to keep it out of version control."""
+    folder.mkdir(parents=True, exist_ok=True)
+    if not (gitignore := folder / ".gitignore").exists():
+        gitignore.write_text("*\n", encoding="utf-8")
+
+
+def write_atomically(path: Path, content: bytes) -> None:
+    """Writes cached content without ever exposing a partially written file to concurrent readers.
+
+    Failures are only logged as the cache is always optional. The state folder is created
+    on the first write.
+    """
+    try:
+        make_folder(path.parent)
+
+        file_descriptor, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(content)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError as exc:
+        _LOG.debug(f"Failed to write cache file '{path}': {exc}")
+
+
+def write_json(path: Path, data: Any) -> None:
+    write_atomically(path, json.dumps(data, separators=(",", ":")).encode())
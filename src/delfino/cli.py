@@ -0,0 +1,43 @@
+import os
+import sys
+from pathlib import Path
+
+from delfino import startup_profile
+
+
+def _complete_var() -> str:
+    """Same environment variable name ``click`` uses to request shell completion."""
+    prog_name = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else "delfino"
+    return f"_{prog_name}_COMPLETE".replace("-", "_").replace(".", "_").upper()
+
+
+def main() -> None:
+    """Entry point of the ``delfino`` executable.
+
+    Shell completion is answered from the completion manifest, if it is up-to-date. It avoids
+    loading the config and plugins on every key press. Commands are forwarded to the daemon of the
+    project, if it is running. Everything else is handled by the main command.
+    """
+    instruction = os.environ.get(_complete_var())
+    if profiling := not instruction and startup_profile.requested(sys.argv[1:]):
+        startup_profile.start()
+
+    # Imported only here to be included in the startup profile
+    from delfino.completion_manifest import complete_from_manifest  # noqa: PLC0415
+
+    if instruction and complete_from_manifest(instruction, Path(os.getcwd())):
+        sys.exit(0)
+
+    # The profile would show only the startup of the client and the daemon shouldn't be managed from inside of itself
+    if not instruction and not profiling and sys.argv[1:2] != ["daemon"]:
+        from delfino.daemon import run_in_daemon  # noqa: PLC0415
+
+        if (exit_code := run_in_daemon(sys.argv, Path(os.getcwd()))) is not None:
+            sys.exit(exit_code)
+
+    from delfino.main import main as main_command  # noqa: PLC0415
+
+    try:
+        main_command()
+    finally:
+        startup_profile.stop()
@@ -0,0 +1,102 @@
+import os
+import subprocess
+from collections.abc import Iterable
+from fnmatch import fnmatch
+from logging import getLogger
+from typing import Final
+
+import click
+
+_LOG = getLogger(__name__)
+
+_SINCE_META_KEY: Final[str] = "delfino.changed_since"
+_CHANGED_FILES_META_KEY: Final[str] = "delfino.changed_files"
+DEFAULT_REF: Final[str] = "HEAD"
+
+
+def enable_changed_files_mode(ctx: click.Context, since: str | None = None) -> None:
+    """Restricts ``files_folders`` to changed files for the whole invocation, including commands invoked from groups.
+
+    Args:
+        ctx: Any context of the invocation.
+        since: Git reference to compare to. Files changed since the last commit are used if not given.
+            An explicit reference takes precedence regardless of the order of the command line options.
+    """
+    if since is None:
+        ctx.meta.setdefault(_SINCE_META_KEY, DEFAULT_REF)
+        return
+
+    ctx.meta[_SINCE_META_KEY] = since
+    ctx.meta.pop(_CHANGED_FILES_META_KEY, None)
+
+
+def _git(*args: str) -> list[str]:
+    try:
+        result = subprocess.run(["git", *args], capture_output=True, check=True)
+    except FileNotFoundError as exc:
+        raise click.UsageError("Listing changed files requires 'git' to be installed.") from exc
+    except subprocess.CalledProcessError as exc:
+        raise click.UsageError(f"Failed to list changed files: {exc.stderr.decode().strip()}") from exc
+    return [path for path in result.stdout.decode().split("\0") if path]
+
+
+def _list_changed_files(ref: str) -> frozenset[str]:
+    """Existing files changed since the common ancestor of ``ref`` and ``HEAD``, including untracked ones.
+
+    Paths are relative to the current working directory, the same as paths in ``files_folders``.
+    """
+    merge_base = _git("merge-base", ref, "HEAD")[0].strip() if ref != DEFAULT_REF else DEFAULT_REF
+    changed = _git("diff", "--name-only", "--relative", "-z", merge_base, "--")
+    untracked = _git("ls-files", "--others", "--exclude-standard", "-z")
+    return frozenset(os.path.normpath(path) for path in (*changed, *untracked) if os.path.isfile(path))
+
+
+def get_changed_since(ctx: click.Context) -> str | None:
+    """Git reference the changed files are compared to, or ``None`` if not in the changed-files-only mode."""
+    return ctx.meta.get(_SINCE_META_KEY)
+
+
+def get_changed_files(ctx: click.Context) -> frozenset[str] | None:
+    """Files changed in the changed-files-only mode, listed once per invocation, or ``None`` if not in this mode."""
+    if (ref := ctx.meta.get(_SINCE_META_KEY)) is None:
+        return None
+
+    if (changed_files := ctx.meta.get(_CHANGED_FILES_META_KEY)) is None:
+        changed_files = ctx.meta[_CHANGED_FILES_META_KEY] = _list_changed_files(ref)
+        _LOG.debug(f"{len(changed_files)} files changed since '{ref}'.")
+
+    return changed_files
+
+
+def restrict_to_changed(
+    files_folders: Iterable[str], changed_files: Iterable[str], suffixes: Iterable[str] = ()
+) -> tuple[str, ...]:
+    """Changed files under any of ``files_folders``, or all changed files if ``files_folders`` are empty.
+
+    Files in folders are also restricted to those with one of the ``suffixes``, if any are given.
+    """
+    prefixes = [os.path.normpath(path) for path in files_folders] or [os.curdir]
+    suffixes = tuple(suffixes)
+    return tuple(
+        sorted(
+            path
+            for path in changed_files
+            if path in prefixes
+            or (
+                (not suffixes or os.path.splitext(path)[1] in suffixes)
+                and any(prefix == os.curdir or path.startswith(prefix + os.sep) for prefix in prefixes)
+            )
+        )
+    )
+
+
+def any_changed(patterns: Iterable[str], changed_files: Iterable[str]) -> bool:
+    """Whether any of the changed files is in a folder or matches a glob pattern from ``patterns``.
+
+    Example:
+        ``["clients", "*.ts"]`` matches ``clients/app/main.py`` and ``server/api.ts``.
+    """
+    patterns = [os.path.normpath(pattern) for pattern in patterns]
+    return bool(restrict_to_changed(patterns, changed_files)) or any(
+        fnmatch(path, pattern) for path in changed_files for pattern in patterns
+    )
@@ -1,16 +1,28 @@
 import logging
+import time
 from collections.abc import Iterable, Iterator, Mapping
-from dataclasses import dataclass
-from functools import partial
-from importlib import import_module, resources
-from importlib.metadata import distributions
+from dataclasses import dataclass, field
+from functools import cached_property, partial
+from importlib import import_module
 from importlib.resources import Package
+from importlib.util import find_spec
 from pathlib import Path
+from types import ModuleType
 from typing import cast
 
 import click
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
+from delfino import startup_profile
+from delfino.cache import FileStamp, folder_stamps
+from delfino.click_utils.plugin_index import PluginIndex
+from delfino.click_utils.registry_snapshot import (
+    RegistrySnapshot,
+    SnapshotCommand,
+    SnapshotPackage,
+    snapshot_key,
+)
+from delfino.click_utils.static_inspection import StaticInspectionError, inspect_module
 from delfino.constants import DEFAULT_LOCAL_COMMAND_FOLDERS, PYPROJECT_TOML_FILENAME
 from delfino.models.pyproject_toml import PluginConfig
 
@@ -55,28 +67,108 @@ class _CommandPackage(BaseModel):
         assert isinstance(self.package.__file__, str)
         return Path(self.package.__file__).parent
 
+    @property
+    def location(self) -> Path | None:
+        """Folder the commands are loaded from, which may differ from ``module_root_dir`` for local packages.
+
+        Local packages are looked up without importing them.
+        """
+        if not isinstance(self.package, str):
+            return self.module_root_dir
+        try:
+            spec = find_spec(self.package)
+        except (ImportError, ValueError):
+            return None
+        if spec is None or not spec.submodule_search_locations:
+            return None
+        return Path(next(iter(spec.submodule_search_locations)))
+
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
 @dataclass(frozen=True)
 class _Command:
+    """A discovered command, which may not have been imported yet.
+
+    The ``help``, ``short_help``, ``hidden`` and ``deprecated`` attributes mirror the
+    ``click.Command`` attributes of the same name to list commands without importing them.
+    ``sub_commands`` holds function names of direct sub-commands of a group.
+    """
+
     name: str
     func_name: str
-    command: click.Command
     package: _CommandPackage
+    module_name: str
+    help: str | None = None
+    short_help: str | None = None
+    hidden: bool = False
+    deprecated: bool | str = False
+    sub_commands: tuple[str, ...] = ()
+    loaded_command: click.Command | None = field(default=None, repr=False, compare=False)
 
+    @classmethod
+    def from_click_command(
+        cls, command: click.Command, func_name: str, package: _CommandPackage, module_name: str
+    ) -> "_Command":
+        assert command.name is not None
+        return cls(
+            name=command.name,
+            func_name=func_name,
+            package=package,
+            module_name=module_name,
+            help=command.help,
+            short_help=command.short_help,
+            hidden=command.hidden,
+            deprecated=command.deprecated,
+            sub_commands=tuple(
+                sub_command.callback.__name__
+                for sub_command in getattr(command, "commands", {}).values()
+                if sub_command.callback
+            ),
+            loaded_command=command,
+        )
+
+    @cached_property
+    def command(self) -> click.Command:
+        """The command itself. Its module is imported on the first access."""
+        if self.loaded_command is not None:
+            return self.loaded_command
+
+        command = getattr(import_module(self.module_name), self.func_name)
+        if not isinstance(command, click.Command):
+            raise TypeError(f"'{self.module_name}.{self.func_name}' was expected to be a click command.")
+        return command
 
-def find_commands(command_package: _CommandPackage) -> list[_Command]:
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded_command is not None or "command" in self.__dict__
+
+    @property
+    def summary(self) -> click.Command:
+        """The command if already loaded, otherwise a stand-in with the same help texts."""
+        if self.is_loaded:
+            return self.command
+        return click.Command(
+            self.name, help=self.help, short_help=self.short_help, hidden=self.hidden, deprecated=self.deprecated
+        )
+
+
+def find_commands(command_package: _CommandPackage, lazy: bool = False) -> list[_Command]:
     """Finds all instances of ``click.Command`` in given module.
 
     Does not traverse modules recursively. Plugins must point to the correct module via the entry point.
+
+    Args:
+        command_package: Package to search.
+        lazy: If ``True``, modules are inspected without importing them when possible. Commands
+            are then imported only when accessed.
     """
+    if (location := command_package.location) is None:
+        return []
+
     try:
-        files = [
-            path.name
-            for path in resources.files(command_package.package).iterdir()  # pylint: disable=no-member
-        ]
-    except ModuleNotFoundError:
+        files = [path.name for path in location.iterdir()]
+    except OSError:
         return []
 
     commands: list[_Command] = []
@@ -84,10 +176,33 @@ def find_commands(command_package: _CommandPackage) -> list[_Command]:
     for filename in files:
         if not filename.endswith(".py") or (filename.startswith("_") and filename != "__init__.py"):
             continue
-        module = import_module(f"{command_package.module_name}.{filename[:-3]}")
+        module_name = f"{command_package.module_name}.{filename[:-3]}"
+
+        if lazy:
+            try:
+                commands.extend(
+                    _Command(
+                        name=command.name,
+                        func_name=command.func_name,
+                        package=command_package,
+                        module_name=module_name,
+                        help=command.help,
+                        short_help=command.short_help,
+                        hidden=command.hidden,
+                        deprecated=command.deprecated,
+                        sub_commands=command.sub_commands,
+                    )
+                    for command in inspect_module(location / filename)
+                )
+                continue
+            except StaticInspectionError as exc:
+                _LOG.debug(f"Importing '{module_name}' to find commands in it. {exc}")
+
+        with startup_profile.measure("command", module_name):
+            module = import_module(module_name)
 
         commands.extend(
-            _Command(name=obj.name, func_name=obj_name, command=obj, package=command_package)
+            _Command.from_click_command(obj, obj_name, command_package, module_name)
             for obj_name, obj in vars(module).items()
             if not obj_name.startswith("_") and isinstance(obj, click.Command) and obj.name is not None
         )
@@ -113,9 +228,18 @@ class CommandRegistry(Mapping):
 
     The error will be raised only when a command is from plugins. Local commands can
     always override existing commands.
+
+    If ``snapshot_file`` is given, the result of the default commands discovery is stored
+    in it and restored on the next instantiation, as long as the config, versions of the
+    configured plugins and the content of the command folders have not changed.
+
+    If ``lazy``, command modules are not imported until a command is accessed, as long as
+    they can be inspected statically.
+
+    Installed plugins are looked up in the ``plugin_index``. If not given, a new index is built.
     """
 
-    TYPE_OF_PLUGIN = "delfino.plugin"
+    TYPE_OF_PLUGIN = PluginIndex.GROUP
     LOCAL_PLUGIN_NAME = "local"
 
     def __init__(
@@ -123,15 +247,34 @@ class CommandRegistry(Mapping):
         plugins_configs: dict[str, PluginConfig],
         command_packages: list[_CommandPackage] | None = None,
         local_command_folders: Iterable[Path] = DEFAULT_LOCAL_COMMAND_FOLDERS,
+        snapshot_file: Path | None = None,
+        lazy: bool = False,
+        plugin_index: PluginIndex | None = None,
     ):
-        if command_packages is None:
-            self._command_packages = self._default_command_packages(plugins_configs, local_command_folders)
-        else:
-            self._command_packages = command_packages
         self._visible_commands: dict[str, _Command] = {}
         self._hidden_commands: dict[str, _Command] = {}
+        self._warnings: list[str] = []
+        self._plugins_configs = plugins_configs
+        self._lazy = lazy
+
+        if command_packages is not None:
+            self._command_packages = command_packages
+            self._register_packages()
+            return
+
+        if plugin_index is None:
+            plugin_index = PluginIndex.build()
+
+        key = snapshot_key(plugins_configs, local_command_folders, plugin_index) if snapshot_file else ""
+        if snapshot_file and (snapshot := RegistrySnapshot.load(snapshot_file, key)) and self._restore(snapshot):
+            return
+
+        self._command_packages = self._default_command_packages(plugins_configs, local_command_folders, plugin_index)
         self._register_packages()
 
+        if snapshot_file:
+            self._snapshot(key).save(snapshot_file)
+
     def __len__(self) -> int:
         return len(self._visible_commands)
 
@@ -154,11 +297,12 @@ class CommandRegistry(Mapping):
         cls,
         plugins_configs: dict[str, PluginConfig],
         local_command_folders: Iterable[Path],
+        plugin_index: PluginIndex,
     ) -> list[_CommandPackage]:
         # This is a function to lazy load packages in tests. They may not exist on import of the code.
         return [
             # Lower priority - discovered installed packages
-            *cls._discover_command_packages(plugins_configs),
+            *cls._discover_command_packages(plugins_configs, plugin_index),
             # Higher priority - locally available packages
             *(
                 _CommandPackage(
@@ -171,41 +315,39 @@ class CommandRegistry(Mapping):
         ]
 
     @classmethod
-    def _discover_command_packages(cls, plugins_configs: dict[str, PluginConfig]) -> list[_CommandPackage]:
+    def _discover_command_packages(
+        cls, plugins_configs: dict[str, PluginConfig], plugin_index: PluginIndex | None = None
+    ) -> list[_CommandPackage]:
         """Discover packages from plugin. It is using package metadata as plugin discovering solution.
 
         Check the following URL about the plugin discovering solutions including the one uses package metadata.
         https://packaging.python.org/en/latest/guides/creating-and-discovering-plugins/
+
+        Only plugins present in the config are loaded, in the same order as they are defined in the config.
         """
-        # We want to keep loaded _CommandPackage instance in the same order as defined in the config
-        command_packages: dict[str, _CommandPackage | None] = {plugin_name: None for plugin_name in plugins_configs}
-        for distribution in distributions():
-            for entry_point in distribution.entry_points.select(group=cls.TYPE_OF_PLUGIN):
-                if not entry_point or distribution.metadata is None:
-                    continue
-
-                if (plugin_name := distribution.metadata["Name"]) not in command_packages:
-                    continue
-
-                command_packages[plugin_name] = _CommandPackage(
-                    plugin_name=plugin_name,
-                    package=entry_point.load(),
-                    plugin_config=plugins_configs.get(plugin_name, PluginConfig.empty()),
+        start = time.perf_counter()
+        if plugin_index is None:
+            plugin_index = PluginIndex.build()
+
+        command_packages = []
+        for plugin_name, plugin_config in plugins_configs.items():
+            with startup_profile.measure("plugin", plugin_name):
+                package = plugin_index.load_plugin(plugin_name)
+            if package is not None:
+                command_packages.append(
+                    _CommandPackage(plugin_name=plugin_name, package=package, plugin_config=plugin_config)
                 )
+            elif plugin_name != cls.LOCAL_PLUGIN_NAME:
+                _LOG.warning(f"Plugin '{plugin_name}' specified in config but no such plugin is installed.")
 
-        found_command_packages = []
-        for plugin_name, command_package in list(command_packages.items()):
-            if command_package is not None:
-                found_command_packages.append(command_package)
-            else:
-                if plugin_name != cls.LOCAL_PLUGIN_NAME:
-                    _LOG.warning(f"Plugin '{plugin_name}' specified in config but no such plugin is installed.")
-                command_packages.pop(plugin_name)
-
-        return found_command_packages
+        _LOG.debug(
+            f"Loaded {len(command_packages)} of {len(plugin_index.plugins)} installed plugins "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms."
+        )
+        return command_packages
 
-    @staticmethod
     def _filter_and_log_invalid_command_names(
+        self,
         plugin_name: str,
         available_command_names: set[str],
         group_name: str,
@@ -213,17 +355,18 @@ class CommandRegistry(Mapping):
     ) -> set[str]:
         missing_commands = group_command_names - available_command_names
         for command_name in missing_commands:
-            _LOG.warning(
+            self._warnings.append(
                 f"{group_name} command '{command_name}' from the '{plugin_name}' plugin "
                 "in config does not exist. This can be a typo in the command name or "
                 f"the command has been removed/renamed. Please update the '{PYPROJECT_TOML_FILENAME}' file."
             )
+            _LOG.warning(self._warnings[-1])
         return group_command_names - missing_commands if missing_commands else group_command_names
 
     def _register_packages(self):
         sub_commands: set[str] = set()
         for command_package in self._command_packages:
-            commands = {command.func_name: command for command in find_commands(command_package)}
+            commands = {command.func_name: command for command in find_commands(command_package, self._lazy)}
             available_command_names = {command.name for command in commands.values()}
 
             filter_and_log_invalid_command_names = partial(
@@ -246,8 +389,7 @@ class CommandRegistry(Mapping):
             for command_func_name, command in commands.items():
                 if command_func_name not in sub_commands:  # hide sub-commands
                     self._register(command, command.name in enabled_commands)
-                if hasattr(command.command, "commands"):
-                    sub_commands.update(command.callback.__name__ for command in command.command.commands.values())
+                sub_commands.update(command.sub_commands)
 
     def _register(self, command: _Command, enabled: bool):
         existing_command = self._visible_commands.pop(command.name, None) or self._hidden_commands.pop(
@@ -266,3 +408,98 @@ class CommandRegistry(Mapping):
             _LOG.debug(
                 f"Command '{command.name}' from the '{command.package.plugin_name}' plugin has been disabled in config."
             )
+
+    @property
+    def source_stamps(self) -> dict[str, FileStamp]:
+        """Stamps of all command folders and modules in them. They change when any command is modified."""
+        file_stamps = {}
+        for package in self._command_packages:
+            if (location := package.location) is not None:
+                file_stamps.update(folder_stamps(location))
+            else:
+                file_stamps.update(folder_stamps(package.module_root_dir))
+        return file_stamps
+
+    def _snapshot(self, key: str) -> RegistrySnapshot:
+        package_indexes = {id(package): index for index, package in enumerate(self._command_packages)}
+
+        return RegistrySnapshot(
+            key=key,
+            file_stamps=self.source_stamps,
+            packages=[
+                SnapshotPackage(
+                    plugin_name=package.plugin_name,
+                    module_name=package.module_name,
+                    is_local=isinstance(package.package, str),
+                )
+                for package in self._command_packages
+            ],
+            commands=[
+                SnapshotCommand(
+                    name=command.name,
+                    func_name=command.func_name,
+                    module_name=command.module_name,
+                    package_index=package_indexes[id(command.package)],
+                    visible=visible,
+                    help=command.help,
+                    short_help=command.short_help,
+                    hidden=command.hidden,
+                    deprecated=command.deprecated,
+                    sub_commands=list(command.sub_commands),
+                )
+                for visible, commands in ((True, self._visible_commands), (False, self._hidden_commands))
+                for command in commands.values()
+            ],
+            warnings=self._warnings,
+        )
+
+    @staticmethod
+    def _import_plugin(package: SnapshotPackage) -> ModuleType:
+        with startup_profile.measure("plugin", package.plugin_name):
+            return import_module(package.module_name)
+
+    def _restore(self, snapshot: RegistrySnapshot) -> bool:
+        """Rebuilds the registry from a snapshot.
+
+        Only modules which contain commands are imported, none of them if ``lazy``.
+
+        Returns:
+            ``False`` if the snapshot no longer matches the code, for example when the command
+            folders are not importable from the current working directory.
+        """
+        try:
+            command_packages = [
+                _CommandPackage(
+                    plugin_name=package.plugin_name,
+                    package=package.module_name if package.is_local else self._import_plugin(package),
+                    plugin_config=self._plugins_configs.get(package.plugin_name, PluginConfig.empty()),
+                )
+                for package in snapshot.packages
+            ]
+            for snapshot_command in snapshot.commands:
+                command = _Command(
+                    name=snapshot_command.name,
+                    func_name=snapshot_command.func_name,
+                    package=command_packages[snapshot_command.package_index],
+                    module_name=snapshot_command.module_name,
+                    help=snapshot_command.help,
+                    short_help=snapshot_command.short_help,
+                    hidden=snapshot_command.hidden,
+                    deprecated=snapshot_command.deprecated,
+                    sub_commands=tuple(snapshot_command.sub_commands),
+                )
+                if not self._lazy:
+                    _ = command.command
+                commands = self._visible_commands if snapshot_command.visible else self._hidden_commands
+                commands[snapshot_command.name] = command
+        except (ImportError, AttributeError, TypeError, IndexError) as exc:
+            _LOG.debug(f"Discovering commands again, cached registry is out of date: {exc}")
+            self._visible_commands.clear()
+            self._hidden_commands.clear()
+            return False
+
+        self._command_packages = command_packages
+        for warning in snapshot.warnings:
+            _LOG.warning(warning)
+
+        return True
@@ -1,16 +1,27 @@
+import os
 from collections import ChainMap
+from functools import partial
 from logging import getLogger
-from typing import cast
+from typing import Final, cast
 
 import click
 
+from delfino import run_report, tracing
+from delfino.click_utils.changed_files import any_changed, get_changed_files, get_changed_since
 from delfino.click_utils.command import get_root_command
+from delfino.click_utils.parallel import Invocation, fork_supported, invoke_in_parallel
 from delfino.decorators.files_folders import FILES_FOLDERS_OPTION_CALLBACK
+from delfino.decorators.jobs import FAST_FIRST_OPTION_CALLBACK, JOBS_OPTION_CALLBACK
 from delfino.decorators.pass_args import PASS_ARGS_CALLBACK
+from delfino.history import History
 from delfino.models.app_context import AppContext
+from delfino.sharding import commands_of_shard, get_shard, get_shard_durations, shards_files
 
 _LOG = getLogger(__name__)
 
+PATHS_OPTION: Final[str] = "paths"
+"""Config option of a command with folders or glob patterns it is affected by."""
+
 
 def get_command_groups(app_context: AppContext) -> dict[str, list[str]]:
     return {
@@ -30,31 +41,226 @@ def _get_target_command_names(group_name: str, app_context: AppContext) -> list[
     return target_command_names
 
 
-def execute_commands_group(group_name: str, click_context: click.Context, app_context: AppContext, **kwargs):
+def _get_jobs(click_context: click.Context, app_context: AppContext, jobs: int | None, members: int) -> int:
+    """Number of group members to run at once.
+
+    An explicit number of ``jobs`` has priority over the ``parallel`` setting of the group command in the config.
+    """
+    if jobs is None:
+        group_config = getattr(app_context.plugin_config, click_context.command.name or "", {})
+        parallel = group_config.get("parallel", False) if isinstance(group_config, dict) else False
+        jobs = (os.cpu_count() or 1) if parallel else 1
+
+    if jobs > 1 and not fork_supported():
+        _LOG.warning("Running commands in parallel is not supported on this platform. Running them one by one.")
+        return 1
+
+    return min(jobs, members)
+
+
+def _unaffected_by_changes(click_context: click.Context, app_context: AppContext, command_name: str) -> bool:
+    """Whether none of the ``paths`` of a command in its config changed, in the changed-files-only mode."""
+    command_config = getattr(app_context.plugin_config, command_name, {})
+    if not isinstance(command_config, dict) or not (paths := command_config.get(PATHS_OPTION)):
+        return False
+
+    if (changed_files := get_changed_files(click_context)) is None:
+        return False
+
+    patterns = [paths] if isinstance(paths, str) else paths
+    if any_changed(patterns, changed_files):
+        return False
+
+    _LOG.info(
+        f"Skipping command '{command_name}' because none of its paths ({', '.join(patterns)}) "
+        f"changed since '{get_changed_since(click_context)}'."
+    )
+    return True
+
+
+def _record_skipped(root_command: click.Group, command_name: str, status: str, reason: str) -> None:
+    get_plugin_name = getattr(root_command, "get_plugin_name", None)  # only the main command knows plugins
+    plugin = get_plugin_name(command_name) if get_plugin_name is not None else None
+    run_report.record_skipped(command_name, plugin, status, reason)
+
+
+def _skip_reason(
+    click_context: click.Context,
+    app_context: AppContext,
+    group_name: str,
+    command_name: str,
+    available_command_names: set[str],
+) -> tuple[str, str] | None:
+    """Status and reason to record for a command of a group which is not executed, or ``None`` to execute it."""
+    if command_name not in available_command_names:
+        _LOG.warning(f"Command '{command_name}' from the '{group_name}' command group does not exist. Skipping.")
+        return "skipped", "Command does not exist."
+
+    if command_name in app_context.plugin_config.disable_commands:
+        _LOG.debug(f"Skipping disabled command '{command_name}'.")
+        return "disabled", "Command is disabled in the config."
+
+    if _unaffected_by_changes(click_context, app_context, command_name):
+        return "skipped", "None of the paths of the command changed."
+
+    return None
+
+
+def _shard_command_names(
+    click_context: click.Context,
+    app_context: AppContext,
+    command_names: list[str],
+    available_command_names: set[str],
+) -> list[str] | None:
+    """Commands of the group to execute in the shard, or ``None`` if commands are not sharded.
+
+    The local history of each machine differs, so shards are balanced only by durations given to all of them.
+    """
+    if (shard := get_shard(click_context)) is None:
+        return None
+
+    candidates = [
+        name
+        for name in command_names
+        if name in available_command_names and name not in app_context.plugin_config.disable_commands
+    ]
+    return commands_of_shard(candidates, get_shard_durations(click_context), shard)
+
+
+def _typical_durations(app_context: AppContext, command_names: list[str]) -> dict[str, float]:
+    if not app_context.pyproject_toml.tool.delfino.history.enabled:
+        return {}
+
+    try:
+        return History.of_project(app_context.project_root).typical_durations(command_names)
+    except Exception as exc:  # pylint: disable=broad-except  # history is optional
+        _LOG.debug(f"Failed to read durations of commands from the history: {exc}")
+        return {}
+
+
+def _by_duration(app_context: AppContext, command_names: list[str], longest_first: bool) -> list[int]:
+    """Indexes of commands ordered by their typical duration in the history of the project.
+
+    Commands without any history keep their order and go first if ``longest_first``, as they may be slow.
+    Otherwise, they go last.
+    """
+    durations = _typical_durations(app_context, command_names)
+
+    def _key(index: int) -> float:
+        duration = durations.get(command_names[index], float("inf"))
+        return -duration if longest_first else duration
+
+    return sorted(range(len(command_names)), key=_key)
+
+
+def _traced(invocation: partial, group_name: str, command_name: str) -> Invocation:
+    """Records a span of the invocation in the trace, also when invoked in a worker process."""
+
+    def _invoke():
+        with tracing.span("group", command_name, group=group_name, params=invocation.keywords) as span_args:
+            result = invocation()
+            span_args["exit_code"] = 0
+            return result
+
+    return _invoke
+
+
+def _invoke_members(
+    group_name: str,
+    click_context: click.Context,
+    app_context: AppContext,
+    members: list[tuple[str, Invocation]],
+    jobs: int | None,
+    fast_first: bool,
+) -> None:
+    """Invokes members of a group one by one or in parallel processes. See ``execute_commands_group``."""
+    if fast_first:
+        order = _by_duration(app_context, [name for name, _ in members], longest_first=False)
+        members = [members[index] for index in order]
+    names, invocations = [name for name, _ in members], [invocation for _, invocation in members]
+
+    if (jobs := _get_jobs(click_context, app_context, jobs, len(invocations))) <= 1:
+        for invocation in invocations:
+            invocation()
+        return
+
+    start_order = None if fast_first else _by_duration(app_context, names, longest_first=True)
+    _LOG.debug(f"Running {len(invocations)} commands of the '{group_name}' command group in {jobs} processes.")
+    for outcome in invoke_in_parallel(invocations, jobs, names, start_order):
+        outcome.raise_for_failure()
+
+
+def execute_commands_group(
+    group_name: str,
+    click_context: click.Context,
+    app_context: AppContext,
+    jobs: int | None = None,
+    fast_first: bool = False,
+    **kwargs,
+):
+    """Invokes all commands of a command group, passing them ``kwargs`` and their options set in the config.
+
+    Args:
+        group_name: Name of the group in ``command_groups`` of the config.
+        click_context: Context of the command executing the group.
+        app_context: Application context.
+        jobs: How many commands to run in parallel worker processes. If not given, all CPUs are used
+            when the group command has ``parallel = true`` in its config. Otherwise, commands run one by one.
+            Commands running in parallel are started from the longest one, according to durations in the
+            history of previous runs, to keep all workers busy until the end.
+        fast_first: Whether to run and show commands from the fastest one, according to durations in the
+            history of previous runs, instead of the group order. Failures of fast commands show up sooner.
+        **kwargs: Parameters passed to each of the commands.
+
+    Raises:
+        click.exceptions.Exit: When a command fails. In parallel mode, all commands run to completion first
+            and the failure of the first failed command in group order is raised, the same as in sequential mode.
+    """
     target_command_names = _get_target_command_names(group_name, app_context)
     root_command = get_root_command(click_context)
-
-    commands: dict[str, click.Command] = {
-        command: cast(click.Command, root_command.get_command(click_context, command))
-        for command in root_command.list_commands(click_context)
-    }
+    available_command_names = set(root_command.list_commands(click_context))
+    shard_command_names = _shard_command_names(
+        click_context, app_context, target_command_names, available_command_names
+    )
+    members: list[tuple[str, Invocation]] = []
 
     for target_name in target_command_names:
-        if target_name not in commands:
-            _LOG.warning(f"Command '{target_name}' from the '{group_name}' command group does not exist. Skipping.")
+        if skipped := _skip_reason(click_context, app_context, group_name, target_name, available_command_names):
+            _record_skipped(root_command, target_name, *skipped)
             continue
 
-        if target_name in app_context.plugin_config.disable_commands:
-            _LOG.debug(f"Skipping disabled command '{target_name}'.")
+        # Commands running on files of each shard are resolved to find out whether they accept files
+        in_shard = shard_command_names is None or target_name in shard_command_names
+        if not in_shard and not shards_files(click_context):
+            _LOG.debug(f"Skipping command '{target_name}' running in another shard.")
             continue
 
-        command = commands[target_name]
+        # Resolving only the commands of the group avoids importing modules of other commands
+        command = cast(click.Command, root_command.get_command(click_context, target_name))
+        if not in_shard and not FILES_FOLDERS_OPTION_CALLBACK.accepted_by(command):
+            _LOG.debug(f"Skipping command '{target_name}' running in another shard.")
+            continue
+
+        files_folders, no_files_reason = FILES_FOLDERS_OPTION_CALLBACK.files_folders_in_group(click_context, command)
+        if no_files_reason is not None:
+            click.echo(f"{no_files_reason} '{target_name}' on. Skipping.", err=True)
+            _record_skipped(root_command, target_name, "skipped", f"{no_files_reason} the command on.")
+            continue
 
         parameter_from_config = ChainMap(
-            *(
-                callback.parameter_from_config_in_group(click_context, command)
-                for callback in [PASS_ARGS_CALLBACK, FILES_FOLDERS_OPTION_CALLBACK]
-            )
+            PASS_ARGS_CALLBACK.parameter_from_config_in_group(click_context, command), files_folders
         )
+        # Same as ``click_context.forward``, except for options controlling the group execution
+        group_params = {
+            name: value
+            for name, value in click_context.params.items()
+            if name not in kwargs
+            and name not in parameter_from_config
+            and name
+            not in {JOBS_OPTION_CALLBACK.command_argument_name, FAST_FIRST_OPTION_CALLBACK.command_argument_name}
+        }
+        # Options from the config take precedence over the ones passed to the group
+        member = partial(click_context.invoke, command, **{**group_params, **kwargs, **parameter_from_config})
+        members.append((target_name, _traced(member, group_name, target_name) if tracing.enabled() else member))
 
-        click_context.forward(command, **kwargs, **parameter_from_config)
+    _invoke_members(group_name, click_context, app_context, members, jobs, fast_first)
@@ -0,0 +1,144 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+from collections.abc import Sequence
+from typing import Final
+
+_CHUNK_SIZE: Final[int] = 64 * 1024
+_CLEAR_LINE: Final[str] = "\r\033[K"
+_STREAMS: Final[tuple[str, ...]] = ("stdout", "stderr")
+"""Names of the standard streams in ``sys``, in the order of their file descriptors from 1."""
+
+
+class CapturedOutput:
+    """Output of a single command, captured in temporary files instead of memory.
+
+    The files are created before the worker process is forked. The worker redirects its standard
+    output and error file descriptors into one file each, which captures output of subprocesses too.
+    The parent reads the files with ``os.pread`` so that it never moves the file offsets the worker writes at.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.finished = False
+        # pylint: disable-next=consider-using-with
+        self._files = {stream: tempfile.TemporaryFile() for stream in _STREAMS}
+        self._read_positions = dict.fromkeys(_STREAMS, 0)
+
+    def fileno(self, stream: str) -> int:
+        """File descriptor of the file capturing ``stdout`` or ``stderr``."""
+        return self._files[stream].fileno()
+
+    def redirect(self) -> None:
+        """Sends all output of the current process to the files. Meant to be called in the worker process."""
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for file_descriptor, stream in enumerate(_STREAMS, 1):
+            os.dup2(self.fileno(stream), file_descriptor)
+            # Python streams may have been replaced, for example when running in tests
+            writer = open(self.fileno(stream), "wb", closefd=False)  # noqa: SIM115
+            setattr(sys, stream, io.TextIOWrapper(writer, line_buffering=True))
+
+    def read_new(self) -> list[tuple[str, bytes]]:
+        """Chunks of output written to each stream since the last read, empty if there are none."""
+        chunks = []
+        for stream in _STREAMS:
+            if chunk := os.pread(self.fileno(stream), _CHUNK_SIZE, self._read_positions[stream]):
+                self._read_positions[stream] += len(chunk)
+                chunks.append((stream, chunk))
+        return chunks
+
+    def close(self) -> None:
+        for file in self._files.values():
+            file.close()
+
+
+class OutputMultiplexer:
+    """Shows output of commands running in parallel as if they ran one by one.
+
+    Output of each command is captured separately and replayed in the order of commands. Output
+    of the first unfinished command, the front one, is streamed live as it is written. Once it
+    finishes, the next command becomes the front one, starting with replaying what it has
+    written so far. If standard error is a terminal, a status line of the other commands is shown.
+
+    Standard output and error of commands are replayed to the same streams of this process, so they
+    can still be redirected separately. Their relative order is kept only as far as it is read in time.
+    """
+
+    def __init__(self, names: Sequence[str], live_status: bool | None = None):
+        self.outputs = [CapturedOutput(name) for name in names]
+        self._front = 0
+        self._started: set[int] = set()
+        self._live_status = sys.stderr.isatty() if live_status is None else live_status
+        self._shown_status = ""
+        self._at_line_start = True
+
+    def started(self, index: int) -> None:
+        self._started.add(index)
+
+    def finished(self, index: int) -> None:
+        self.outputs[index].finished = True
+
+    def _write(self, stream: str, chunk: bytes) -> None:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        target = getattr(sys, stream)
+        if (buffer := getattr(target, "buffer", None)) is not None:
+            buffer.write(chunk)
+            buffer.flush()
+        else:
+            target.write(chunk.decode(errors="replace"))
+            target.flush()
+        self._at_line_start = chunk.endswith(b"\n")
+
+    def _status(self) -> str:
+        running = [
+            output.name
+            for index, output in enumerate(self.outputs)
+            if index in self._started and index != self._front and not output.finished
+        ]
+        done = sum(output.finished for output in self.outputs)
+        if not running:
+            return ""
+        status = f"[{done}/{len(self.outputs)} done] Also running: {', '.join(running)}"
+        return status[: max(shutil.get_terminal_size().columns - 1, 0)]
+
+    def _clear_status(self) -> None:
+        if self._shown_status:
+            sys.stderr.write(_CLEAR_LINE)
+            sys.stderr.flush()
+            self._shown_status = ""
+
+    def _show_status(self) -> None:
+        status = self._status() if self._live_status and self._at_line_start else ""
+        if status != self._shown_status:
+            self._clear_status()
+            if status:
+                sys.stderr.write(status)
+                sys.stderr.flush()
+                self._shown_status = status
+
+    def pump(self) -> None:
+        """Writes all output available so far, in the order of commands."""
+        while self._front < len(self.outputs):
+            front = self.outputs[self._front]
+            finished = front.finished  # read before draining to not miss output written just before finishing
+            while chunks := front.read_new():
+                self._clear_status()
+                for stream, chunk in chunks:
+                    self._write(stream, chunk)
+            if not finished:
+                break
+            front.close()
+            self._front += 1
+
+        self._show_status()
+
+    def close(self) -> None:
+        """Writes all remaining output and releases the temporary files."""
+        for output in self.outputs:
+            output.finished = True
+        self.pump()
+        self._clear_status()
@@ -0,0 +1,133 @@
+import multiprocessing
+import sys
+import traceback
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from logging import getLogger
+from multiprocessing.connection import Connection, wait
+from typing import Any, Final, cast
+
+import click
+
+from delfino.click_utils.output_multiplexer import CapturedOutput, OutputMultiplexer
+
+_LOG = getLogger(__name__)
+
+_OUTPUT_INTERVAL: Final[float] = 0.1
+"""How often output of the front worker is streamed, in seconds."""
+
+Invocation = Callable[[], Any]
+
+
+@dataclass(frozen=True)
+class CommandOutcome:
+    """How a command invoked in a worker process ended."""
+
+    exit_code: int = 0
+    aborted: bool = False
+
+    def raise_for_failure(self) -> None:
+        """Re-raises the failure in the parent process the same way the command would if invoked directly."""
+        if self.aborted:
+            raise click.Abort()
+        if self.exit_code:
+            raise click.exceptions.Exit(self.exit_code)
+
+
+def _outcome_of(invocation: Invocation) -> CommandOutcome:
+    exit_code = 0
+    try:
+        invocation()
+    except click.exceptions.Exit as exc:
+        exit_code = exc.exit_code
+    except click.Abort:
+        return CommandOutcome(1, aborted=True)
+    except click.ClickException as exc:
+        exc.show()
+        exit_code = exc.exit_code
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            exit_code = exc.code or 0
+        else:
+            print(exc.code, file=sys.stderr)
+            exit_code = 1
+    except Exception:  # pylint: disable=broad-except  # the same would be printed if invoked directly
+        traceback.print_exc()
+        exit_code = 1
+    return CommandOutcome(exit_code)
+
+
+def _run_in_worker(invocation: Invocation, connection: Connection, output: CapturedOutput) -> None:
+    output.redirect()
+    outcome = _outcome_of(invocation)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    connection.send(outcome)
+    connection.close()
+
+
+def fork_supported() -> bool:
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def invoke_in_parallel(
+    invocations: Sequence[Invocation], jobs: int, names: Sequence[str], start_order: Sequence[int] | None = None
+) -> list[CommandOutcome]:
+    """Invokes each function in a forked worker process, running at most ``jobs`` processes at a time.
+
+    Forking lets the workers inherit the click context and loaded commands without pickling them.
+    All invocations run to completion, even if some of them fail. Output of the workers is shown
+    as if they ran one by one, see ``OutputMultiplexer``.
+
+    Args:
+        invocations: Functions to invoke.
+        jobs: Maximum number of worker processes.
+        names: Names of the invocations shown in the status line.
+        start_order: Indexes of ``invocations`` in the order to start them in. Output is still shown
+            in the order of ``invocations``. Defaults to the order of ``invocations``.
+
+    Returns:
+        Outcomes in the same order as ``invocations``.
+    """
+    mp_context = multiprocessing.get_context("fork")
+    outcomes: list[CommandOutcome] = [CommandOutcome()] * len(invocations)
+    pending = deque((index, invocations[index]) for index in (start_order or range(len(invocations))))
+    running: dict[int, tuple[int, Any, Connection]] = {}
+    multiplexer = OutputMultiplexer(names)
+
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                index, invocation = pending.popleft()
+                receiver, sender = mp_context.Pipe(duplex=False)
+                # Anything buffered would be written again by the worker
+                sys.stdout.flush()
+                sys.stderr.flush()
+                process = mp_context.Process(
+                    target=_run_in_worker, args=(invocation, sender, multiplexer.outputs[index])
+                )
+                process.start()
+                sender.close()
+                running[process.sentinel] = (index, process, receiver)
+                multiplexer.started(index)
+
+            for sentinel in wait(list(running), timeout=_OUTPUT_INTERVAL):
+                index, process, receiver = running.pop(cast(int, sentinel))
+                process.join()
+                try:
+                    outcomes[index] = receiver.recv() if receiver.poll() else CommandOutcome(process.exitcode or 1)
+                except EOFError:
+                    outcomes[index] = CommandOutcome(process.exitcode or 1)
+                receiver.close()
+                multiplexer.finished(index)
+
+            multiplexer.pump()
+    finally:
+        for _, process, receiver in running.values():
+            process.terminate()
+            process.join()
+            receiver.close()
+        multiplexer.close()
+
+    return outcomes
@@ -0,0 +1,66 @@
+import sys
+from importlib.metadata import EntryPoint, entry_points
+from pathlib import Path
+from typing import Any, ClassVar
+
+from pydantic import BaseModel, Field, ValidationError
+
+from delfino.cache import FileStamp, file_stamp, write_atomically
+
+
+class IndexedPlugin(BaseModel):
+    version: str
+    entry_point: str = Field(..., description="Value of the entry point, such as `package.commands`.")
+
+
+class PluginIndex(BaseModel):
+    """Installed delfino plugins by their distribution name.
+
+    Building the index requires reading metadata of all installed distributions. When cached,
+    it is rebuilt only when content of any folder on ``sys.path`` changes, which is the case
+    when a distribution is installed, upgraded or removed.
+    """
+
+    GROUP: ClassVar[str] = "delfino.plugin"
+
+    path_stamps: list[tuple[str, FileStamp]] = Field(default_factory=list)
+    plugins: dict[str, IndexedPlugin] = Field(default_factory=dict)
+
+    @staticmethod
+    def _current_path_stamps() -> list[tuple[str, FileStamp]]:
+        return [(path, file_stamp(Path(path))) for path in sys.path]
+
+    @classmethod
+    def build(cls) -> "PluginIndex":
+        plugins: dict[str, IndexedPlugin] = {}
+        for entry_point in entry_points(group=cls.GROUP):
+            if (distribution := entry_point.dist) is None or distribution.metadata is None:
+                continue
+            plugins[distribution.metadata["Name"]] = IndexedPlugin(
+                version=distribution.version, entry_point=entry_point.value
+            )
+
+        return cls(path_stamps=cls._current_path_stamps(), plugins=plugins)
+
+    @classmethod
+    def load(cls, cache_file: Path) -> "PluginIndex":
+        """Loads the index from the ``cache_file`` if it is up-to-date or builds and caches a new one."""
+        try:
+            index = cls.model_validate_json(cache_file.read_bytes())
+            if index.path_stamps == cls._current_path_stamps():
+                return index
+        except (OSError, ValidationError):
+            pass
+
+        index = cls.build()
+        write_atomically(cache_file, index.model_dump_json().encode())
+        return index
+
+    def version(self, plugin_name: str) -> str | None:
+        return plugin.version if (plugin := self.plugins.get(plugin_name)) else None
+
+    def load_plugin(self, plugin_name: str) -> Any | None:
+        """Imports the object the plugin entry point refers to, or returns ``None`` if the plugin is not installed."""
+        if (plugin := self.plugins.get(plugin_name)) is None:
+            return None
+        return EntryPoint(name=plugin_name, value=plugin.entry_point, group=self.GROUP).load()
@@ -0,0 +1,71 @@
+import sys
+from collections.abc import Iterable
+from pathlib import Path
+
+from pydantic import BaseModel, Field, ValidationError
+
+from delfino.cache import FileStamp, digest, stamps_are_current, write_atomically
+from delfino.click_utils.plugin_index import PluginIndex
+from delfino.models.pyproject_toml import PluginConfig
+
+_FORMAT_VERSION = 1
+
+
+class SnapshotPackage(BaseModel):
+    plugin_name: str
+    module_name: str
+    is_local: bool = Field(..., description="Local packages are referenced by a path, not an importable module.")
+
+
+class SnapshotCommand(BaseModel):
+    name: str
+    func_name: str
+    module_name: str = Field(..., description="Module the command has been found in.")
+    package_index: int = Field(..., description="Index of the owning package in `RegistrySnapshot.packages`.")
+    visible: bool
+    help: str | None = None
+    short_help: str | None = None
+    hidden: bool = False
+    deprecated: bool | str = False
+    sub_commands: list[str] = Field(default_factory=list, description="Function names of direct sub-commands.")
+
+
+class RegistrySnapshot(BaseModel):
+    """Result of commands discovery, which can be restored without scanning installed distributions."""
+
+    key: str
+    file_stamps: dict[str, FileStamp] = Field(
+        ..., description="Command folders and files the snapshot has been built from."
+    )
+    packages: list[SnapshotPackage]
+    commands: list[SnapshotCommand]
+    warnings: list[str] = Field(default_factory=list, description="Config warnings to repeat on restore.")
+
+    @classmethod
+    def load(cls, path: Path, key: str) -> "RegistrySnapshot | None":
+        """Returns a snapshot only if it has been built from the same inputs."""
+        try:
+            snapshot = cls.model_validate_json(path.read_bytes())
+        except (OSError, ValidationError):
+            return None
+
+        if snapshot.key != key or not stamps_are_current(snapshot.file_stamps):
+            return None
+
+        return snapshot
+
+    def save(self, path: Path) -> None:
+        write_atomically(path, self.model_dump_json().encode())
+
+
+def snapshot_key(
+    plugins_configs: dict[str, PluginConfig], local_command_folders: Iterable[Path], plugin_index: PluginIndex
+) -> str:
+    """Identifies inputs of the commands discovery, other than the content of command folders."""
+    return digest(
+        _FORMAT_VERSION,
+        sys.version_info[:2],
+        [(name, config.model_dump(mode="json")) for name, config in plugins_configs.items()],
+        [str(folder) for folder in local_command_folders],
+        {name: plugin_index.version(name) for name in plugins_configs},
+    )
@@ -0,0 +1,227 @@
+import ast
+import builtins
+import sys
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+_COMMAND_DECORATORS = frozenset({"command", "group"})
+_COMMAND_NAME_SUFFIXES = frozenset({"command", "cmd", "group", "grp"})
+_COMMAND_FREE_PACKAGES = frozenset({*sys.stdlib_module_names, "__future__", "click", "delfino"})
+"""Top-level packages whose public names can be imported without bringing in commands."""
+_COMMAND_FREE_VALUE_PACKAGES = frozenset({*sys.stdlib_module_names, "__future__"})
+"""Top-level packages whose functions and attributes never evaluate to commands."""
+_BLOCK_STATEMENTS = (
+    ast.If,
+    ast.Try,
+    *((ast.TryStar,) if sys.version_info >= (3, 11) else ()),
+    ast.With,
+    ast.AsyncWith,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.Match,
+)
+
+
+class StaticInspectionError(Exception):
+    """The module uses a construct which cannot be understood without importing it."""
+
+
+@dataclass(frozen=True)
+class StaticCommand:
+    """A ``click.Command`` found without importing the module it is defined in."""
+
+    func_name: str
+    name: str
+    help: str | None = None
+    short_help: str | None = None
+    hidden: bool = False
+    deprecated: bool | str = False
+    sub_commands: tuple[str, ...] = ()
+
+
+def _terminal_name(node: ast.expr) -> str | None:
+    while isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def _root(node: ast.expr) -> ast.expr:
+    """The object a chain of calls and attribute accesses starts from."""
+    while isinstance(node, ast.Call | ast.Attribute):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node
+
+
+def _constant(node: ast.expr, types: tuple[type, ...], what: str):
+    if isinstance(node, ast.Constant) and isinstance(node.value, types):
+        return node.value
+    raise StaticInspectionError(f"{what} is not a literal on line {node.lineno}.")
+
+
+def _default_command_name(func_name: str) -> str:
+    """Mirrors how ``click.command`` names commands."""
+    name = func_name.lower().replace("_", "-")
+    left, separator, suffix = name.rpartition("-")
+    return left if separator and suffix in _COMMAND_NAME_SUFFIXES else name
+
+
+def _is_type_checking_block(node: ast.stmt) -> bool:
+    """``if TYPE_CHECKING:`` without ``else``, which never runs."""
+    return isinstance(node, ast.If) and not node.orelse and _terminal_name(node.test) == "TYPE_CHECKING"
+
+
+class _ModuleInspector:
+    def __init__(self):
+        self.commands: dict[str, StaticCommand] = {}
+        self.groups: set[str] = set()
+        self.sub_commands: dict[str, list[str]] = {}
+        # Names bound to built-ins and standard library objects, which cannot produce commands
+        self.command_free_names: set[str] = set(dir(builtins))
+
+    def inspect(self, tree: ast.Module) -> list[StaticCommand]:
+        for node in tree.body:
+            if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef):
+                self.command_free_names.discard(node.name)
+                if not isinstance(node, ast.ClassDef):
+                    self._inspect_function(node)
+            elif isinstance(node, ast.Import):
+                self._inspect_plain_import(node)
+            elif isinstance(node, ast.ImportFrom):
+                self._inspect_import(node)
+            elif isinstance(node, ast.Assign | ast.AnnAssign | ast.AugAssign) and node.value is not None:
+                self._inspect_assignment(node)
+            elif isinstance(node, ast.Expr) and _terminal_name(node.value) == "add_command":
+                self._inspect_add_command(node.value)
+            elif isinstance(node, _BLOCK_STATEMENTS) and not _is_type_checking_block(node):
+                raise StaticInspectionError(f"Block which may define or import commands on line {node.lineno}.")
+
+        return [
+            replace(command, sub_commands=tuple(self.sub_commands.get(command.func_name, ())))
+            for command in self.commands.values()
+            if not command.func_name.startswith("_")
+        ]
+
+    def _inspect_plain_import(self, node: ast.Import):
+        for alias in node.names:
+            package = alias.name.partition(".")[0]
+            if package not in _COMMAND_FREE_PACKAGES:
+                raise StaticInspectionError(f"Import of a package which may create commands on line {node.lineno}.")
+            bound_name = alias.asname or package
+            if package in _COMMAND_FREE_VALUE_PACKAGES:
+                self.command_free_names.add(bound_name)
+            else:
+                self.command_free_names.discard(bound_name)
+
+    def _inspect_import(self, node: ast.ImportFrom):
+        bound_names = {alias.asname or alias.name for alias in node.names}
+        if node.level == 0 and (node.module or "").partition(".")[0] in _COMMAND_FREE_VALUE_PACKAGES:
+            self.command_free_names.update(bound_names)
+        else:
+            self.command_free_names.difference_update(bound_names)
+
+        # Commands imported from inspected modules in the same folder are found in these modules. Imports
+        # from other locations can bring in commands which would not be discovered otherwise.
+        public_names = [alias for alias in node.names if not (alias.asname or alias.name).startswith("_")]
+        if not public_names:
+            return
+        if node.level:
+            from_other_location = node.level > 1 or not node.module or "." in node.module or node.module.startswith("_")
+        else:
+            from_other_location = (node.module or "").partition(".")[0] not in _COMMAND_FREE_PACKAGES
+        if from_other_location or any(alias.name == "*" for alias in public_names):
+            raise StaticInspectionError(f"Import of possible commands on line {node.lineno}.")
+
+    def _inspect_assignment(self, node: ast.Assign | ast.AnnAssign | ast.AugAssign):
+        # Any call or attribute access may evaluate to a command, unless it starts from a built-in or the
+        # standard library. So does a name referring to a command found earlier.
+        assert node.value is not None
+        for child in ast.walk(node.value):
+            if isinstance(child, ast.Call | ast.Attribute):
+                root = _root(child)
+                if not isinstance(root, ast.Name) or root.id not in self.command_free_names:
+                    raise StaticInspectionError(f"Assignment which may create a command on line {node.lineno}.")
+            elif isinstance(child, ast.Name) and child.id in self.commands:
+                raise StaticInspectionError(f"Assignment of a command on line {node.lineno}.")
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        for target in targets:
+            for name in ast.walk(target):
+                if isinstance(name, ast.Name):
+                    self.command_free_names.discard(name.id)
+
+    def _inspect_add_command(self, node: ast.expr):
+        assert isinstance(node, ast.Call)
+        group = node.func.value if isinstance(node.func, ast.Attribute) else None
+        if (
+            not isinstance(group, ast.Name)
+            or group.id not in self.groups
+            or not node.args
+            or not isinstance(node.args[0], ast.Name)
+            or node.args[0].id not in self.commands
+        ):
+            raise StaticInspectionError(f"Sub-command added on line {node.lineno}.")
+        self.sub_commands.setdefault(group.id, []).append(node.args[0].id)
+
+    def _inspect_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef):
+        command_decorators = [
+            decorator for decorator in node.decorator_list if _terminal_name(decorator) in _COMMAND_DECORATORS
+        ]
+        if not command_decorators:
+            return  # a plain function
+        # The top-most command decorator is applied last and defines what the function name refers to
+        decorator = command_decorators[0]
+
+        parent: str | None = None
+        if isinstance(target := decorator.func if isinstance(decorator, ast.Call) else decorator, ast.Attribute):
+            if not isinstance(target.value, ast.Name):
+                raise StaticInspectionError(f"Unknown command decorator on line {decorator.lineno}.")
+            if target.value.id != "click":
+                if target.value.id not in self.groups:
+                    raise StaticInspectionError(f"Sub-command of an unknown group on line {decorator.lineno}.")
+                parent = target.value.id
+
+        attributes = self._decorator_attributes(decorator) if isinstance(decorator, ast.Call) else {}
+        if attributes.get("help") is None:
+            attributes["help"] = ast.get_docstring(node)
+
+        self.commands[node.name] = StaticCommand(
+            func_name=node.name, name=attributes.pop("name", None) or _default_command_name(node.name), **attributes
+        )
+        if _terminal_name(decorator) == "group":
+            self.groups.add(node.name)
+        if parent:
+            self.sub_commands.setdefault(parent, []).append(node.name)
+
+    @staticmethod
+    def _decorator_attributes(decorator: ast.Call) -> dict:
+        attributes = {}
+        if decorator.args:
+            attributes["name"] = _constant(decorator.args[0], (str,), "Command name")
+        for keyword in decorator.keywords:
+            if keyword.arg in {"name", "help", "short_help"}:
+                attributes[keyword.arg] = _constant(keyword.value, (str, type(None)), f"Argument '{keyword.arg}'")
+            elif keyword.arg == "hidden":
+                attributes["hidden"] = _constant(keyword.value, (bool,), "Argument 'hidden'")
+            elif keyword.arg == "deprecated":
+                attributes["deprecated"] = _constant(keyword.value, (bool, str), "Argument 'deprecated'")
+            elif keyword.arg is None or keyword.arg == "cls":
+                raise StaticInspectionError(f"Custom command definition on line {decorator.lineno}.")
+        return attributes
+
+
+def inspect_module(path: Path) -> list[StaticCommand]:
+    """Finds commands defined in a Python file without importing it.
+
+    Only commands defined by ``click`` decorators are understood. Any construct which may define
+    a command in a different way raises ``StaticInspectionError`` and the module should be imported.
+    """
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError, ValueError) as exc:
+        raise StaticInspectionError(str(exc)) from exc
+
+    return _ModuleInspector().inspect(tree)
@@ -0,0 +1,122 @@
+import cProfile
+import functools
+import inspect
+import os
+import re
+import sys
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Final, TypeVar, cast
+
+import click
+
+from delfino.cache import state_folder
+from delfino.constants import DEFAULT_PROFILE_TOP
+from delfino.models.app_context import AppContext
+
+_Func = TypeVar("_Func", bound=Callable[..., Any])
+
+_META_KEY: Final[str] = "delfino.profile"
+_PROFILES_FOLDER: Final[str] = "profiles"
+_WRAPPED_ATTRIBUTE: Final[str] = "__delfino_profile__"
+
+_ACTIVE_PROFILES: list[cProfile.Profile] = []
+"""Profiles of commands being executed, the innermost last. Only the innermost one is enabled."""
+
+
+@dataclass(frozen=True)
+class ProfileSettings:
+    top: int = DEFAULT_PROFILE_TOP
+    """Number of functions with the highest cumulative time to print."""
+
+    own_code_only: bool = False
+    """Whether to print only functions from the package of the command."""
+
+
+def enable_profiling(ctx: click.Context, **settings: Any) -> None:
+    """Profiles all commands of the invocation, including commands invoked from groups.
+
+    Args:
+        ctx: Any context of the invocation.
+        **settings: Fields of ``ProfileSettings`` to change.
+    """
+    ctx.meta[_META_KEY] = replace(ctx.meta.get(_META_KEY, ProfileSettings()), **settings)
+
+
+def get_profile_settings(ctx: click.Context) -> ProfileSettings | None:
+    """Settings of profiling, or ``None`` if commands are not profiled."""
+    return ctx.meta.get(_META_KEY)
+
+
+def _own_code(func: Callable) -> str | None:
+    """Folder of the top-level package of a function, or its file if the module is not in a package."""
+    module = sys.modules.get(inspect.unwrap(func).__module__.partition(".")[0])
+    if (file := getattr(module, "__file__", None)) is None:
+        return None
+    return os.path.dirname(file) if os.path.basename(file).startswith("__init__.") else file
+
+
+def _report(profile: cProfile.Profile, settings: ProfileSettings, command_name: str, own_code: str | None) -> None:
+    import pstats  # noqa: PLC0415
+
+    ctx = click.get_current_context()
+    project_root = app_context.project_root if (app_context := ctx.find_object(AppContext)) else Path.cwd()
+    path = state_folder(project_root) / _PROFILES_FOLDER / f"{command_name}.pstats"
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    stats = pstats.Stats(profile, stream=sys.stderr)
+    stats.dump_stats(path)
+
+    restrictions: list[str | int] = [re.escape(own_code)] if settings.own_code_only and own_code else []
+    scope = f" in '{own_code}'" if restrictions else ""
+    click.secho(
+        f"\nProfile of '{command_name}' saved to '{path}'. Top {settings.top} functions{scope} by cumulative time:",
+        bold=True,
+        err=True,
+    )
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(*restrictions, settings.top)
+    sys.stderr.flush()
+
+
+@contextmanager
+def _profiling(settings: ProfileSettings, command_name: str, func: Callable) -> Iterator[None]:
+    """Profiles the block, excluding it from the profile of the command invoking it, if any."""
+    profile = cProfile.Profile()
+    if _ACTIVE_PROFILES:
+        _ACTIVE_PROFILES[-1].disable()
+    _ACTIVE_PROFILES.append(profile)
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        _ACTIVE_PROFILES.pop()
+        if _ACTIVE_PROFILES:
+            _ACTIVE_PROFILES[-1].enable()
+        _report(profile, settings, command_name, _own_code(func))
+
+
+def profile_callback(func: _Func, command_name: str) -> _Func:
+    """Wraps a command callback to profile it, if profiling is enabled for the invocation."""
+
+    @functools.wraps(func)
+    def new_func(*args, **kwargs):
+        if (settings := get_profile_settings(click.get_current_context())) is None:
+            return func(*args, **kwargs)
+
+        with _profiling(settings, command_name, func):
+            return func(*args, **kwargs)
+
+    setattr(new_func, _WRAPPED_ATTRIBUTE, True)
+    return cast(_Func, new_func)
+
+
+def enable_command_profile(ctx: click.Context, command: click.Command, command_name: str) -> None:
+    """Profiles a command resolved in an invocation with profiling enabled, unless it is profiled already."""
+    if get_profile_settings(ctx) is None or command.callback is None:
+        return
+
+    if not getattr(command.callback, _WRAPPED_ATTRIBUTE, False):
+        command.callback = profile_callback(command.callback, command_name)
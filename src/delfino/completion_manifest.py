@@ -0,0 +1,244 @@
+import os
+import shlex
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from delfino.cache import FileStamp, import_path_stamps, read_json, stamps_are_current, state_folder, write_json
+
+if TYPE_CHECKING:
+    import click
+
+# This module must not import anything heavier than the standard library on the completion code path.
+
+_FORMAT_VERSION = 1
+
+Completion = tuple[str, str, str | None]
+"""Type of completion recognized by shells, the completed value and its help."""
+
+
+def manifest_path(project_root: Path) -> Path:
+    return state_folder(project_root) / "completion.json"
+
+
+def _option_entries(ctx: "click.Context", command: "click.Command") -> list[dict[str, Any]]:
+    return [
+        {
+            "opts": [*param.opts, *param.secondary_opts],
+            "help": getattr(param, "help", None),
+            "takes_value": not (getattr(param, "is_flag", False) or getattr(param, "count", False)),
+            "multiple": param.multiple,
+        }
+        for param in command.get_params(ctx)
+        if param.param_type_name == "option" and not getattr(param, "hidden", False)
+    ]
+
+
+def command_entry(ctx: "click.Context", command: "click.Command") -> dict[str, Any]:
+    return {
+        "options": _option_entries(ctx, command),
+        "has_arguments": any(param.param_type_name == "argument" for param in command.params),
+        "is_group": hasattr(command, "commands"),
+    }
+
+
+class CompletionManifest:
+    """Commands and options needed for shell completion, answerable without loading the config or any plugin.
+
+    Options of a command are recorded only once the command has been loaded. Until then,
+    completion of such command falls back to the full commands discovery.
+    """
+
+    def __init__(self, path: Path, data: dict[str, Any]):
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def create(
+        cls,
+        path: Path,
+        project_root: Path,
+        source_stamps: dict[str, FileStamp],
+        ctx: "click.Context",
+        command_helps: dict[str, str],
+    ) -> "CompletionManifest":
+        """Creates a manifest valid as long as none of the ``source_stamps`` nor the Python environment change.
+
+        Args:
+            path: Where the manifest is saved.
+            project_root: Root of the project, which is not watched for changes as a whole.
+            source_stamps: Stamps of config files and command modules the completion depends on.
+            ctx: Context of the main command.
+            command_helps: Short help of each command offered by completion.
+        """
+        stamps = {**source_stamps, **import_path_stamps(project_root)}
+        return cls(
+            path,
+            {
+                "version": _FORMAT_VERSION,
+                "executable": os.path.realpath(sys.executable),
+                "stamps": stamps,
+                "options": _option_entries(ctx, ctx.command),
+                "commands": {name: {"help": help_text} for name, help_text in command_helps.items()},
+            },
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CompletionManifest | None":
+        """Returns the manifest only if it is still up-to-date."""
+        if not isinstance(data := read_json(path), dict):
+            return None
+        if data.get("version") != _FORMAT_VERSION or data.get("executable") != os.path.realpath(sys.executable):
+            return None
+        if not stamps_are_current(data.get("stamps", {})):
+            return None
+        return cls(path, data)
+
+    def save(self) -> None:
+        write_json(self.path, self.data)
+
+    def lacks_options(self, name: str) -> bool:
+        """Whether the command is offered by completion but its options are not known yet."""
+        return name in self.data["commands"] and "options" not in self.data["commands"][name]
+
+    def add_command(self, ctx: "click.Context", name: str, command: "click.Command") -> None:
+        if name in self.data["commands"]:
+            self.data["commands"][name].update(command_entry(ctx, command))
+
+    @staticmethod
+    def _find_option(options: list[dict[str, Any]], arg: str) -> dict[str, Any] | None:
+        return next((option for option in options if arg in option["opts"]), None)
+
+    @staticmethod
+    def _complete_options(options: list[dict[str, Any]], used: list[dict[str, Any]], incomplete: str):
+        return [
+            ("plain", name, option["help"])
+            for option in options
+            if option["multiple"] or option not in used
+            for name in option["opts"]
+            if name.startswith(incomplete)
+        ]
+
+    def _parse_args(self, args: list[str]) -> tuple[dict[str, Any] | None, list[dict[str, Any]]] | None:
+        """Finds the completed command, if any, and options already used with it.
+
+        Returns:
+            ``None`` if ``args`` contain anything only ``click`` can interpret, such as command arguments.
+        """
+        options: list[dict[str, Any]] = self.data["options"]
+        command: dict[str, Any] | None = None
+        used: list[dict[str, Any]] = []
+        expects_value = False
+
+        for arg in args:
+            if expects_value:
+                expects_value = False
+            elif arg.startswith("-"):
+                name, separator, _ = arg.partition("=")
+                if (option := self._find_option(options, name)) is None or (separator and not option["takes_value"]):
+                    return None
+                used.append(option)
+                expects_value = option["takes_value"] and not separator
+            elif command is None and arg in self.data["commands"]:
+                command = self.data["commands"][arg]
+                if "options" not in command or command["is_group"]:
+                    return None
+                options, used = command["options"], []
+            else:
+                return None
+
+        return None if expects_value else (command, used)
+
+    def complete(self, args: list[str], incomplete: str) -> list[Completion] | None:
+        """Mirrors ``click`` completion of commands and options.
+
+        Returns:
+            ``None`` if the completion cannot be answered from the manifest.
+        """
+        if "=" in incomplete or (parsed := self._parse_args(args)) is None:
+            return None  # option values and arguments are completed by click
+        command, used = parsed
+
+        if incomplete and not incomplete[0].isalnum():
+            return self._complete_options(
+                self.data["options"] if command is None else command["options"], used, incomplete
+            )
+
+        if command is None:
+            return [
+                ("plain", name, entry["help"] or None)
+                for name, entry in sorted(self.data["commands"].items())
+                if name.startswith(incomplete)
+            ]
+
+        return None if command["has_arguments"] else []
+
+
+def _split_arg_string(string: str) -> list[str]:
+    """Same as ``click.shell_completion.split_arg_string``."""
+    lex = shlex.shlex(string, posix=True)
+    lex.whitespace_split = True
+    lex.commenters = ""
+    out = []
+    try:
+        for token in lex:
+            out.append(token)
+    except ValueError:
+        out.append(lex.token)
+    return out
+
+
+def _completion_args(shell: str) -> tuple[list[str], str]:
+    """Same as ``get_completion_args`` of ``click`` shell completion classes."""
+    cwords = _split_arg_string(os.environ["COMP_WORDS"])
+    if shell == "fish":
+        if incomplete := os.environ["COMP_CWORD"]:
+            incomplete = _split_arg_string(incomplete)[0]
+        args = cwords[1:]
+        if incomplete and args and args[-1] == incomplete:
+            args.pop()
+        return args, incomplete
+
+    cword = int(os.environ["COMP_CWORD"])
+    return cwords[1:cword], cwords[cword] if cword < len(cwords) else ""
+
+
+def _format_completion(shell: str, completion: Completion) -> str:
+    """Same as ``format_completion`` of ``click`` shell completion classes."""
+    completion_type, value, help_text = completion
+    if shell == "zsh":
+        help_text = help_text or "_"
+        return f"{completion_type}\n{value.replace(':', chr(92) + ':') if help_text != '_' else value}\n{help_text}"
+    if shell == "fish" and help_text:
+        return f"{completion_type},{value}\t{help_text.replace(chr(10), chr(92) + 'n').replace(chr(9), ' ')}"
+    return f"{completion_type},{value}"
+
+
+def complete_from_manifest(instruction: str, project_root: Path) -> bool:
+    """Answers a shell completion request the same way ``click`` would, if possible.
+
+    Args:
+        instruction: Value of the ``_<PROG_NAME>_COMPLETE`` environment variable, such as ``bash_complete``.
+        project_root: Root of the project.
+
+    Returns:
+        ``False`` if the request must be handled by ``click`` with all commands loaded.
+    """
+    shell, _, action = instruction.partition("_")
+    if action != "complete" or shell not in {"bash", "zsh", "fish"}:
+        return False
+
+    if (manifest := CompletionManifest.load(manifest_path(project_root))) is None:
+        return False
+
+    try:
+        completions = manifest.complete(*_completion_args(shell))
+    except (KeyError, ValueError):
+        return False
+
+    if completions is None:
+        return False
+
+    sys.stdout.write("\n".join(_format_completion(shell, completion) for completion in completions))
+    sys.stdout.flush()
+    return True
@@ -1,12 +1,31 @@
+import pickle
+import sys
 from pathlib import Path
+from typing import Any
 
-import toml
+from pydantic import VERSION as PYDANTIC_VERSION
 from pydantic import ValidationError
 
+from delfino.cache import FileStamp, file_stamp, folder_stamps, write_atomically
 from delfino.constants import PYPROJECT_TOML_FILENAME
 from delfino.models import PyprojectToml
 
+if sys.version_info >= (3, 11):
+    import tomllib
+
+    def _load_toml(path: Path) -> dict[str, Any]:
+        with open(path, "rb") as file:
+            return tomllib.load(file)
+
+else:  # pragma: no cover
+    import toml
+
+    def _load_toml(path: Path) -> dict[str, Any]:
+        return toml.load(path)
+
+
 _RC_FILE_NAME = ".delfinorc"
+_CACHE_FORMAT_VERSION = 1
 
 
 class ConfigValidationError(ValueError):
@@ -21,7 +40,35 @@ def _rc_locations(project_root: Path) -> list[Path]:  # pragma: no cover
     ]
 
 
-def load_config(project_root: Path) -> PyprojectToml:
+def config_stamps(project_root: Path) -> dict[str, FileStamp]:
+    """Stamps of all config locations, including missing ones. They change when the config may have changed."""
+    return {str(rc_file): file_stamp(rc_file) for rc_file in _rc_locations(project_root)}
+
+
+def _cache_key(project_root: Path) -> tuple:
+    # Pickled models are valid only for the same definition of the models
+    return (
+        _CACHE_FORMAT_VERSION,
+        sys.version_info[:2],
+        PYDANTIC_VERSION,
+        config_stamps(project_root),
+        folder_stamps(Path(__file__).parent / "models"),
+    )
+
+
+def _load_cached_config(cache_file: Path, key: tuple) -> PyprojectToml | None:
+    try:
+        cached_key, pyproject_toml = pickle.loads(cache_file.read_bytes())
+    except Exception:  # pylint: disable=broad-except  # any corrupted or outdated cache is a cache miss
+        return None
+
+    if cached_key != key or not isinstance(pyproject_toml, PyprojectToml):
+        return None
+
+    return pyproject_toml
+
+
+def load_config(project_root: Path, cache_file: Path | None = None) -> PyprojectToml:
     """Loads a config with defined precedence.
 
     Looks up the following locations in this order (later overwrite earlier):
@@ -34,15 +81,25 @@ def load_config(project_root: Path) -> PyprojectToml:
 
     Args:
         project_root: Root of the project.
+        cache_file: If given, the validated config is cached in this file until any of the
+            config files changes. Invalid configs are never cached.
     """
+    key = _cache_key(project_root) if cache_file else ()
+    if cache_file and (pyproject_toml := _load_cached_config(cache_file, key)) is not None:
+        return pyproject_toml
+
     pyproject_toml = PyprojectToml()
 
     for rc_file in _rc_locations(project_root):
         if not rc_file.is_file():
             continue
         try:
-            pyproject_toml = PyprojectToml(**toml.load(rc_file))
+            pyproject_toml = PyprojectToml(**_load_toml(rc_file))
         except ValidationError as exc:
             raise ConfigValidationError(f"Delfino appears to be misconfigured in '{rc_file}': {exc}") from exc
+        pyproject_toml.set_source(rc_file)
+
+    if cache_file:
+        write_atomically(cache_file, pickle.dumps((key, pyproject_toml), protocol=pickle.HIGHEST_PROTOCOL))
 
     return pyproject_toml
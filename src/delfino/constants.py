@@ -5,6 +5,10 @@ from typing import Final
 ENTRY_POINT: Final[str] = "delfino"
 PYPROJECT_TOML_FILENAME: Final[str] = "pyproject.toml"
 DEFAULT_LOCAL_COMMAND_FOLDERS: Final[tuple[Path, ...]] = (Path("commands"),)
+STATE_FOLDER: Final[Path] = Path(".delfino")
+DEFAULT_PROFILE_TOP: Final[int] = 20
+DEFAULT_HISTORY_MAX_AGE_DAYS: Final[int] = 90
+DEFAULT_HISTORY_MAX_ENTRIES: Final[int] = 10_000
 
 
 class PackageManager(Enum):
@@ -0,0 +1,428 @@
+import io
+import json
+import os
+import select
+import signal
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Final
+
+import click
+
+from delfino.cache import FileStamp, digest, import_path_stamps, stamps_are_current, state_folder
+
+_LOG = getLogger(__name__)
+
+DISABLE_ENV_VAR: Final[str] = "DELFINO_NO_DAEMON"
+"""Environment variable to run commands in the current process even if a daemon is running."""
+
+_HEADER: Final[struct.Struct] = struct.Struct("!I")
+_MAX_FDS: Final[int] = 3
+_CHECK_INTERVAL: Final[float] = 1.0
+_START_TIMEOUT: Final[float] = 30.0
+_LOG_FILE: Final[str] = "daemon.log"
+_MODULE: Final[str] = "delfino.daemon"
+_INTERRUPT_TIMEOUT: Final[float] = 5.0
+"""Seconds a worker has to exit after Ctrl+C is forwarded to it, before it is killed."""
+_INTERRUPTED_EXIT_CODE: Final[int] = 130
+
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+
+def socket_path(project_root: Path) -> Path:
+    """Path of the daemon socket, outside of the project to stay within the length limit of socket paths.
+
+    The interpreter is a part of the key, so that a run from another virtual environment of the same project,
+    with other plugins installed, doesn't use the daemon.
+    """
+    key = digest(f"{project_root}\0{sys.executable}")[:16]
+    return Path(tempfile.gettempdir()) / f"delfino-{os.getuid()}" / f"{key}.sock"
+
+
+def _is_private(path: Path) -> bool:
+    """Whether the socket and its folder belong to the current user and only the user can access the folder.
+
+    Otherwise another user could have created them to receive the environment and terminal of the client.
+    """
+    try:
+        folder, sock = path.parent.lstat(), path.lstat()
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(folder.st_mode)
+        and folder.st_uid == os.getuid()
+        and not stat.S_IMODE(folder.st_mode) & 0o077
+        and stat.S_ISSOCK(sock.st_mode)
+        and sock.st_uid == os.getuid()
+    )
+
+
+def _peer_is_current_user(sock: socket.socket) -> bool:
+    if not hasattr(socket, "SO_PEERCRED"):  # Linux only, the ownership of the socket is checked everywhere
+        return True
+    credentials = struct.Struct("3i")
+    _, uid, _ = credentials.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, credentials.size))
+    return uid == os.getuid()
+
+
+def _send(sock: socket.socket, message: dict[str, Any], fds: list[int] | None = None) -> None:
+    data = _HEADER.pack(len(payload := json.dumps(message).encode())) + payload
+    sent = socket.send_fds(sock, [data], fds) if fds else 0
+    sock.sendall(data[sent:])
+
+
+def _receive(sock: socket.socket) -> tuple[dict[str, Any] | None, list[int]]:
+    """Receives one message with any file descriptors sent with it. Returns ``None`` if the peer disconnected."""
+    try:
+        data, fds, _, _ = socket.recv_fds(sock, 64 * 1024, _MAX_FDS)
+    except ConnectionResetError:
+        return None, []
+    buffer = bytearray(data)
+    while buffer and len(buffer) < _HEADER.size + _HEADER.unpack_from(buffer)[0]:
+        if not (chunk := sock.recv(64 * 1024)):
+            break
+        buffer.extend(chunk)
+
+    if len(buffer) < _HEADER.size or len(buffer) < _HEADER.size + _HEADER.unpack_from(buffer)[0]:
+        for fd in fds:
+            os.close(fd)
+        return None, []
+
+    return json.loads(buffer[_HEADER.size :]), fds
+
+
+def _connect(project_root: Path) -> socket.socket | None:
+    if not supported() or not (path := socket_path(project_root)).exists():
+        return None
+    if not _is_private(path):
+        _LOG.warning(f"Ignoring daemon socket '{path}', it or its folder is accessible by other users.")
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    if not _peer_is_current_user(sock):
+        _LOG.warning(f"Ignoring daemon socket '{path}', it is served by another user.")
+        sock.close()
+        return None
+    return sock
+
+
+def _request(project_root: Path, message: dict[str, Any]) -> dict[str, Any] | None:
+    if (sock := _connect(project_root)) is None:
+        return None
+    with sock:
+        _send(sock, message)
+        return _receive(sock)[0]
+
+
+def _standard_fds() -> list[int] | None:
+    try:
+        for fd in range(_MAX_FDS):
+            os.fstat(fd)
+    except OSError:
+        return None
+    return list(range(_MAX_FDS))
+
+
+def _signal_worker(worker_pgid: int, signum: int) -> None:
+    try:
+        os.killpg(worker_pgid, signum)
+    except ProcessLookupError:  # the worker and all programs it started already exited
+        pass
+
+
+def _wait_for_exit_code(sock: socket.socket) -> int | None:
+    worker_pgid: int | None = None
+    while True:
+        try:
+            message, _ = _receive(sock)
+        except KeyboardInterrupt:
+            if worker_pgid is None:
+                raise
+            if sock.gettimeout() is not None:  # pressed again while waiting for the worker to exit
+                _signal_worker(worker_pgid, signal.SIGKILL)
+                return _INTERRUPTED_EXIT_CODE
+            # The worker and programs it started are not in the process group of the terminal
+            _signal_worker(worker_pgid, signal.SIGINT)
+            sock.settimeout(_INTERRUPT_TIMEOUT)
+            continue
+        except TimeoutError:
+            assert worker_pgid is not None
+            _LOG.debug(f"Worker did not exit in {_INTERRUPT_TIMEOUT} seconds after Ctrl+C, killing it.")
+            _signal_worker(worker_pgid, signal.SIGKILL)
+            return _INTERRUPTED_EXIT_CODE
+
+        if message is None:  # the daemon died
+            if worker_pgid is None:
+                return None
+            click.secho("Delfino daemon stopped before the command finished.", fg="red", err=True)
+            return 1
+        if "worker_pgid" in message:
+            worker_pgid = message["worker_pgid"]
+        else:  # exit code, or ``None`` if the daemon is reloading
+            return message.get("exit_code")
+
+
+def run_in_daemon(argv: list[str], project_root: Path) -> int | None:
+    """Runs a command in the daemon of the project, if it is running.
+
+    Returns:
+        Exit code of the command, or ``None`` if the command should run in the current process instead.
+    """
+    if os.environ.get(DISABLE_ENV_VAR) or (fds := _standard_fds()) is None:
+        return None
+    if (sock := _connect(project_root)) is None:
+        return None
+
+    with sock:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            _send(sock, {"type": "run", "argv": argv, "env": dict(os.environ), "cwd": os.getcwd()}, fds)
+        except OSError:  # the daemon is restarting or stopping
+            return None
+        return _wait_for_exit_code(sock)
+
+
+def _watched_stamps(project_root: Path, source_stamps: dict[str, FileStamp]) -> dict[str, FileStamp]:
+    from delfino.config import config_stamps  # noqa: PLC0415
+
+    return {**config_stamps(project_root), **source_stamps, **import_path_stamps(project_root)}
+
+
+def _warm_up(main_command: Any) -> dict[str, FileStamp]:
+    """Loads the config, discovers and imports all commands and returns stamps of files they depend on."""
+    registry = main_command._command_registry  # pylint: disable=protected-access
+    for command in registry.visible_commands:
+        try:
+            _ = command.command
+        except Exception as exc:  # pylint: disable=broad-except  # the command fails the same way when executed
+            _LOG.warning(f"Failed to import command '{command.name}': {exc}")
+    return _watched_stamps(main_command._project_root, registry.source_stamps)  # pylint: disable=protected-access
+
+
+def _reset_standard_streams() -> None:
+    """Re-creates Python standard streams, so that they are buffered the same way as in a new process."""
+    sys.stdin = io.TextIOWrapper(open(0, "rb", closefd=False))  # noqa: SIM115
+    sys.stdout = io.TextIOWrapper(open(1, "wb", closefd=False), line_buffering=os.isatty(1))  # noqa: SIM115
+    sys.stderr = io.TextIOWrapper(open(2, "wb", closefd=False), errors="backslashreplace", line_buffering=True)  # noqa: SIM115
+
+
+def _exit_code(exc: SystemExit) -> int:
+    if exc.code is None or isinstance(exc.code, int):
+        return exc.code or 0
+    print(exc.code, file=sys.stderr)
+    return 1
+
+
+def _run_worker(connection: socket.socket, request: dict[str, Any], fds: list[int], main_command: Any) -> None:
+    """Runs in a forked process. Never returns."""
+    exit_code = 1
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        # Own process group, so that the client can interrupt the worker with all programs it started
+        os.setpgid(0, 0)
+        _send(connection, {"worker_pgid": os.getpgid(0)})
+        for target_fd, fd in enumerate(fds):
+            os.dup2(fd, target_fd)
+            os.close(fd)
+        _reset_standard_streams()
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = request["argv"]
+
+        try:
+            main_command.main(args=sys.argv[1:], prog_name=os.path.basename(sys.argv[0]))
+        except SystemExit as exc:
+            exit_code = _exit_code(exc)
+        except KeyboardInterrupt:
+            exit_code = _INTERRUPTED_EXIT_CODE
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            _send(connection, {"exit_code": exit_code})
+        finally:
+            os._exit(0)
+
+
+class _Daemon:
+    """Keeps the main command with all its commands imported and runs commands in forked workers."""
+
+    def __init__(self, project_root: Path, main_command: Any):
+        self.project_root = project_root
+        self.main_command = main_command
+        self.stamps = _warm_up(main_command)
+        self.started = time.time()
+        self.path = socket_path(project_root)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    def _restart_if_stale(self) -> None:
+        if not stamps_are_current(self.stamps):
+            _LOG.info("Config, commands or installed packages changed. Restarting.")
+            os.execv(sys.executable, [sys.executable, "-m", _MODULE, str(self.project_root)])
+
+    def _handle(self, request: dict[str, Any], connection: socket.socket, fds: list[int]) -> bool:
+        """Handles a request. Returns whether the daemon should keep running."""
+        if request["type"] == "status":
+            _send(connection, {"pid": os.getpid(), "project_root": str(self.project_root), "started": self.started})
+        elif request["type"] == "stop":
+            _send(connection, {"stopped": True})
+            return False
+        elif not stamps_are_current(self.stamps):
+            _send(connection, {"reload": True})  # the client runs the command itself while the daemon restarts
+        elif os.fork() == 0:
+            self.server.close()
+            _run_worker(connection, request, fds, self.main_command)
+        return True
+
+    def serve(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.server.bind(str(self.path))
+        self.server.listen()
+        _LOG.info(f"Listening on '{self.path}' for '{self.project_root}'.")
+
+        try:
+            running = True
+            while running:
+                readable, _, _ = select.select([self.server], [], [], _CHECK_INTERVAL)
+                _reap_workers()
+                if not readable:
+                    self._restart_if_stale()
+                    continue
+
+                connection, _ = self.server.accept()
+                with connection:
+                    request, fds = _receive(connection)
+                    try:
+                        running = request is None or self._handle(request, connection, fds)
+                    finally:
+                        for fd in fds:
+                            os.close(fd)
+                # Only after the connection and file descriptors of the client are closed, not to keep them open
+                if running:
+                    self._restart_if_stale()
+        finally:
+            self.path.unlink(missing_ok=True)
+            self.server.close()
+
+
+def serve(project_root: Path) -> None:
+    """Runs the daemon of a project until it is stopped.
+
+    For every invocation, the client sends its arguments, environment, working directory and file
+    descriptors of its standard streams. The daemon forks a worker, which runs the command with the
+    streams of the client, so the output goes directly to the terminal of the client, and sends back
+    the exit code. Changes of the config, commands or installed packages make the daemon restart itself.
+    """
+    os.chdir(project_root)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    from delfino.main import main as main_command  # noqa: PLC0415
+
+    _Daemon(project_root, main_command).serve()
+
+
+def _reap_workers() -> None:
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0]:
+            pass
+    except ChildProcessError:
+        pass
+
+
+def _status(project_root: Path) -> dict[str, Any] | None:
+    return _request(project_root, {"type": "status"})
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@click.group("daemon", short_help="Manage a daemon keeping commands loaded to start them faster.")
+def daemon_command():
+    """Manage a daemon which keeps commands loaded to start them faster."""
+    if not supported():
+        raise click.UsageError("Delfino daemon is not supported on this platform.")
+
+
+@daemon_command.command()
+def start():
+    """Start the daemon for the project in the current directory."""
+    project_root = Path(os.getcwd())
+    path = socket_path(project_root)
+    path.parent.mkdir(mode=0o700, exist_ok=True)
+    if path.parent.is_symlink() or path.parent.lstat().st_uid != os.getuid():
+        raise click.ClickException(f"Folder '{path.parent}' is owned by another user.")
+    path.parent.chmod(0o700)  # only the owner could have made it accessible to others
+
+    if (status := _status(project_root)) is not None:
+        click.echo(f"Delfino daemon is already running (pid {status['pid']}).")
+        return
+
+    log_file = state_folder(project_root) / _LOG_FILE
+    log_file.parent.mkdir(exist_ok=True)
+    with open(log_file, "ab") as log:
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, "-m", _MODULE, str(project_root)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+
+    if not _wait_for(lambda: process.poll() is not None or _status(project_root) is not None, _START_TIMEOUT):
+        raise click.ClickException(f"Delfino daemon did not start in time. See '{log_file}'.")
+    if process.poll() is not None:
+        raise click.ClickException(f"Delfino daemon failed to start. See '{log_file}'.")
+    click.echo(f"Delfino daemon started (pid {process.pid}).")
+
+
+@daemon_command.command()
+def stop():
+    """Stop the daemon for the project in the current directory."""
+    project_root = Path(os.getcwd())
+    if _request(project_root, {"type": "stop"}) is None:
+        click.echo("Delfino daemon is not running.")
+        return
+
+    _wait_for(lambda: not socket_path(project_root).exists(), _START_TIMEOUT)
+    click.echo("Delfino daemon stopped.")
+
+
+@daemon_command.command()
+def status():
+    """Show whether the daemon for the project in the current directory is running."""
+    if (daemon_status := _status(Path(os.getcwd()))) is None:
+        click.echo("Delfino daemon is not running.")
+        raise click.exceptions.Exit(1)
+
+    uptime = int(time.time() - daemon_status["started"])
+    click.echo(f"Delfino daemon is running (pid {daemon_status['pid']}, up {uptime} s).")
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    serve(Path(sys.argv[1]))
@@ -1,5 +1,7 @@
+from delfino.decorators.cache_result import cache_result
 from delfino.decorators.files_folders import files_folders_option
+from delfino.decorators.jobs import fast_first_option, jobs_option
 from delfino.decorators.pass_app_context import pass_app_context
 from delfino.decorators.pass_args import pass_args
 
-__all__ = ["files_folders_option", "pass_app_context", "pass_args"]
+__all__ = ["cache_result", "fast_first_option", "files_folders_option", "jobs_option", "pass_app_context", "pass_args"]
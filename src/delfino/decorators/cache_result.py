@@ -0,0 +1,42 @@
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any, TypeVar
+
+from delfino.result_cache import cache_callback
+
+_Func = TypeVar("_Func", bound=Callable[..., Any])
+
+
+def cache_result(inputs: Sequence[str | Path] | None = None, cache_failures: bool = False) -> Callable[[_Func], _Func]:
+    """A command decorator which replays the cached output and exit code of the command if its inputs haven't changed.
+
+    Example:
+        @click.command("test")
+        @cache_result(inputs=["src", "tests"])
+        @pass_args
+        def run_pytest(passed_args: List[str]):
+            run(["pytest", *passed_args])
+
+    The cache key consists of the command, values of all its options and arguments, the config of the plugin,
+    the source file of the command and content hashes of all files under the ``inputs`` paths. Inputs can be
+    overridden in the ``pyproject.toml`` file, under ``tools.delfino.<PLUGIN>.<COMMAND>.cache_inputs``. If no
+    inputs are given, the ``files_folders`` option or the whole project (except hidden folders) is used.
+
+    Results are cached in the ``.delfino`` folder. Caching can be disabled with ``cache = false`` in the config
+    of the command or enabled for any command with ``cache = true``, without using this decorator.
+
+    Output is recorded by redirecting the standard output and error file descriptors into pipes. Programs
+    started by the command therefore don't write to a terminal and may leave out colors or progress output,
+    unless they are told otherwise, for example with ``--color=always``. Output of ``click.secho`` and other
+    Python code checking ``isatty()`` of ``sys.stdout`` or ``sys.stderr`` stays the same.
+
+    Args:
+        inputs: Files and folders the result of the command depends on.
+        cache_failures: Replay also results with a non-zero exit code. By default, a failed command runs
+            again, in case it failed for reasons other than its inputs, such as a flaky test or network.
+    """
+
+    def decorator(func: _Func) -> _Func:
+        return cache_callback(func, inputs, cache_failures)
+
+    return decorator
@@ -1,21 +1,177 @@
-from typing import Final
+from collections.abc import Callable, Sequence
+from typing import Any, Final, TypeVar, overload
 
 import click
 
+from delfino.click_utils.changed_files import enable_changed_files_mode, get_changed_files, restrict_to_changed
 from delfino.click_utils.set_from_config import SetOptionFromConfigCallback
+from delfino.sharding import files_of_shard, get_shard, shards_files
+
+_Func = TypeVar("_Func", bound=Callable[..., Any])
 
 _ARGUMENT_NAME: Final[str] = "files_folders"
-FILES_FOLDERS_OPTION_CALLBACK = SetOptionFromConfigCallback(_ARGUMENT_NAME)
-
-files_folders_option = click.option(
-    "-f",
-    "--file",
-    "--folder",
-    _ARGUMENT_NAME,
-    multiple=True,
-    nargs=1,
-    type=click.Path(exists=True),
-    help="A file or a folder to pass to the downstream tool instead of the default ones. "
-    "Can be supplied multiple times.",
-    callback=FILES_FOLDERS_OPTION_CALLBACK,
-)
+
+
+class _FilesFoldersOption(click.Option):
+    def __init__(self, *args, defaults: Sequence[str] = (), suffixes: Sequence[str] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.defaults = tuple(defaults)
+        """Files and folders the command passes to the tool when none are given."""
+        self.suffixes = tuple(suffixes)
+        """Suffixes of files the tool runs on, such as ``.py``."""
+
+
+class _SetFilesFoldersFromConfigCallback(SetOptionFromConfigCallback):
+    """Also restricts the files and folders to changed files, when ``--changed`` or ``--since`` is used.
+
+    Then, it restricts them to files of the shard, when files are split between shards.
+    """
+
+    def restrict(
+        self, ctx: click.Context, param: click.Parameter, files_folders: Sequence[str]
+    ) -> tuple[tuple[str, ...], str | None]:
+        """Restricts files and folders passed to a command, or its ``defaults`` if none are given.
+
+        Commands without any files, folders, ``defaults`` or ``suffixes`` run on files unknown to delfino.
+        They get no files to run on all of them, even when only changed files are passed to other commands,
+        and they run in the first shard only when files are split between shards.
+
+        Returns:
+            Files and folders to pass to the command, and why the command is skipped instead, if it is.
+        """
+        files_folders = tuple(files_folders)
+        defaults, suffixes = getattr(param, "defaults", ()), getattr(param, "suffixes", ())
+        if (changed_files := get_changed_files(ctx)) is not None and (files_folders or defaults or suffixes):
+            files_folders = restrict_to_changed(files_folders or defaults, changed_files, suffixes)
+            if not files_folders:
+                return files_folders, "No changed files to run"
+        if (shard := get_shard(ctx)) is not None and shards_files(ctx):
+            if files_folders or defaults or suffixes:
+                files_folders = files_of_shard(files_folders or defaults, shard, suffixes)
+            elif shard.index == 1:
+                return files_folders, None
+            if not files_folders:
+                return files_folders, f"No files of shard {shard} to run"
+        return files_folders, None
+
+    def files_folders_in_group(self, ctx: click.Context, command: click.Command) -> tuple[dict[str, Any], str | None]:
+        """Same as ``parameter_from_config_in_group`` with files and folders restricted like by ``restrict``.
+
+        Returns:
+            Files and folders to pass to the command, and why the command is skipped instead, if it is.
+        """
+        parameters = super().parameter_from_config_in_group(ctx, command)
+        if (param := self._param_of(command)) is None or (get_changed_files(ctx) is None and not shards_files(ctx)):
+            return parameters, None
+
+        # Without config of the command, files and folders given to the group command are used
+        files_folders = parameters.get(self.command_argument_name) or ctx.params.get(self.command_argument_name) or ()
+        files_folders, skip_reason = self.restrict(ctx, param, files_folders)
+        return {self.command_argument_name: files_folders}, skip_reason
+
+    def parameter_from_config_in_group(self, ctx: click.Context, command: click.Command) -> dict[str, Any]:
+        return self.files_folders_in_group(ctx, command)[0]
+
+    def _param_of(self, command: click.Command) -> click.Parameter | None:
+        return next((param for param in command.params if param.name == self.command_argument_name), None)
+
+    def accepted_by(self, command: click.Command) -> bool:
+        return self._param_of(command) is not None
+
+    def __call__(self, ctx: click.Context, param: click.Parameter, value: Any) -> Any:
+        value, skip_reason = self.restrict(ctx, param, super().__call__(ctx, param, value))
+        if skip_reason is not None:
+            click.echo(f"{skip_reason} '{ctx.info_name}' on. Skipping.", err=True)
+            ctx.exit()
+
+        return value
+
+
+FILES_FOLDERS_OPTION_CALLBACK = _SetFilesFoldersFromConfigCallback(_ARGUMENT_NAME)
+
+
+def _changed_callback(ctx: click.Context, _: click.Parameter, value: bool) -> None:
+    if value:
+        enable_changed_files_mode(ctx)
+
+
+def _since_callback(ctx: click.Context, _: click.Parameter, value: str | None) -> None:
+    if value:
+        enable_changed_files_mode(ctx, since=value)
+
+
+@overload
+def files_folders_option(func: _Func) -> _Func: ...
+
+
+@overload
+def files_folders_option(*, defaults: Sequence[str] = (), suffixes: Sequence[str] = ()) -> Callable[[_Func], _Func]: ...
+
+
+def files_folders_option(
+    func: _Func | None = None, *, defaults: Sequence[str] = (), suffixes: Sequence[str] = ()
+) -> _Func | Callable[[_Func], _Func]:
+    """A command decorator which passes files and folders to run a downstream tool on.
+
+    Example:
+        @click.command("test")
+        @files_folders_option(defaults=["tests"], suffixes=[".py"])
+        def run_pytest(files_folders: Tuple[str, ...]):
+            run(["pytest", *(files_folders or ["tests"])])
+
+    This decorator adds a ``files_folders`` parameter from one of the following sources:
+        - From command line, the ``-f``/``--file``/``--folder`` option, which can be supplied multiple times.
+        - The ``pyproject.toml`` file, under ``tools.delfino.<PLUGIN>.<COMMAND>.files_folders``.
+
+    With the ``--changed`` or ``--since <REF>`` option, only files changed since the last commit or since
+    the common ancestor with the given git reference are passed, including untracked files. Files and
+    folders from the sources above limit which changed files are passed. If there are none, the ``defaults``
+    and ``suffixes`` limit them instead. A command without any of them gets no files, to run on all its files.
+    The command is skipped if none of the files changed. The same applies to all commands invoked from
+    a command group by ``execute_commands_group``.
+
+    With the ``--shard INDEX/TOTAL --shard-files`` options of ``delfino``, the files are split between
+    shards by their size and only files of the shard are passed. Folders are expanded into files in them.
+    Without files and folders from the sources above, the ``defaults`` are split, or files with the
+    ``suffixes`` in the current directory. A command without any of them runs in the first shard only.
+
+    Args:
+        func: The command function, when used without arguments.
+        defaults: Files and folders the command passes to the tool when none are given.
+        suffixes: Suffixes of files the tool runs on, such as ``.py``. Other files in folders are not passed.
+    """
+
+    def _decorator(func: _Func) -> _Func:
+        func = click.option(
+            "--since",
+            metavar="REF",
+            is_eager=True,
+            expose_value=False,
+            callback=_since_callback,
+            help="Pass only files changed since the common ancestor with the git REF, including untracked files.",
+        )(func)
+        func = click.option(
+            "--changed",
+            is_flag=True,
+            is_eager=True,
+            expose_value=False,
+            callback=_changed_callback,
+            help="Pass only files changed since the last commit, including untracked files.",
+        )(func)
+        return click.option(
+            "-f",
+            "--file",
+            "--folder",
+            _ARGUMENT_NAME,
+            cls=_FilesFoldersOption,
+            defaults=defaults,
+            suffixes=suffixes,
+            multiple=True,
+            nargs=1,
+            type=click.Path(exists=True),
+            help="A file or a folder to pass to the downstream tool instead of the default ones. "
+            "Can be supplied multiple times.",
+            callback=FILES_FOLDERS_OPTION_CALLBACK,
+        )(func)
+
+    return _decorator(func) if func is not None else _decorator
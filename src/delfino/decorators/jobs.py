@@ -0,0 +1,48 @@
+from typing import Final
+
+import click
+
+from delfino.click_utils.set_from_config import SetOptionFromConfigCallback
+
+_ARGUMENT_NAME: Final[str] = "jobs"
+JOBS_OPTION_CALLBACK = SetOptionFromConfigCallback(_ARGUMENT_NAME)
+
+_FAST_FIRST_ARGUMENT_NAME: Final[str] = "fast_first"
+FAST_FIRST_OPTION_CALLBACK = SetOptionFromConfigCallback(_FAST_FIRST_ARGUMENT_NAME)
+
+jobs_option = click.option(
+    "-j",
+    "--jobs",
+    _ARGUMENT_NAME,
+    type=click.IntRange(min=1),
+    help="Number of commands of the group to run in parallel. Use 1 to run them one by one.",
+    callback=JOBS_OPTION_CALLBACK,
+)
+"""A decorator for commands executing a command group, to pass to ``execute_commands_group``.
+
+Example:
+
+    @click.command()
+    @jobs_option
+    @click.pass_context
+    @pass_app_context()
+    def verify(click_context: click.Context, app_context: AppContext, **kwargs):
+        execute_commands_group("verify", click_context, app_context, **kwargs)
+
+The number of jobs can also be set in the ``pyproject.toml`` file, under
+``tools.delfino.<PLUGIN>.<COMMAND>.jobs``.
+"""
+
+fast_first_option = click.option(
+    "--fast-first",
+    _FAST_FIRST_ARGUMENT_NAME,
+    is_flag=True,
+    help="Run commands of the group which usually finish the fastest first, to see their failures sooner.",
+    callback=FAST_FIRST_OPTION_CALLBACK,
+)
+"""A decorator for commands executing a command group, to pass to ``execute_commands_group``.
+
+Commands of the group are run and shown in the order of their typical duration from the history
+of previous runs, instead of the order in the config. It can also be set in the ``pyproject.toml``
+file, under ``tools.delfino.<PLUGIN>.<COMMAND>.fast_first``.
+"""
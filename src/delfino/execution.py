@@ -1,17 +1,49 @@
+import asyncio
+import errno
+import io
+import locale
 import os
+import selectors
 import shlex
+import struct
 import subprocess
-from collections.abc import Callable
+import sys
+import threading
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict
 from enum import Enum
+from functools import partial
 from logging import getLogger
-from typing import Any
+from typing import IO, Any, Final, cast
 
 import click
 
+from delfino import executors, run_report, tracing
+from delfino.bounded_output import BoundedOutput
+from delfino.resource_usage import ResourceUsage
 from delfino.utils import ArgsType
 
 _LOG = getLogger(__name__)
 
+RUNNING_HOOK_INTERVAL: Final[float] = 0.1
+"""Default interval between calls of ``running_hook``, in seconds."""
+
+BOUNDED_PIPE: Final[int] = -4
+"""Special value for ``stdout`` and ``stderr`` of ``run``, like ``subprocess.PIPE``, but with bounded memory usage.
+
+Only the head and the tail of the output are kept in memory. If the output is longer, it is returned with
+the middle replaced by a marker, which points to a temporary file with the full output if the file is kept
+for an error message. See ``BoundedOutput``.
+"""
+
+_CHUNK_SIZE: Final[int] = 64 * 1024
+_ARG_MAX_FALLBACK: Final[int] = 32 * 1024
+_ARG_MAX_MARGIN: Final[int] = 4 * 1024
+"""Reserve for what the system counts towards ``ARG_MAX`` on top of arguments and environment variables."""
+_POINTER_SIZE: Final[int] = struct.calcsize("P")
+"""Size of the pointer to each argument and environment variable, which also counts towards ``ARG_MAX``."""
+
 
 class OnError(Enum):
     PASS = "pass"
@@ -71,6 +103,10 @@ def _patch_env(
     return modified_env
 
 
+def _program_name(printable_args: str) -> str:
+    return os.path.basename(printable_args.partition(" ")[0])
+
+
 def _called_process_error_to_click_exception(
     args: ArgsType, on_error: OnError, exc: subprocess.CalledProcessError
 ) -> Exception:
@@ -78,20 +114,356 @@ def _called_process_error_to_click_exception(
         click.secho(f"\nError ({exc.returncode}) when calling {args!r}:", fg="red")
 
         if exc.stdout:
-            click.secho(exc.stdout.decode(), fg="red")
+            click.secho(exc.stdout.decode(errors="replace"), fg="red")
         if exc.stderr:
-            click.secho(exc.stderr.decode(), fg="red")
+            click.secho(exc.stderr.decode(errors="replace"), fg="red")
 
         return click.exceptions.Exit(code=exc.returncode)
 
     if exc.stdout:
-        print(exc.stdout.decode())
+        print(exc.stdout.decode(errors="replace"))
     if exc.stderr:
-        print(exc.stderr.decode())
+        print(exc.stderr.decode(errors="replace"))
 
     return click.exceptions.Abort()
 
 
+def _open_pidfd(pid: int) -> int | None:
+    if not hasattr(os, "pidfd_open"):  # Linux only
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:  # for example on kernels older than 5.3
+        return None
+
+
+def _reap(process: subprocess.Popen) -> ResourceUsage | None:
+    """Waits for the process with ``wait4`` to get resources it used, which ``Popen.wait`` discards."""
+    if not hasattr(os, "wait4") or process.returncode is not None:  # not available on Windows
+        process.wait()
+        return None
+
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:  # already reaped, for example by a ``SIGCHLD`` handler
+        process.wait()
+        return None
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return ResourceUsage.from_rusage(rusage)
+
+
+def _wait(process: subprocess.Popen, timeout: float | None) -> ResourceUsage | None:
+    """Waits for the process to exit without polling.
+
+    Without a timeout, ``wait4`` blocks until the process exits. ``Popen.wait`` with a timeout polls
+    with a sleep in between, so a pidfd becoming readable on process exit is waited for instead, where
+    supported.
+
+    Returns:
+        Resources used by the process, if available on the platform.
+    """
+    if timeout is not None:
+        if (pidfd := _open_pidfd(process.pid)) is None:
+            process.wait(timeout)
+            return None
+
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(pidfd, selectors.EVENT_READ)
+                if not selector.select(timeout):
+                    raise subprocess.TimeoutExpired(process.args, timeout)
+        finally:
+            os.close(pidfd)
+
+    return _reap(process)
+
+
+@contextmanager
+def _ticking(running_hook: Callable[[], None] | None, interval: float) -> Iterator[None]:
+    """Calls ``running_hook`` every ``interval`` seconds from a timer thread until the context exits.
+
+    An exception raised by the hook stops the timer and is re-raised when the context exits.
+    """
+    if running_hook is None:
+        yield
+        return
+
+    stopped = threading.Event()
+    errors: list[BaseException] = []
+
+    def _tick() -> None:
+        while not stopped.wait(interval):
+            try:
+                running_hook()
+            except BaseException as exc:  # pylint: disable=broad-except  # re-raised in the calling thread
+                errors.append(exc)
+                return
+
+    timer = threading.Thread(target=_tick, name="delfino-running-hook", daemon=True)
+    timer.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        timer.join()
+
+    if errors:
+        raise errors[0]
+
+
+class CompletedRun(subprocess.CompletedProcess):
+    """A finished process with resources it used, if available on the platform. Returned by ``run``."""
+
+    def __init__(
+        self,
+        args: Any,
+        returncode: int,
+        stdout: Any = None,
+        stderr: Any = None,
+        resources: ResourceUsage | None = None,
+    ):
+        super().__init__(args, returncode, stdout, stderr)
+        self.resources = resources
+
+
+def _read_pipe(pipe: IO, write: Callable[[bytes], Any]) -> None:
+    with pipe:
+        while chunk := os.read(pipe.fileno(), _CHUNK_SIZE):
+            write(chunk)
+
+
+def _universal_newlines(output: bytes, encoding: str, errors: str | None) -> str:
+    # Same as the text mode of ``Popen``
+    return output.decode(encoding, errors or "strict").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _decoded(pipe: IO, output: bytes) -> bytes | str:
+    if not isinstance(pipe, io.TextIOWrapper):
+        return output
+    return _universal_newlines(output, pipe.encoding, pipe.errors)
+
+
+def _communicate(
+    process: subprocess.Popen, bounded: Sequence[str], timeout: float | None, keep_log_files_on_failure: bool
+) -> tuple[bytes | str | None, bytes | str | None, ResourceUsage | None]:
+    """Same as ``Popen.communicate()`` without input, but also returns resources used by the process.
+
+    Pipes named in ``bounded`` are read into ``BoundedOutput``. Their log files are removed, unless
+    ``keep_log_files_on_failure`` and the process failed, when its output is shown with a pointer to them.
+    """
+    if process.stdin is not None:
+        process.stdin.close()
+
+    outputs: dict[str, BoundedOutput | io.BytesIO] = {
+        name: BoundedOutput(name) if name in bounded else io.BytesIO()
+        for name in ("stdout", "stderr")
+        if getattr(process, name) is not None
+    }
+    results: dict[str, bytes | str] | None = None
+    keep_log_files = False
+    readers = [
+        threading.Thread(target=_read_pipe, args=(getattr(process, name), output.write), daemon=True)
+        for name, output in outputs.items()
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        try:
+            resources = _wait(process, timeout)
+        except BaseException:
+            process.kill()  # lets the readers reach the end of the pipes
+            raise
+        finally:
+            for reader in readers:
+                reader.join()
+        keep_log_files = keep_log_files_on_failure and bool(process.returncode)
+        results = {
+            name: _decoded(getattr(process, name), _output_value(output, keep_log_files))
+            for name, output in outputs.items()
+        }
+    finally:
+        for output in outputs.values():
+            _close_output(output, keep_log_files and results is not None)
+
+    return results.get("stdout"), results.get("stderr"), resources
+
+
+def _output_value(output: BoundedOutput | io.BytesIO, keep_log_file: bool) -> bytes:
+    return output.getvalue(keep_log_file) if isinstance(output, BoundedOutput) else output.getvalue()
+
+
+def _close_output(output: BoundedOutput | io.BytesIO, keep_log_file: bool) -> None:
+    if isinstance(output, BoundedOutput):
+        output.close(keep_log_file)
+    else:
+        output.close()
+
+
+def _run_locally(
+    args: ArgsType,
+    popenargs: tuple,
+    kwargs: dict[str, Any],
+    bounded: Sequence[str],
+    timeout: float | None,
+    keep_log_files_on_failure: bool,
+) -> CompletedRun:
+    for name in bounded:
+        kwargs[name] = subprocess.PIPE
+
+    with subprocess.Popen(args, *popenargs, **kwargs) as process:
+        try:
+            if process.stdin is None and process.stdout is None and process.stderr is None:
+                resources = _wait(process, timeout)
+                stdout, stderr = None, None
+            else:  # reads the pipes from threads
+                stdout, stderr, resources = _communicate(process, bounded, timeout, keep_log_files_on_failure)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        except Exception:  # Including KeyboardInterrupt, communicate handled that.
+            process.kill()
+            # We don't call process.wait() as .__exit__ does that for us.
+            raise
+        retcode = process.poll()
+    return CompletedRun(process.args, retcode or 0, stdout, stderr, resources)
+
+
+_JOB_KWARGS: Final[frozenset[str]] = frozenset(
+    {"shell", "cwd", "stdin", "stdout", "stderr", "text", "universal_newlines", "encoding", "errors"}
+)
+_JOB_OUTPUTS: Final[tuple[int | None, ...]] = (None, subprocess.PIPE, subprocess.DEVNULL, BOUNDED_PIPE)
+
+
+def _job_of(
+    args: ArgsType,
+    popenargs: tuple,
+    kwargs: dict[str, Any],
+    env_update_path: dict[str, Any] | None,
+    env_update: dict[str, Any] | None,
+    timeout: float | None,
+) -> executors.Job | None:
+    """Describes the program for an executor, or returns ``None`` if it can only run directly in this process."""
+    unsupported = sorted(kwargs.keys() - _JOB_KWARGS) + (["popenargs"] if popenargs else [])
+    if kwargs.get("stdin") not in (None, subprocess.DEVNULL):
+        unsupported.append("stdin")
+    if kwargs.get("stdout") not in _JOB_OUTPUTS or kwargs.get("stderr") not in (*_JOB_OUTPUTS, subprocess.STDOUT):
+        unsupported.append("stdout or stderr")
+    if unsupported:
+        _LOG.debug(f"Running directly, executors don't support {', '.join(unsupported)}.")
+        return None
+
+    return executors.Job(
+        args=cast(list[str] | str, args),
+        shell=bool(kwargs.get("shell")),
+        cwd=os.fspath(kwargs["cwd"]) if kwargs.get("cwd") is not None else None,
+        env_update={key: str(value) for key, value in (env_update or {}).items()},
+        env_update_path={key: str(value) for key, value in (env_update_path or {}).items()},
+        merge_stderr=kwargs.get("stderr") == subprocess.STDOUT,
+        timeout=timeout,
+    )
+
+
+class _JobOutput:
+    """Captures or shows output of a program run by an executor, as ``Popen`` would with the same arguments.
+
+    Log files of bounded outputs are removed on exit, unless ``keep_log_files_on_failure`` and the program failed.
+    """
+
+    def __init__(self, kwargs: dict[str, Any], bounded: Sequence[str], keep_log_files_on_failure: bool):
+        self._kwargs = kwargs
+        self._keep_log_files_on_failure = keep_log_files_on_failure
+        self._keep_log_files = False
+        self._captured: dict[str, BoundedOutput | io.BytesIO] = {
+            name: BoundedOutput(name) if name in bounded else io.BytesIO()
+            for name in ("stdout", "stderr")
+            if kwargs.get(name) in (subprocess.PIPE, BOUNDED_PIPE)
+        }
+        self._echoed = {
+            name: stream
+            for name, stream in (("stdout", sys.stdout), ("stderr", sys.stderr))
+            if kwargs.get(name) is None
+        }
+
+    def __enter__(self) -> "_JobOutput":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        for output in self._captured.values():
+            _close_output(output, self._keep_log_files)
+
+    def write(self, name: str, chunk: bytes) -> None:
+        if (output := self._captured.get(name)) is not None:
+            output.write(chunk)
+        elif (stream := self._echoed.get(name)) is not None:
+            _echo_output(stream, chunk)
+
+    def completed(self, job: executors.Job, result: executors.JobResult) -> CompletedRun:
+        self._keep_log_files = self._keep_log_files_on_failure and result.returncode != 0
+        values: dict[str, bytes | str] = {
+            name: _output_value(output, self._keep_log_files) for name, output in self._captured.items()
+        }
+        if any(self._kwargs.get(name) for name in ("text", "universal_newlines", "encoding", "errors")):
+            encoding = self._kwargs.get("encoding") or locale.getpreferredencoding(False)
+            values = {
+                name: _universal_newlines(
+                    _output_value(output, self._keep_log_files), encoding, self._kwargs.get("errors")
+                )
+                for name, output in self._captured.items()
+            }
+        return CompletedRun(job.args, result.returncode, values.get("stdout"), values.get("stderr"), result.resources)
+
+
+def _run_job(
+    executor: executors.Executor,
+    job: executors.Job,
+    kwargs: dict[str, Any],
+    bounded: Sequence[str],
+    keep_log_files_on_failure: bool,
+) -> CompletedRun:
+    with _JobOutput(kwargs, bounded, keep_log_files_on_failure) as output:
+        return output.completed(job, executor.submit(job, output.write).result())
+
+
+def execute_job(job: executors.Job, on_output: executors.OutputCallback) -> executors.JobResult:
+    """Runs the program of a job in a child process, which is where every executor runs it in the end.
+
+    Output of the program is passed to ``on_output`` as it is written, from threads reading its pipes.
+
+    Raises:
+        subprocess.TimeoutExpired: If the program didn't finish within the timeout of the job. It is killed.
+    """
+    with subprocess.Popen(
+        job.args,
+        shell=job.shell,
+        cwd=job.cwd,
+        env=_patch_env(job.env_update_path, job.env_update),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT if job.merge_stderr else subprocess.PIPE,
+    ) as process:
+        readers = [
+            threading.Thread(target=_read_pipe, args=(pipe, partial(on_output, name)), daemon=True)
+            for name in ("stdout", "stderr")
+            if (pipe := getattr(process, name)) is not None
+        ]
+        for reader in readers:
+            reader.start()
+
+        try:
+            resources = _wait(process, job.timeout)
+        except BaseException:
+            process.kill()  # lets the readers reach the end of the pipes
+            raise
+        finally:
+            for reader in readers:
+                reader.join()
+
+    return executors.JobResult(cast(int, process.returncode), resources)
+
+
 def run(
     args: ArgsType,
     *popenargs,
@@ -99,8 +471,9 @@ def run(
     env_update_path: dict[str, Any] | None = None,
     env_update: dict[str, Any] | None = None,
     running_hook: Callable[[], None] | None = None,
+    running_hook_interval: float = RUNNING_HOOK_INTERVAL,
     **kwargs,
-) -> subprocess.CompletedProcess:
+) -> CompletedRun:
     """Modified version of ``subprocess.run``.
 
     Args:
@@ -113,34 +486,338 @@ def run(
         env_update_path: A dict of path-like environment variables to update. If this variable already
             exists, the value will be pre-pended with a ":".
         env_update: Similar to ``env_update_path`` but any existing variables are replaced.
-        running_hook: If provided, the process will be polled for return code and this function will
-            be called every time the process has not finished yet. The function should contain a
-            suitable wait interval to not check the result too frequently.
-        **kwargs: Additional keyword arguments passed directly to ``subprocess.run``.
+        running_hook: If provided, this function will be called every ``running_hook_interval``
+            seconds from a timer thread until the process finishes. Waiting for the process
+            itself doesn't poll, so the function doesn't need to sleep and the process finishing
+            is noticed immediately.
+        running_hook_interval: Number of seconds between calls of ``running_hook``.
+        **kwargs: Additional keyword arguments passed directly to ``subprocess.run``, including ``timeout``.
+            ``stdout`` and ``stderr`` also accept ``BOUNDED_PIPE`` to capture output of programs that may
+            write a lot of it, for example on failure, without holding all of it in memory.
+
+    Returns:
+        A ``subprocess.CompletedProcess`` with CPU time, memory and I/O used by the process in ``resources``.
+
+    Example:
+        .. code-block:: python
+
+            run(["pytest", "-vv"], stdout=BOUNDED_PIPE, stderr=subprocess.STDOUT, on_error=OnError.ABORT)
     """
     args, printable_args = _normalize_args(args, kwargs.get("shell", False))
+    timeout = kwargs.pop("timeout", None)  # not accepted by ``Popen``
+    bounded = [name for name in ("stdout", "stderr") if kwargs.get(name) == BOUNDED_PIPE]
+    executor = executors.current()
+    job = _job_of(args, popenargs, kwargs, env_update_path, env_update, timeout) if executor else None
+
+    _LOG.debug(printable_args)
+
+    with (
+        tracing.span("subprocess", _program_name(printable_args), command=printable_args) as span_args,
+        run_report.subprocess_record(printable_args) as report_record,
+    ):
+        try:
+            with _ticking(running_hook, running_hook_interval):
+                # Output of failed programs is shown with a pointer to its log file, unless handled by the caller
+                keep_log_files = on_error != OnError.PASS
+                if executor is None or job is None:
+                    kwargs["env"] = _patch_env(env_update_path, env_update)
+                    completed = _run_locally(args, popenargs, kwargs, bounded, timeout, keep_log_files)
+                else:
+                    completed = _run_job(executor, job, kwargs, bounded, keep_log_files)
+            span_args["exit_code"] = report_record["exit_code"] = completed.returncode
+            report_record["resources"] = asdict(completed.resources) if completed.resources else None
+            if on_error != OnError.PASS and completed.returncode:
+                raise subprocess.CalledProcessError(
+                    completed.returncode, completed.args, output=completed.stdout, stderr=completed.stderr
+                )
+            return completed
+        except subprocess.CalledProcessError as exc:
+            raise _called_process_error_to_click_exception(args, on_error, exc) from exc
+
+
+async def _run_locally_async(
+    args: ArgsType, shell: bool, popenargs: tuple, kwargs: dict[str, Any], timeout: float | None
+) -> tuple[bytes | None, bytes | None, int]:
+    if shell:
+        process = await asyncio.create_subprocess_shell(cast(str, args), *popenargs, **kwargs)
+    else:
+        process = await asyncio.create_subprocess_exec(*cast(list[str], args), *popenargs, **kwargs)
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError as exc:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(args, cast(float, timeout)) from exc
+    except BaseException:  # Including cancellation, so that no process outlives its coroutine.
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+
+    return stdout, stderr, cast(int, process.returncode)
+
+
+async def run_async(
+    args: ArgsType,
+    *popenargs,
+    on_error: OnError,
+    env_update_path: dict[str, Any] | None = None,
+    env_update: dict[str, Any] | None = None,
+    **kwargs,
+) -> subprocess.CompletedProcess:
+    """Coroutine version of ``run``, built on ``asyncio.create_subprocess_exec``.
+
+    Args:
+        args: Same as in ``run``.
+        *popenargs: Additional positional arguments passed directly to ``asyncio.create_subprocess_exec``.
+        on_error: Same as in ``run``.
+        env_update_path: Same as in ``run``.
+        env_update: Same as in ``run``.
+        **kwargs: Additional keyword arguments passed directly to ``asyncio.create_subprocess_exec``
+            or ``asyncio.create_subprocess_shell`` if ``shell=True``, including ``timeout``. Text
+            mode is not supported by asyncio, so ``stdout`` and ``stderr`` are always bytes.
+
+    Example:
+        .. code-block:: python
+
+            results = asyncio.run(gather_runs(
+                *(run_async(["pytest", path], on_error=OnError.PASS) for path in paths), limit=4
+            ))
+    """
+    shell = kwargs.get("shell", False)
+    args, printable_args = _normalize_args(args, shell)
+    timeout = kwargs.pop("timeout", None)
+    executor = executors.current()
+    job = _job_of(args, popenargs, kwargs, env_update_path, env_update, timeout) if executor else None
+    kwargs.pop("shell", None)
     kwargs["env"] = _patch_env(env_update_path, env_update)
 
     _LOG.debug(printable_args)
 
+    with (
+        tracing.span("subprocess", _program_name(printable_args), concurrent=True, command=printable_args) as span_args,
+        run_report.subprocess_record(printable_args) as report_record,
+    ):
+        if executor is None or job is None:
+            stdout, stderr, retcode = await _run_locally_async(args, shell, popenargs, kwargs, timeout)
+        else:
+            with _JobOutput(kwargs, bounded=(), keep_log_files_on_failure=False) as output:
+                completed = output.completed(job, await asyncio.wrap_future(executor.submit(job, output.write)))
+            stdout, stderr, retcode = completed.stdout, completed.stderr, completed.returncode
+        span_args["exit_code"] = report_record["exit_code"] = retcode
+
+    if on_error != OnError.PASS and retcode:
+        raise _called_process_error_to_click_exception(
+            args, on_error, subprocess.CalledProcessError(retcode, args, output=stdout, stderr=stderr)
+        )
+    return subprocess.CompletedProcess(args, retcode, stdout, stderr)
+
+
+async def gather_runs(
+    *runs: Awaitable[subprocess.CompletedProcess], limit: int | None = None
+) -> list[subprocess.CompletedProcess]:
+    """Awaits ``run_async`` coroutines, at most ``limit`` of them at a time.
+
+    All runs are awaited to completion, even if some of them fail. The first failure in submission
+    order is then re-raised, the same way as ``run`` would raise it.
+
+    Args:
+        *runs: Not yet awaited coroutines, typically of ``run_async``.
+        limit: Maximum number of concurrently awaited runs. Defaults to the number of CPUs.
+
+    Returns:
+        Completed processes in the order of ``runs``.
+    """
+    semaphore = asyncio.Semaphore(limit or os.cpu_count() or 1)
+
+    async def _limited(awaitable: Awaitable[subprocess.CompletedProcess]) -> subprocess.CompletedProcess:
+        async with semaphore:
+            return await awaitable
+
+    results = await asyncio.gather(*map(_limited, runs), return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return cast(list[subprocess.CompletedProcess], results)
+
+
+def _command_line_budget(env: dict[str, str]) -> int:
+    """Maximum length of arguments of a process, after subtracting the environment from the system limit.
+
+    Arguments count towards the limit with a terminating null byte and a pointer each. So do the environment
+    variables, with ``=`` between the name and the value and the pointers to both lists terminated by ``NULL``.
+    """
     try:
-        with subprocess.Popen(args, *popenargs, **kwargs) as process:
-            if running_hook is not None:
-                while process.poll() is None:
-                    running_hook()
-            try:
-                stdout, stderr = process.communicate(timeout=kwargs.get("timeout", None))
-            except subprocess.TimeoutExpired:
-                process.kill()
-                process.wait()
-                raise
-            except Exception:  # Including KeyboardInterrupt, communicate handled that.
-                process.kill()
-                # We don't call process.wait() as .__exit__ does that for us.
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):  # not available on Windows
+        arg_max = _ARG_MAX_FALLBACK
+    env_length = sum(len(os.fsencode(key)) + len(os.fsencode(value)) + 2 + _POINTER_SIZE for key, value in env.items())
+    return max(arg_max - env_length - 2 * _POINTER_SIZE - _ARG_MAX_MARGIN, 0)
+
+
+def _argument_length(arg: str) -> int:
+    """Length of an argument counted towards ``ARG_MAX``."""
+    return len(os.fsencode(arg)) + 1 + _POINTER_SIZE
+
+
+def _file_weight(path: str) -> int:
+    try:
+        return max(os.path.getsize(path), 1)
+    except OSError:
+        return 1
+
+
+def split_into_chunks(
+    files: Sequence[str],
+    chunks: int,
+    max_length: int | None = None,
+    weight: Callable[[str], int] = _file_weight,
+    length: Callable[[str], int] = lambda file: len(file) + 1,
+) -> list[list[str]]:
+    """Splits files into consecutive chunks of similar total weight, each within a length limit of a command line.
+
+    Chunks are consecutive so that merged output of a program is in a similar order as if it ran on all files
+    at once. If any chunk would be too long, files are split into more chunks.
+
+    Args:
+        files: Files to split.
+        chunks: Number of chunks to split the files into, if the length limit allows it.
+        max_length: Maximum length of all files in a chunk on a command line, as measured by ``length``.
+        weight: Estimate of the work a file needs, for example its size.
+        length: Length a file adds to a command line. Defaults to the length of its name with a separator.
+
+    Returns:
+        Non-empty chunks, at most one per file.
+    """
+    weights = [weight(file) for file in files]
+    lengths = [length(file) for file in files] if max_length is not None else []
+    total_weight = max(sum(weights), 1)
+    chunks = max(min(chunks, len(files)), 1)
+
+    while True:
+        assigned: list[list[int]] = [[] for _ in range(chunks)]
+        cumulative_weight = 0
+        for index, file_weight in enumerate(weights):
+            # A file belongs to the chunk where most of its weight falls
+            chunk = min(int((cumulative_weight + file_weight / 2) * chunks / total_weight), chunks - 1)
+            assigned[chunk].append(index)
+            cumulative_weight += file_weight
+
+        result = [[files[index] for index in chunk] for chunk in assigned if chunk]
+        too_long = max_length is not None and any(
+            sum(lengths[index] for index in chunk) > max_length for chunk in assigned
+        )
+        if not too_long or chunks >= len(files):
+            return result
+        chunks = min(chunks * 2, len(files))
+
+
+def _merge_results(args: list[str], results: list[subprocess.CompletedProcess]) -> subprocess.CompletedProcess:
+    """Joins output of runs in their order, with the first non-zero exit code."""
+
+    def _joined(outputs: list[bytes | None]) -> bytes | None:
+        return None if all(output is None for output in outputs) else b"".join(output or b"" for output in outputs)
+
+    return subprocess.CompletedProcess(
+        args,
+        next((result.returncode for result in results if result.returncode), 0),
+        _joined([result.stdout for result in results]),
+        _joined([result.stderr for result in results]),
+    )
+
+
+def _echo_output(stream: Any, output: bytes | None) -> None:
+    if not output:
+        return
+    stream.flush()
+    if (buffer := getattr(stream, "buffer", None)) is not None:
+        buffer.write(output)
+        buffer.flush()
+    else:
+        stream.write(output.decode(errors="replace"))
+        stream.flush()
+
+
+def run_chunked(
+    args: ArgsType,
+    files: Sequence[str | os.PathLike],
+    *,
+    on_error: OnError,
+    jobs: int | None = None,
+    env_update_path: dict[str, Any] | None = None,
+    env_update: dict[str, Any] | None = None,
+    **kwargs,
+) -> subprocess.CompletedProcess:
+    """Runs the same program on chunks of ``files`` in parallel processes, as if it ran once on all of them.
+
+    Files are split by their size into chunks of similar weight, one per job, or more if the command
+    line of a chunk would exceed the system limit of the length of arguments (``ARG_MAX``). A chunk which
+    the system still rejects as too long is split again. Output of all chunks is captured and shown or
+    returned in the order of chunks, so it is never interleaved.
+
+    Args:
+        args: Program to run with all it's arguments, except ``files``, which are appended to it.
+        files: Files to run the program on. The program runs once without any files if empty.
+        on_error: Same as in ``run``. The exit code is the first non-zero exit code in the order of chunks.
+        jobs: Maximum number of processes running at once. Defaults to the number of CPUs.
+        env_update_path: Same as in ``run``.
+        env_update: Same as in ``run``.
+        **kwargs: Additional keyword arguments passed to ``run_async``. If ``stdout`` or ``stderr``
+            is not given, the output is captured and written to ``sys.stdout`` or ``sys.stderr``.
+
+    Example:
+        .. code-block:: python
+
+            run_chunked(["ruff", "check"], files_folders, on_error=OnError.ABORT, jobs=jobs)
+
+    Returns:
+        A completed process with the merged output and exit code, and ``args`` without the files.
+    """
+    args_list = cast(list[str], _normalize_args(args, shell=False)[0])
+    jobs = jobs or os.cpu_count() or 1
+    echoed = [name for name in ("stdout", "stderr") if kwargs.get(name) is None]
+    for name in echoed:
+        kwargs[name] = subprocess.PIPE
+
+    env = _patch_env(env_update_path, env_update)
+    max_length = _command_line_budget(env) - sum(map(_argument_length, args_list))
+    chunks = split_into_chunks([os.fspath(file) for file in files], jobs, max_length, length=_argument_length) or [[]]
+    _LOG.debug(f"Running {shlex.join(args_list)} on {len(files)} files in {len(chunks)} chunks.")
+
+    async def _run_chunk(chunk: list[str]) -> subprocess.CompletedProcess:
+        try:
+            return await run_async(
+                [*args_list, *chunk],
+                on_error=OnError.PASS,
+                env_update_path=env_update_path,
+                env_update=env_update,
+                **kwargs,
+            )
+        except OSError as exc:
+            # The limit is only estimated, the system may count more towards it
+            if exc.errno != errno.E2BIG or len(chunk) <= 1:
                 raise
-            retcode = process.poll()
-            if on_error != OnError.PASS and retcode:
-                raise subprocess.CalledProcessError(retcode, process.args, output=stdout, stderr=stderr)
-        return subprocess.CompletedProcess(process.args, retcode or 0, stdout, stderr)
-    except subprocess.CalledProcessError as exc:
-        raise _called_process_error_to_click_exception(args, on_error, exc) from exc
+        _LOG.debug(f"Arguments of a chunk of {len(chunk)} files are too long, splitting it in halves.")
+        middle = len(chunk) // 2
+        return _merge_results(args_list, [await _run_chunk(chunk[:middle]), await _run_chunk(chunk[middle:])])
+
+    merged = _merge_results(args_list, asyncio.run(gather_runs(*map(_run_chunk, chunks), limit=jobs)))
+
+    output = {"stdout": merged.stdout, "stderr": merged.stderr}
+    for name, stream in (("stdout", sys.stdout), ("stderr", sys.stderr)):
+        if name in echoed:
+            _echo_output(stream, output[name])
+            output[name] = None
+
+    if on_error != OnError.PASS and merged.returncode:
+        raise _called_process_error_to_click_exception(
+            args_list,
+            on_error,
+            subprocess.CalledProcessError(
+                merged.returncode, args_list, output=output["stdout"], stderr=output["stderr"]
+            ),
+        )
+    return subprocess.CompletedProcess(args_list, merged.returncode, output["stdout"], output["stderr"])
@@ -0,0 +1,257 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from concurrent import futures
+from dataclasses import dataclass, field, replace
+from logging import getLogger
+from typing import Any
+
+from delfino.resource_usage import ResourceUsage
+
+_LOG = getLogger(__name__)
+
+OutputCallback = Callable[[str, bytes], Any]
+"""Called with the name of a stream, ``stdout`` or ``stderr``, and a chunk of output of a program as it is written."""
+
+
+@dataclass(frozen=True)
+class Job:
+    """A program for an executor to run, described by plain data to be sent to another process or machine."""
+
+    args: list[str] | str
+    """Program with all its arguments, or a command line if ``shell``."""
+
+    shell: bool = False
+
+    cwd: str | None = None
+    """Working directory. Remote workers resolve it in their own checkout of the project."""
+
+    env_update: dict[str, str] = field(default_factory=dict)
+    """Environment variables replacing those of the process running the program."""
+
+    env_update_path: dict[str, str] = field(default_factory=dict)
+    """Path-like environment variables pre-pended to those of the process running the program."""
+
+    merge_stderr: bool = False
+    """Send standard error of the program to its standard output, like ``stderr=subprocess.STDOUT``."""
+
+    timeout: float | None = None
+    """Seconds after which the program is killed and ``subprocess.TimeoutExpired`` raised."""
+
+
+@dataclass(frozen=True)
+class JobResult:
+    returncode: int
+    resources: ResourceUsage | None = None
+
+
+def _execute(job: Job, on_output: OutputCallback) -> JobResult:
+    from delfino.execution import execute_job  # noqa: PLC0415  # ``execution`` imports this module
+
+    return execute_job(job, on_output)
+
+
+def _execute_buffered(job: Job) -> tuple[JobResult, list[tuple[str, bytes]]]:
+    output: list[tuple[str, bytes]] = []
+    return _execute(job, lambda name, chunk: output.append((name, chunk))), output
+
+
+class Executor(ABC):
+    """Runs programs of jobs, in this process, in pools of threads or processes, or on remote workers."""
+
+    @abstractmethod
+    def submit(self, job: Job, on_output: OutputCallback) -> "futures.Future[JobResult]":
+        """Starts running a job. ``on_output`` may be called from other threads until the future is done."""
+
+    def shutdown(self) -> None:
+        """Waits for submitted jobs and releases any threads or processes of the executor."""
+
+
+class InProcessExecutor(Executor):
+    """Runs each job in the calling thread, so ``submit`` returns only when the program finished."""
+
+    def submit(self, job: Job, on_output: OutputCallback) -> "futures.Future[JobResult]":
+        future: futures.Future[JobResult] = futures.Future()
+        try:
+            future.set_result(_execute(job, on_output))
+        except Exception as exc:  # pylint: disable=broad-except  # re-raised by ``future.result()``
+            future.set_exception(exc)
+        return future
+
+
+class ThreadPoolExecutor(Executor):
+    """Runs at most ``jobs`` programs at a time, waiting for them in threads of this process."""
+
+    def __init__(self, jobs: int | None = None):
+        self._pool = futures.ThreadPoolExecutor(jobs or os.cpu_count() or 1, thread_name_prefix="delfino-executor")
+
+    def submit(self, job: Job, on_output: OutputCallback) -> "futures.Future[JobResult]":
+        return self._pool.submit(_execute, job, on_output)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+
+class ProcessPoolExecutor(Executor):
+    """Runs at most ``jobs`` programs at a time, each started by one of the worker processes.
+
+    Output is passed to ``on_output`` only when the program finished, because it is sent back with the result.
+    """
+
+    def __init__(self, jobs: int | None = None):
+        import multiprocessing  # noqa: PLC0415  # only needed by this executor
+
+        # Forking a process with threads, like this one with the readers of pipes, may deadlock the children
+        context = multiprocessing.get_context("spawn")
+        self._pool = futures.ProcessPoolExecutor(jobs or os.cpu_count() or 1, mp_context=context)
+
+    def submit(self, job: Job, on_output: OutputCallback) -> "futures.Future[JobResult]":
+        future: futures.Future[JobResult] = futures.Future()
+
+        def _replay(buffered: "futures.Future[tuple[JobResult, list[tuple[str, bytes]]]]") -> None:
+            try:
+                result, output = buffered.result()
+            except Exception as exc:  # pylint: disable=broad-except  # re-raised by ``future.result()``
+                future.set_exception(exc)
+                return
+            for name, chunk in output:
+                on_output(name, chunk)
+            future.set_result(result)
+
+        self._pool.submit(_execute_buffered, job).add_done_callback(_replay)
+        return future
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+
+class RemoteExecutor(Executor):
+    """Sends jobs to ``delfino worker`` servers, each to the reachable worker with the fewest running jobs.
+
+    Working directories of jobs are sent relative to the current directory, the root of the project, so that
+    workers run programs in their own checkouts of it. Output is streamed back as the programs write it.
+    """
+
+    def __init__(self, addresses: Sequence[str], token: str | None = None, jobs: int | None = None):
+        from delfino import worker  # noqa: PLC0415  # ``worker`` imports this module
+
+        if not addresses:
+            raise ValueError("At least one address of a worker is needed.")
+        for address in addresses:
+            worker.parse_address(address)
+
+        self._worker = worker
+        self._root = os.getcwd()
+        self._token = os.environ.get(worker.TOKEN_ENV_VAR, "") if token is None else token
+        self._running = dict.fromkeys(addresses, 0)
+        self._lock = threading.Lock()
+        self._pool = futures.ThreadPoolExecutor(
+            jobs or len(addresses) * (os.cpu_count() or 1), thread_name_prefix="delfino-remote"
+        )
+
+    def _relative_cwd(self, cwd: str | None) -> str:
+        path = os.path.relpath(os.path.abspath(cwd or os.curdir), self._root)
+        if path == os.pardir or path.startswith(os.pardir + os.sep):
+            raise ValueError(f"Working directory '{cwd}' is outside of the project, workers can't run programs in it.")
+        return path
+
+    def _acquire(self, tried: set[str]) -> str | None:
+        """Picks the least busy worker not yet tried, in the order of addresses on ties."""
+        with self._lock:
+            if not (candidates := [address for address in self._running if address not in tried]):
+                return None
+            address = min(candidates, key=self._running.__getitem__)
+            self._running[address] += 1
+            return address
+
+    def _release(self, address: str) -> None:
+        with self._lock:
+            self._running[address] -= 1
+
+    def _execute(self, job: Job, on_output: OutputCallback) -> JobResult:
+        job = replace(job, cwd=self._relative_cwd(job.cwd))
+        tried: set[str] = set()
+        errors = []
+        while (address := self._acquire(tried)) is not None:
+            tried.add(address)
+            try:
+                try:
+                    connection = self._worker.connect(address)
+                except OSError as exc:
+                    _LOG.debug(f"Worker '{address}' is not reachable: {exc}")
+                    errors.append(f"{address}: {exc}")
+                    continue
+                with connection:
+                    return self._worker.request(connection, job, self._token, on_output)
+            except OSError as exc:
+                raise self._worker.WorkerError(f"Worker '{address}' failed to run a program: {exc}") from exc
+            finally:
+                self._release(address)
+        raise self._worker.WorkerError(f"No worker is reachable ({'; '.join(errors)}).")
+
+    def submit(self, job: Job, on_output: OutputCallback) -> "futures.Future[JobResult]":
+        return self._pool.submit(self._execute, job, on_output)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+
+def create(spec: str) -> Executor:
+    """Creates an executor from its specification.
+
+    Args:
+        spec: One of ``local``, ``threads[:JOBS]``, ``processes[:JOBS]`` or ``remote:ADDRESS[,ADDRESS...]``,
+            where an address is ``tcp://HOST:PORT`` or ``unix://PATH`` of a ``delfino worker``.
+
+    Raises:
+        ValueError: If the specification is not valid.
+    """
+    kind, _, argument = spec.partition(":")
+    if kind == "local" and not argument:
+        return InProcessExecutor()
+    if kind in {"threads", "processes"} and (not argument or (argument.isdigit() and int(argument) > 0)):
+        jobs = int(argument) if argument else None
+        return ThreadPoolExecutor(jobs) if kind == "threads" else ProcessPoolExecutor(jobs)
+    if kind == "remote" and argument:
+        return RemoteExecutor(argument.split(","))
+    raise ValueError(
+        f"Invalid executor '{spec}', expected 'local', 'threads[:JOBS]', 'processes[:JOBS]' "
+        "or 'remote:ADDRESS[,ADDRESS...]'."
+    )
+
+
+_SPEC: str | None = None
+_EXECUTOR: Executor | None = None
+_PID: int = 0
+
+
+def use(spec: str) -> None:
+    """Selects the executor of programs started by ``run``, ``run_async`` and ``run_chunked``.
+
+    Raises:
+        ValueError: If the specification is not valid, see ``create``.
+    """
+    global _SPEC, _EXECUTOR, _PID  # noqa: PLW0603
+    executor = create(spec)
+    shutdown()
+    if not isinstance(executor, InProcessExecutor):  # the default, which ``run`` handles by itself
+        _SPEC, _EXECUTOR, _PID = spec, executor, os.getpid()
+
+
+def current() -> Executor | None:
+    """The executor selected by ``use``, or ``None`` if programs run directly in this process."""
+    global _EXECUTOR, _PID  # noqa: PLW0603
+    if _SPEC is None:
+        return None
+    if _PID != os.getpid():  # threads of pools don't survive forking of workers running commands in parallel
+        _EXECUTOR, _PID = create(_SPEC), os.getpid()
+    return _EXECUTOR
+
+
+def shutdown() -> None:
+    """Shuts the selected executor down and runs programs directly in this process again."""
+    global _SPEC, _EXECUTOR  # noqa: PLW0603
+    if _EXECUTOR is not None and _PID == os.getpid():
+        _EXECUTOR.shutdown()
+    _SPEC, _EXECUTOR = None, None
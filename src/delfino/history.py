@@ -0,0 +1,308 @@
+import functools
+import os
+import subprocess
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, TypeVar, cast
+
+import click
+
+from delfino.cache import make_folder, state_folder
+from delfino.utils import exit_code_of, format_table
+
+if TYPE_CHECKING:
+    import sqlite3
+
+_LOG = getLogger(__name__)
+
+_Func = TypeVar("_Func", bound=Callable[..., Any])
+
+_DATABASE_FILE: Final[str] = "history.db"
+_SCHEMA_VERSION: Final[int] = 1
+_BUSY_TIMEOUT: Final[float] = 5.0
+"""Seconds to wait for other processes writing into the database."""
+_TREND_WINDOW: Final[int] = 10
+"""Number of the most recent invocations compared with the same number of invocations before them."""
+_WRAPPED_ATTRIBUTE: Final[str] = "__delfino_history__"
+
+_SCHEMA: Final[str] = """
+CREATE TABLE IF NOT EXISTS invocations (
+    id INTEGER PRIMARY KEY,
+    command TEXT NOT NULL,
+    plugin TEXT,
+    command_group TEXT,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    exit_code INTEGER NOT NULL,
+    cache TEXT,
+    revision TEXT
+);
+CREATE INDEX IF NOT EXISTS invocations_started ON invocations (started);
+CREATE INDEX IF NOT EXISTS invocations_command ON invocations (command, started);
+"""
+
+
+@dataclass(frozen=True)
+class Invocation:
+    """A finished invocation of a command, including commands invoked from command groups."""
+
+    command: str
+    plugin: str | None
+    group: str | None
+    """Name of the command group the command was invoked from, if any."""
+    started: float
+    """Unix timestamp of the start."""
+    duration: float
+    """Duration in seconds."""
+    exit_code: int
+    cache: str | None = None
+    """``hit`` if the result was replayed from the result cache, ``miss`` if it was cached, ``None`` if not cached."""
+    revision: str | None = None
+    """Git commit checked out in the project, if any."""
+
+
+class History:
+    """Invocations of commands in a project, stored in an SQLite database in the state folder.
+
+    Every write uses its own connection and transaction, so that processes running commands in
+    parallel, including forked workers, can write at the same time.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def of_project(cls, project_root: Path) -> "History":
+        return cls(state_folder(project_root) / _DATABASE_FILE)
+
+    def _connect(self) -> "sqlite3.Connection":
+        import sqlite3  # noqa: PLC0415  # not needed unless a command finishes
+
+        make_folder(self.path.parent)
+        connection = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")  # readers do not block writers
+            connection.execute("PRAGMA synchronous = NORMAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                connection.executescript(_SCHEMA + f"PRAGMA user_version = {_SCHEMA_VERSION};")
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def add(self, invocation: Invocation, max_age_days: float | None = None, max_entries: int | None = None) -> None:
+        """Stores an invocation and removes invocations older than ``max_age_days`` or over ``max_entries``."""
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT INTO invocations (command, plugin, command_group, started, duration, exit_code, cache, "
+                    "revision) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        invocation.command,
+                        invocation.plugin,
+                        invocation.group,
+                        invocation.started,
+                        invocation.duration,
+                        invocation.exit_code,
+                        invocation.cache,
+                        invocation.revision,
+                    ),
+                )
+                if max_age_days is not None:
+                    connection.execute(
+                        "DELETE FROM invocations WHERE started < ?", (time.time() - max_age_days * 24 * 60 * 60,)
+                    )
+                if max_entries is not None:
+                    connection.execute(
+                        "DELETE FROM invocations WHERE id <= (SELECT id FROM invocations ORDER BY id DESC "
+                        "LIMIT 1 OFFSET ?)",
+                        (max_entries,),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def invocations(self, commands: Sequence[str] = (), since: float | None = None) -> list[Invocation]:
+        """Stored invocations, the oldest first.
+
+        Args:
+            commands: Names of commands to return. All commands if empty.
+            since: Unix timestamp of the oldest invocation to return.
+        """
+        if not self.path.exists():
+            return []
+
+        conditions = ["started >= ?"]
+        parameters: list[Any] = [since or 0.0]
+        if commands:
+            conditions.append(f"command IN ({', '.join('?' * len(commands))})")
+            parameters.extend(commands)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT command, plugin, command_group, started, duration, exit_code, cache, revision "
+                f"FROM invocations WHERE {' AND '.join(conditions)} ORDER BY started, id",
+                parameters,
+            ).fetchall()
+        return [Invocation(*row) for row in rows]
+
+    def typical_durations(self, commands: Sequence[str]) -> dict[str, float]:
+        """Median duration of the most recent invocations of each command. Commands never invoked are left out."""
+        durations: dict[str, list[float]] = {}
+        for invocation in self.invocations(commands):
+            durations.setdefault(invocation.command, []).append(invocation.duration)
+        return {
+            command: _median(command_durations[-_TREND_WINDOW:]) for command, command_durations in durations.items()
+        }
+
+
+@functools.cache
+def _revision(project_root: Path) -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=project_root, capture_output=True, text=True, check=False
+        )
+    except OSError:  # git is not installed
+        return None
+    return (result.stdout.strip() or None) if result.returncode == 0 else None
+
+
+@dataclass
+class _Running:
+    name: str
+    cache: str | None = None
+
+
+_RUNNING: list[_Running] = []
+"""Commands being executed in the current process, the innermost last."""
+
+
+def set_cache_status(hit: bool) -> None:
+    """Records whether the result of the innermost running command was replayed from the result cache."""
+    if _RUNNING:
+        _RUNNING[-1].cache = "hit" if hit else "miss"
+
+
+@contextmanager
+def _recording(ctx: click.Context, command_name: str, plugin: str | None) -> Iterator[None]:
+    from delfino.models.app_context import AppContext  # noqa: PLC0415
+
+    if (app_context := ctx.find_object(AppContext)) is None or not (
+        settings := app_context.pyproject_toml.tool.delfino.history
+    ).enabled:
+        yield
+        return
+
+    group = _RUNNING[-1].name if _RUNNING else None
+    revision = _revision(app_context.project_root)  # before group members are forked, to look it up only once
+    running = _Running(command_name)
+    _RUNNING.append(running)
+    started, start_time = time.time(), time.perf_counter()
+    exit_code = 0
+    try:
+        yield
+    except BaseException as exc:
+        exit_code = exit_code_of(exc)
+        raise
+    finally:
+        _RUNNING.pop()
+        invocation = Invocation(
+            command_name, plugin, group, started, time.perf_counter() - start_time, exit_code, running.cache, revision
+        )
+        try:
+            # Pruning is done once per run, by the top-level command
+            History.of_project(app_context.project_root).add(
+                invocation,
+                max_age_days=settings.max_age_days if group is None else None,
+                max_entries=settings.max_entries if group is None else None,
+            )
+        except Exception as exc:  # pylint: disable=broad-except  # history is optional
+            _LOG.debug(f"Failed to record '{command_name}' in the history: {exc}")
+
+
+def history_callback(func: _Func, command_name: str, plugin: str | None) -> _Func:
+    """Wraps a command callback to record its invocations in the history of the project, unless disabled."""
+
+    @functools.wraps(func)
+    def new_func(*args, **kwargs):
+        with _recording(click.get_current_context(), command_name, plugin):
+            return func(*args, **kwargs)
+
+    setattr(new_func, _WRAPPED_ATTRIBUTE, True)
+    return cast(_Func, new_func)
+
+
+def enable_command_history(command: click.Command, command_name: str, plugin: str | None) -> None:
+    """Records invocations of a command in the history of the project, unless they are recorded already."""
+    if command.callback is not None and not getattr(command.callback, _WRAPPED_ATTRIBUTE, False):
+        command.callback = history_callback(command.callback, command_name, plugin)
+
+
+def _percentile(sorted_values: Sequence[float], percent: int) -> float:
+    """Nearest-rank percentile of values sorted in ascending order."""
+    return sorted_values[max(-(-len(sorted_values) * percent // 100) - 1, 0)]
+
+
+def _median(values: Sequence[float]) -> float:
+    return _percentile(sorted(values), 50)
+
+
+def _trend(durations: Sequence[float]) -> str:
+    """Change of the median duration of the most recent invocations against the invocations before them."""
+    if len(durations) < 2 * _TREND_WINDOW:
+        return ""
+    recent, previous = durations[-_TREND_WINDOW:], durations[-2 * _TREND_WINDOW : -_TREND_WINDOW]
+    if not (previous_median := _median(previous)):
+        return ""
+    return f"{(_median(recent) - previous_median) / previous_median:+.0%}"
+
+
+_HEADER: Final[tuple[str, ...]] = ("Command", "Runs", "p50", "p95", "Failures", "Cache hits", "Trend")
+
+
+def format_stats(invocations: Sequence[Invocation]) -> str:
+    """Formats duration percentiles, failure and cache hit rates and trends of each command as a table."""
+    by_command: dict[str, list[Invocation]] = {}
+    for invocation in invocations:
+        by_command.setdefault(invocation.command, []).append(invocation)
+
+    rows = []
+    for command, command_invocations in sorted(by_command.items()):
+        durations = [invocation.duration for invocation in command_invocations]
+        sorted_durations = sorted(durations)
+        cached = [invocation for invocation in command_invocations if invocation.cache is not None]
+        failures = sum(1 for invocation in command_invocations if invocation.exit_code)
+        rows.append(
+            (
+                command,
+                str(len(command_invocations)),
+                f"{_percentile(sorted_durations, 50):.2f} s",
+                f"{_percentile(sorted_durations, 95):.2f} s",
+                f"{failures / len(command_invocations):.0%}",
+                f"{sum(1 for invocation in cached if invocation.cache == 'hit') / len(cached):.0%}" if cached else "",
+                _trend(durations),
+            )
+        )
+    return format_table(_HEADER, rows)
+
+
+@click.command("stats", short_help="Show durations, failure and cache hit rates of commands.")
+@click.option("--days", type=click.IntRange(min=1), help="Include only invocations from the last N days.")
+@click.argument("commands", nargs=-1)
+def stats_command(days: int | None, commands: tuple[str, ...]):
+    """Show durations, failure rates and trends of commands run in the project in the current directory.
+
+    Durations are shown as the median (p50) and the 95th percentile (p95) of all recorded invocations.
+    The trend compares the median of the last 10 invocations with the 10 invocations before them.
+    """
+    since = time.time() - days * 24 * 60 * 60 if days else None
+    if not (invocations := History.of_project(Path(os.getcwd())).invocations(commands, since)):
+        click.echo("No commands have been recorded in the history yet.")
+        return
+
+    click.echo(format_stats(invocations))
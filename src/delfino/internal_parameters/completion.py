@@ -7,12 +7,6 @@ from typing import Final
 import click
 
 from delfino.constants import ENTRY_POINT
-from delfino.validation import assert_pip_package_installed
-
-try:
-    import shellingham
-except ImportError:
-    pass
 
 
 class CompletionAlreadyInstalledError(Exception):
@@ -120,7 +114,11 @@ _COMPLETIONS: dict[str, Completion] = {
 def _get_completion_for_current_shell(
     param: click.Option | click.Parameter,
 ) -> Completion:
+    # Imported only when needed as the options are rarely used
+    from delfino.validation import assert_pip_package_installed  # noqa: PLC0415
+
     assert_pip_package_installed("shellingham", required_by=f"{param.param_type_name} --{param.name}")
+    import shellingham  # noqa: PLC0415
 
     shell: str = shellingham.detect_shell()[0]
     try:
@@ -0,0 +1,26 @@
+import click
+
+
+def _use_executor(ctx: click.Context, param: click.Option | click.Parameter, value: str | None):
+    if value is None or ctx.resilient_parsing:
+        return
+
+    from delfino import executors  # noqa: PLC0415  # not needed for most invocations
+
+    try:
+        executors.use(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), ctx=ctx, param=param) from exc
+    ctx.call_on_close(executors.shutdown)
+
+
+executor_option = click.option(
+    "--executor",
+    metavar="SPEC",
+    envvar="DELFINO_EXECUTOR",
+    is_eager=True,
+    expose_value=False,
+    callback=_use_executor,
+    help="Run programs 'local'-ly (default), in 'threads[:JOBS]', 'processes[:JOBS]', or on "
+    "'remote:ADDRESS[,ADDRESS...]' workers started by 'delfino worker'.",
+)
@@ -0,0 +1,57 @@
+from collections.abc import Callable
+from typing import Any, cast
+
+import click
+
+from delfino import startup_profile
+from delfino.constants import DEFAULT_PROFILE_TOP
+
+profile_startup_option = click.option(
+    startup_profile.OPTION,
+    is_flag=True,
+    expose_value=False,
+    envvar=startup_profile.ENV_VAR,
+    help="Print how long imports and initialization of delfino, plugins and commands take.",
+)
+"""Only documents the option. Profiling must start before any imports, see ``delfino.cli.main``."""
+
+
+def _enable_profiling(ctx: click.Context, param: click.Option | click.Parameter, value: Any):
+    if ctx.resilient_parsing or value in {None, False}:
+        return
+
+    from delfino.command_profile import enable_profiling  # noqa: PLC0415  # not needed for most invocations
+
+    enable_profiling(ctx, **({} if param.name == "profile" else {cast(str, param.name): value}))
+
+
+def profile_option(func: Callable) -> Callable:
+    """Adds options to profile executed commands, including commands invoked from groups, with ``cProfile``."""
+    for option in (
+        click.option(
+            "--profile-own-code",
+            "own_code_only",
+            is_flag=True,
+            expose_value=False,
+            callback=_enable_profiling,
+            help="With --profile, print only functions from the package of the command.",
+        ),
+        click.option(
+            "--profile-top",
+            "top",
+            type=click.IntRange(min=1),
+            expose_value=False,
+            callback=_enable_profiling,
+            help=f"Number of functions printed with --profile. [default: {DEFAULT_PROFILE_TOP}]",
+        ),
+        click.option(
+            "--profile",
+            is_flag=True,
+            expose_value=False,
+            callback=_enable_profiling,
+            help="Profile executed commands. Saves a '.pstats' file of each command in '.delfino/profiles' "
+            "and prints the functions with the highest cumulative time.",
+        ),
+    ):
+        func = option(func)
+    return func
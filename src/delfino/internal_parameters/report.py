@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import click
+
+from delfino import run_report
+
+
+def _start_report(ctx: click.Context, param: click.Option | click.Parameter, value: str | None):
+    del param
+
+    if value is None or ctx.resilient_parsing:
+        return
+
+    run_report.start(path=Path(value))
+    ctx.call_on_close(run_report.stop)
+
+
+def _show_resources(ctx: click.Context, param: click.Option | click.Parameter, value: bool):
+    del param
+
+    if not value or ctx.resilient_parsing:
+        return
+
+    run_report.start(show_resources=True)
+    ctx.call_on_close(run_report.stop)
+
+
+report_option = click.option(
+    run_report.OPTION,
+    type=click.Path(dir_okay=False, writable=True),
+    envvar=run_report.ENV_VAR,
+    is_eager=True,
+    expose_value=False,
+    callback=_start_report,
+    help="Write a JSON report of executed commands and programs with their durations and exit codes to a file.",
+)
+
+resources_option = click.option(
+    "--resources",
+    is_flag=True,
+    is_eager=True,
+    expose_value=False,
+    callback=_show_resources,
+    help="Print CPU time, memory and I/O used by programs of each command when the run ends.",
+)
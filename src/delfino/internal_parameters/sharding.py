@@ -0,0 +1,72 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import click
+
+from delfino import run_report, sharding
+from delfino.sharding import (
+    Shard,
+    ShardParamType,
+    durations_of_report,
+    enable_duration_balancing,
+    enable_file_sharding,
+    enable_sharding,
+)
+
+
+def _enable_sharding(ctx: click.Context, param: click.Option | click.Parameter, value: Shard | None):
+    del param
+
+    if value is None or ctx.resilient_parsing:
+        return
+
+    enable_sharding(ctx, value)
+    run_report.set_shard(str(value))
+
+
+def _enable_file_sharding(ctx: click.Context, param: click.Option | click.Parameter, value: bool):
+    del param
+
+    if value and not ctx.resilient_parsing:
+        enable_file_sharding(ctx)
+
+
+def _enable_duration_balancing(ctx: click.Context, param: click.Option | click.Parameter, value: Path | None):
+    if value is None or ctx.resilient_parsing:
+        return
+
+    try:
+        enable_duration_balancing(ctx, durations_of_report(value))
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), ctx, param) from exc
+
+
+def shard_option(func: Callable) -> Callable:
+    """Options to run only a part of the work, to split it between several machines."""
+    func = click.option(
+        "--shard-durations",
+        type=click.Path(exists=True, dir_okay=False, path_type=Path),
+        envvar=sharding.DURATIONS_ENV_VAR,
+        is_eager=True,
+        expose_value=False,
+        callback=_enable_duration_balancing,
+        help="With '--shard', balance shards by durations of commands in this run report of a previous run, "
+        "such as one written by 'merge-reports'. Commands are split evenly by name otherwise.",
+    )(func)
+    func = click.option(
+        "--shard-files",
+        is_flag=True,
+        is_eager=True,
+        expose_value=False,
+        callback=_enable_file_sharding,
+        help="With '--shard', run every command of a group on a part of its files instead of a part of the commands.",
+    )(func)
+    return click.option(
+        "--shard",
+        type=ShardParamType(),
+        envvar=sharding.ENV_VAR,
+        is_eager=True,
+        expose_value=False,
+        callback=_enable_sharding,
+        help="Run only the INDEX-th of TOTAL parts of commands of a group.",
+    )(func)
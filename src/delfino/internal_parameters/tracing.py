@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import click
+
+from delfino import tracing
+
+
+def _start_tracing(ctx: click.Context, param: click.Option | click.Parameter, value: str | None):
+    del param
+
+    if value is None or ctx.resilient_parsing:
+        return
+
+    tracing.start(Path(value))
+    ctx.call_on_close(tracing.stop)
+
+
+trace_option = click.option(
+    tracing.OPTION,
+    type=click.Path(dir_okay=False, writable=True),
+    envvar=tracing.ENV_VAR,
+    is_eager=True,
+    expose_value=False,
+    callback=_start_tracing,
+    help="Write a timeline of the run to a file in the Chrome Trace Event format, viewable in Perfetto.",
+)
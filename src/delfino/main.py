@@ -1,23 +1,37 @@
 import logging
 import os
 import sys
+from functools import cached_property
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, NoReturn
 
 import click
 
-from delfino.click_utils.command import CommandRegistry
-from delfino.config import ConfigValidationError, load_config
+from delfino import startup_profile, tracing
+from delfino.built_in_commands import BUILT_IN_COMMANDS, load_built_in_command
+from delfino.cache import state_folder
+from delfino.completion_manifest import CompletionManifest, manifest_path
 from delfino.constants import ENTRY_POINT, PYPROJECT_TOML_FILENAME
 from delfino.internal_parameters.completion import (
     install_completion_option,
     show_completion_option,
 )
+from delfino.internal_parameters.executor import executor_option
 from delfino.internal_parameters.help import extended_help_option
+from delfino.internal_parameters.profiling import profile_option, profile_startup_option
+from delfino.internal_parameters.report import report_option, resources_option
+from delfino.internal_parameters.sharding import shard_option
+from delfino.internal_parameters.tracing import trace_option
 from delfino.internal_parameters.verbosity import log_level_option
-from delfino.models.app_context import AppContext
-from delfino.models.pyproject_toml import PyprojectToml
-from delfino.utils import get_package_manager
+
+if TYPE_CHECKING:
+    from delfino.click_utils.command import CommandRegistry
+    from delfino.config import ConfigValidationError
+    from delfino.models.pyproject_toml import PyprojectToml
+
+# Modules depending on ``pydantic`` or ``toml`` are imported only when commands are needed, which
+# is not the case for options like ``--version``.
+# ruff: noqa: PLC0415
 
 
 class Commands(click.Group):
@@ -32,47 +46,184 @@ class Commands(click.Group):
         # to show it only when a command is executed.
         self._pyproject_toml_validation_error: ConfigValidationError | None = None
 
-        try:
-            self._pyproject_toml = load_config(self._project_root)
-        except ConfigValidationError as exc:
-            self._pyproject_toml = PyprojectToml()
-            self._pyproject_toml_validation_error = exc
+    @cached_property
+    def _pyproject_toml(self) -> "PyprojectToml":
+        from delfino.config import ConfigValidationError, load_config
+        from delfino.models.pyproject_toml import PyprojectToml
 
-        self._command_registry = CommandRegistry(
-            plugins_configs=self._pyproject_toml.tool.delfino.plugins,
-            local_command_folders=self._pyproject_toml.tool.delfino.local_command_folders,
-        )
+        with startup_profile.measure("init", "config"), tracing.span("init", "load config"):
+            try:
+                return load_config(self._project_root, cache_file=state_folder(self._project_root) / "config.pickle")
+            except ConfigValidationError as exc:
+                self._pyproject_toml_validation_error = exc
+                return PyprojectToml()
+
+    @cached_property
+    def _command_registry(self) -> "CommandRegistry":
+        from delfino.click_utils.command import CommandRegistry
+        from delfino.click_utils.plugin_index import PluginIndex
+
+        delfino_config = self._pyproject_toml.tool.delfino
+        cache_folder = state_folder(self._project_root)
+        with startup_profile.measure("init", "plugin index"), tracing.span("init", "load plugin index"):
+            plugin_index = PluginIndex.load(cache_folder / "plugins.json")
+        with startup_profile.measure("init", "command registry"), tracing.span("init", "discover commands"):
+            return CommandRegistry(
+                plugins_configs=delfino_config.plugins,
+                local_command_folders=delfino_config.local_command_folders,
+                snapshot_file=cache_folder / "registry.json",
+                lazy=delfino_config.lazy_command_loading,
+                plugin_index=plugin_index,
+            )
+
+    @property
+    def _built_in_command_names(self) -> list[str]:
+        """Built-in commands not overridden by commands of the project or plugins."""
+        return [name for name in BUILT_IN_COMMANDS if self._command_registry.get(name, None) is None]
+
+    @cached_property
+    def _completion_manifest(self) -> CompletionManifest:
+        """Loads the shell completion manifest or creates a new one if any command or the config has changed."""
+        path = manifest_path(self._project_root)
+        if (manifest := CompletionManifest.load(path)) is not None:
+            return manifest
+
+        from delfino.config import config_stamps
+
+        with startup_profile.measure("init", "completion manifest"):
+            ctx = click.Context(self)
+            visible_commands = [command for command in self._command_registry.visible_commands if not command.hidden]
+            manifest = CompletionManifest.create(
+                path,
+                self._project_root,
+                {**config_stamps(self._project_root), **self._command_registry.source_stamps},
+                ctx,
+                {
+                    **{name: BUILT_IN_COMMANDS[name].short_help for name in self._built_in_command_names},
+                    **{command.name: command.summary.get_short_help_str() for command in visible_commands},
+                },
+            )
+            for command in visible_commands:
+                if command.is_loaded:
+                    manifest.add_command(ctx, command.name, command.command)
+            manifest.save()
+        return manifest
 
     def list_commands(self, ctx: click.Context) -> list[str]:
         """Override as MultiCommand always returns []."""
         del ctx
-        return sorted(command.name for command in self._command_registry.visible_commands)
+        _ = self._completion_manifest  # keeps completion up-to-date whenever commands are discovered
+        return sorted(
+            [command.name for command in self._command_registry.visible_commands] + self._built_in_command_names
+        )
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        """Override to list commands without importing them."""
+        _ = self._completion_manifest  # keeps completion up-to-date whenever commands are discovered
+        commands = sorted(
+            [
+                (command.name, command.summary)
+                for command in self._command_registry.visible_commands
+                if not command.hidden
+            ]
+            + [
+                (name, click.Command(name, short_help=BUILT_IN_COMMANDS[name].short_help))
+                for name in self._built_in_command_names
+            ],
+            key=lambda command: command[0],
+        )
+
+        if commands:
+            limit = formatter.width - 6 - max(len(name) for name, _ in commands)
+            with formatter.section("Commands"):
+                formatter.write_dl([(name, command.get_short_help_str(limit)) for name, command in commands])
 
     def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
-        """Override to give all commands a common ``AppContext`` or fail if ``pyproject.toml`` is broken/missing."""
+        """Override to give all commands a common ``AppContext`` or fail if ``pyproject.toml`` is broken/missing.
+
+        The command module is imported only at this point, if it has been discovered lazily.
+        """
         if (cmd := self._command_registry.get(cmd_name, None)) is None:
-            return None  # command doesn't exist
+            return self._get_built_in_command(ctx, cmd_name)
+
+        with (
+            startup_profile.measure("command", cmd.module_name),
+            tracing.span("command", f"resolve {cmd_name}", module=cmd.module_name),
+        ):
+            command = cmd.command
+
+        if self._completion_manifest.lacks_options(cmd_name):
+            self._completion_manifest.add_command(ctx, cmd_name, command)
+            self._completion_manifest.save()
 
         if ctx.resilient_parsing:  # do not fail on auto-completion
-            return cmd.command
+            return command
 
         if self._pyproject_toml_validation_error:
-            click.secho(str(self._pyproject_toml_validation_error), fg="red", err=True)
-            raise click.Abort() from self._pyproject_toml_validation_error
+            self._abort_on_config_error(self._pyproject_toml_validation_error)
+
+        from delfino.command_profile import enable_command_profile
+        from delfino.history import enable_command_history
+        from delfino.models.app_context import AppContext
+        from delfino.result_cache import enable_result_cache
+        from delfino.run_report import enable_command_report
+        from delfino.utils import get_package_manager
+
+        enable_result_cache(command, getattr(cmd.package.plugin_config, cmd_name, None))
+        enable_command_profile(ctx, command, cmd_name)
+        enable_command_report(command, cmd_name, cmd.package.plugin_name)
+        enable_command_history(command, cmd_name, cmd.package.plugin_name)
+
+        from delfino.config import ConfigValidationError
+
+        try:  # sections like ``tool.poetry`` are validated only when the package manager looks at them
+            package_manager = get_package_manager(self._project_root, self._pyproject_toml)
+        except ConfigValidationError as exc:
+            self._abort_on_config_error(exc)
 
         ctx.obj = AppContext(
             project_root=self._project_root,
             pyproject_toml=self._pyproject_toml,
-            package_manager=get_package_manager(self._project_root, self._pyproject_toml),
+            package_manager=package_manager,
             plugin_config=cmd.package.plugin_config,
         )
 
-        return cmd.command
+        return command
+
+    @staticmethod
+    def _abort_on_config_error(exc: "ConfigValidationError") -> NoReturn:
+        click.secho(str(exc), fg="red", err=True)
+        raise click.Abort() from exc
+
+    def _get_built_in_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """Built-in commands need neither the config nor ``AppContext``, so they run even with a broken config."""
+        if cmd_name not in BUILT_IN_COMMANDS:
+            return None  # command doesn't exist
+
+        command = load_built_in_command(cmd_name)
+        if self._completion_manifest.lacks_options(cmd_name):
+            self._completion_manifest.add_command(ctx, cmd_name, command)
+            self._completion_manifest.save()
+        return command
+
+    def get_plugin_name(self, cmd_name: str) -> str | None:
+        """Name of the plugin providing a command, or ``None`` if the command doesn't exist."""
+        cmd = self._command_registry.get(cmd_name, None)
+        return cmd.package.plugin_name if cmd is not None else None
+
+    def resolve_command(
+        self, ctx: click.Context, args: list[str]
+    ) -> tuple[str | None, click.Command | None, list[str]]:
+        """Override to mark the end of the startup in the startup profile."""
+        resolved = super().resolve_command(ctx, args)
+        startup_profile.mark_ready()
+        return resolved
 
     def invoke(self, ctx: click.Context) -> Any:
         """Override to turn ``AssertionError`` exception into ``click.exceptions.Exit``."""
         try:
-            return super().invoke(ctx)
+            with tracing.span("command", ctx.command_path, argv=sys.argv[1:]):
+                return super().invoke(ctx)
         except AssertionError as exc:
             click.secho(
                 f"Command '{ctx.invoked_subcommand}' is misconfigured. {exc}",
@@ -91,7 +242,7 @@ class Commands(click.Group):
                     + ", ".join(
                         sorted(
                             [
-                                f"{command.package.plugin_name}/{command.command.name}"
+                                f"{command.package.plugin_name}/{command.name}"
                                 for command in self._command_registry.hidden_commands
                             ]
                         )
@@ -109,6 +260,13 @@ class Commands(click.Group):
 @log_level_option
 @show_completion_option
 @install_completion_option
+@profile_startup_option
+@profile_option
+@trace_option
+@report_option
+@resources_option
+@shard_option
+@executor_option
 def main(log_level=None):
     del log_level
 
@@ -1,9 +1,13 @@
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import Any, ClassVar, TypeVar
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationError
 
-from delfino.constants import DEFAULT_LOCAL_COMMAND_FOLDERS
+from delfino.constants import (
+    DEFAULT_HISTORY_MAX_AGE_DAYS,
+    DEFAULT_HISTORY_MAX_ENTRIES,
+    DEFAULT_LOCAL_COMMAND_FOLDERS,
+)
 
 
 class PluginConfig(BaseModel):
@@ -18,10 +22,18 @@ class PluginConfig(BaseModel):
     model_config = ConfigDict(extra="allow")
 
 
+class History(BaseModel):
+    enabled: bool = True
+    max_age_days: int = Field(default=DEFAULT_HISTORY_MAX_AGE_DAYS, gt=0)
+    max_entries: int = Field(default=DEFAULT_HISTORY_MAX_ENTRIES, gt=0)
+
+
 class Delfino(BaseModel):
     local_command_folders: tuple[Path, ...] = DEFAULT_LOCAL_COMMAND_FOLDERS
     plugins: dict[str, PluginConfig] = Field(default_factory=dict)
     command_groups: dict[str, list[str]] = Field(default_factory=dict)
+    lazy_command_loading: bool = True
+    history: History = Field(default_factory=History)
     model_config = ConfigDict(extra="allow")
 
 
@@ -41,16 +53,79 @@ class Uv(BaseModel):
 
 class BuildSystem(BaseModel):
     requires: list[str] = Field(default_factory=list)
-    build_backend: str | None = None
-    model_config = ConfigDict(extra="allow")
+    build_backend: str | None = Field(default=None, alias="build-backend")
+    model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+
+_Model = TypeVar("_Model", bound=BaseModel)
+
+
+class _LazySubTrees(BaseModel):
+    """Keeps selected sub-trees of the document as raw extra fields and validates them on first access.
 
+    Validation cost of a model then doesn't depend on the size of sections delfino doesn't need to start.
+    """
 
-class Tool(BaseModel):
-    poetry: Poetry | None = None
-    uv: Uv | None = None
+    model_config = ConfigDict(extra="allow")
+
+    _SECTION_PREFIX: ClassVar[str] = ""
+    _source: Path | None = PrivateAttr(default=None)
+
+    def _get_sub_tree(self, model: type[_Model], *keys: str) -> _Model | None:
+        """Validates the sub-tree stored under the first of the ``keys`` present and replaces the raw value with it.
+
+        Raises:
+            ConfigValidationError: If the sub-tree is not valid.
+        """
+        extra = self.__pydantic_extra__ if self.__pydantic_extra__ is not None else {}
+        for key in keys:
+            if (value := extra.get(key)) is not None:
+                if not isinstance(value, model):
+                    try:
+                        extra[key] = value = model.model_validate(value)
+                    except ValidationError as exc:
+                        raise self._validation_error(key, exc) from exc
+                return value
+        return None
+
+    def _validation_error(self, key: str, exc: ValidationError) -> ValueError:
+        from delfino.config import ConfigValidationError  # noqa: PLC0415  # ``config`` imports this module
+
+        location = f"'{self._source}', section" if self._source else "section"
+        return ConfigValidationError(
+            f"Delfino appears to be misconfigured in {location} '{self._SECTION_PREFIX}{key}': {exc}"
+        )
+
+    def _set_sub_tree(self, value: BaseModel | None, *keys: str) -> None:
+        if self.__pydantic_extra__ is None:
+            self.__pydantic_extra__ = {}
+        for key in keys:
+            self.__pydantic_extra__.pop(key, None)
+        self.__pydantic_extra__[keys[0]] = value
+
+
+class Tool(_LazySubTrees):
     delfino: Delfino = Field(default_factory=Delfino)
     model_config = ConfigDict(populate_by_name=True)
 
+    _SECTION_PREFIX: ClassVar[str] = "tool."
+
+    @property
+    def poetry(self) -> Poetry | None:
+        return self._get_sub_tree(Poetry, "poetry")
+
+    @poetry.setter
+    def poetry(self, value: Poetry | None) -> None:
+        self._set_sub_tree(value, "poetry")
+
+    @property
+    def uv(self) -> Uv | None:
+        return self._get_sub_tree(Uv, "uv")
+
+    @uv.setter
+    def uv(self, value: Uv | None) -> None:
+        self._set_sub_tree(value, "uv")
+
 
 class Project(BaseModel):
     name: str | None = None
@@ -64,11 +139,35 @@ class Project(BaseModel):
 _Default = TypeVar("_Default")
 
 
-class PyprojectToml(BaseModel):
+class PyprojectToml(_LazySubTrees):
+    """Content of the ``pyproject.toml`` file.
+
+    Only ``tool.delfino`` is validated when the model is created. The ``project``, ``build_system``,
+    ``tool.poetry`` and ``tool.uv`` sections are validated on first access, so their validation errors
+    are raised only then. Other sections are kept as extra fields without any validation.
+    """
+
     tool: Tool = Field(default_factory=Tool)
-    project: Project | None = None
-    build_system: BuildSystem | None = None
-    model_config = ConfigDict(extra="allow")
+
+    def set_source(self, path: Path) -> None:
+        """Sets the file the config was loaded from, named by validation errors of lazily validated sections."""
+        self._source = self.tool._source = path  # noqa: SLF001  # same family of models
+
+    @property
+    def project(self) -> Project | None:
+        return self._get_sub_tree(Project, "project")
+
+    @project.setter
+    def project(self, value: Project | None) -> None:
+        self._set_sub_tree(value, "project")
+
+    @property
+    def build_system(self) -> BuildSystem | None:
+        return self._get_sub_tree(BuildSystem, "build-system", "build_system")
+
+    @build_system.setter
+    def build_system(self, value: BuildSystem | None) -> None:
+        self._set_sub_tree(value, "build-system", "build_system")
 
     # Convenience properties for accessing common fields with fallbacks to legacy Poetry fields
     def _get_project_attr_with_fallback_to_tool_poetry(self, attr: str, default: _Default) -> Any | _Default:
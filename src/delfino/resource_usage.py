@@ -0,0 +1,97 @@
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Final
+
+from delfino import utils
+
+_RSS_UNIT: Final[int] = 1 if sys.platform == "darwin" else 1024
+"""``ru_maxrss`` is in bytes on macOS and in kilobytes elsewhere."""
+
+_MIB: Final[int] = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    """Resources used by finished processes, as reported by ``wait4``."""
+
+    user_time: float = 0.0
+    """CPU time spent in user mode, in seconds."""
+
+    system_time: float = 0.0
+    """CPU time spent in the kernel, in seconds."""
+
+    max_rss: int = 0
+    """Peak resident set size in bytes. The maximum of all processes when added up."""
+
+    block_input: int = 0
+    """Number of times the file system had to read from a disk."""
+
+    block_output: int = 0
+    """Number of times the file system had to write to a disk."""
+
+    voluntary_context_switches: int = 0
+    """Number of times the process gave up the CPU, typically waiting for I/O."""
+
+    involuntary_context_switches: int = 0
+    """Number of times the process was preempted, typically when CPU-bound."""
+
+    @classmethod
+    def from_rusage(cls, rusage: Any) -> "ResourceUsage":
+        return cls(
+            user_time=rusage.ru_utime,
+            system_time=rusage.ru_stime,
+            max_rss=rusage.ru_maxrss * _RSS_UNIT,
+            block_input=rusage.ru_inblock,
+            block_output=rusage.ru_oublock,
+            voluntary_context_switches=rusage.ru_nvcsw,
+            involuntary_context_switches=rusage.ru_nivcsw,
+        )
+
+    def __add__(self, other: "ResourceUsage") -> "ResourceUsage":
+        return ResourceUsage(
+            user_time=self.user_time + other.user_time,
+            system_time=self.system_time + other.system_time,
+            max_rss=max(self.max_rss, other.max_rss),
+            block_input=self.block_input + other.block_input,
+            block_output=self.block_output + other.block_output,
+            voluntary_context_switches=self.voluntary_context_switches + other.voluntary_context_switches,
+            involuntary_context_switches=self.involuntary_context_switches + other.involuntary_context_switches,
+        )
+
+
+_HEADER: Final[tuple[str, ...]] = (
+    "Command",
+    "Programs",
+    "User CPU",
+    "System CPU",
+    "Max RSS",
+    "Blocks in",
+    "Blocks out",
+    "Context switches",
+)
+
+
+def _row(name: str, programs: int, usage: ResourceUsage) -> tuple[str, ...]:
+    return (
+        name,
+        str(programs),
+        f"{usage.user_time:.2f} s",
+        f"{usage.system_time:.2f} s",
+        f"{usage.max_rss / _MIB:.1f} MiB",
+        str(usage.block_input),
+        str(usage.block_output),
+        f"{usage.voluntary_context_switches} vol, {usage.involuntary_context_switches} invol",
+    )
+
+
+def format_table(rows: Sequence[tuple[str, int, ResourceUsage]]) -> str:
+    """Formats resources used by programs of each command as a table with a total row.
+
+    Args:
+        rows: Name of a command, number of programs it executed and resources they used.
+    """
+    total = sum((usage for _, _, usage in rows), ResourceUsage())
+    return utils.format_table(
+        _HEADER, [_row(*row) for row in rows], _row("Total", sum(programs for _, programs, _ in rows), total)
+    )
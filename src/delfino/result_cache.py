@@ -0,0 +1,309 @@
+import functools
+import hashlib
+import inspect
+import io
+import os
+import pickle
+import sys
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from logging import getLogger
+from pathlib import Path
+from typing import IO, Any, Final, TypeVar, cast
+
+import click
+
+from delfino import history
+from delfino.cache import FileStamp, digest, file_stamp, read_json, state_folder, write_atomically, write_json
+from delfino.models.app_context import AppContext
+from delfino.utils import list_files
+
+_LOG = getLogger(__name__)
+
+_Func = TypeVar("_Func", bound=Callable[..., Any])
+
+CACHE_OPTION: Final[str] = "cache"
+"""Config option of a command enabling or disabling the result cache."""
+
+CACHE_INPUTS_OPTION: Final[str] = "cache_inputs"
+"""Config option of a command overriding paths the result depends on."""
+
+_CACHE_FORMAT_VERSION: Final[int] = 1
+_RESULTS_FOLDER: Final[str] = "results"
+_FILE_HASHES_FILE: Final[str] = "file_hashes.json"
+_MAX_RESULTS_PER_COMMAND: Final[int] = 8
+_CHUNK_SIZE: Final[int] = 64 * 1024
+_WRAPPED_ATTRIBUTE: Final[str] = "__delfino_result_cache__"
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """Output and exit code of a finished command."""
+
+    exit_code: int = 0
+    aborted: bool = False
+    stdout: bytes = b""
+    stderr: bytes = b""
+
+    def replay(self) -> None:
+        """Writes the output and exits the same way as the command did."""
+        for stream, output in ((sys.stdout, self.stdout), (sys.stderr, self.stderr)):
+            stream.flush()
+            if (buffer := getattr(stream, "buffer", None)) is not None:
+                buffer.write(output)
+                buffer.flush()
+            else:
+                stream.write(output.decode(errors="replace"))
+                stream.flush()
+
+        if self.aborted:
+            raise click.Abort()
+        if self.exit_code:
+            raise click.exceptions.Exit(self.exit_code)
+
+
+class _RecordedStream(io.TextIOWrapper):
+    def __init__(self, fd: int, previous: IO[str]):
+        super().__init__(
+            open(fd, "wb", closefd=False),  # noqa: SIM115
+            encoding=getattr(previous, "encoding", None),
+            errors=getattr(previous, "errors", None),
+            line_buffering=True,
+        )
+        self._previous_isatty = previous.isatty()
+
+    def isatty(self) -> bool:
+        # Keeps colored output of Python code, such as ``click.secho``, the same as without recording
+        return self._previous_isatty
+
+
+@dataclass
+class _Recorder:
+    """Copies everything written to a standard stream file descriptor into memory, while still writing it out.
+
+    The file descriptor is redirected into a pipe, so that output of subprocesses is recorded too.
+    """
+
+    fd: int
+    name: str
+    recorded: bytearray = field(default_factory=bytearray)
+
+    def __enter__(self) -> "_Recorder":
+        self._previous = cast(IO[str], getattr(sys, self.name))
+        self._previous.flush()
+        self._sink = self._get_sink()
+        self._saved_fd = os.dup(self.fd)
+        read_fd, write_fd = os.pipe()
+        os.dup2(write_fd, self.fd)
+        os.close(write_fd)
+        self._reader = threading.Thread(target=self._copy, args=(read_fd,), daemon=True)
+        self._reader.start()
+        setattr(sys, self.name, _RecordedStream(self.fd, self._previous))
+        return self
+
+    def _get_sink(self) -> Callable[[bytes], Any]:
+        try:
+            writes_to_fd = self._previous.fileno() == self.fd
+        except (AttributeError, OSError, ValueError):  # replaced stream, for example in tests
+            writes_to_fd = False
+
+        if writes_to_fd:
+            return lambda chunk: os.write(self._saved_fd, chunk)
+
+        if (buffer := getattr(self._previous, "buffer", None)) is not None:
+            return lambda chunk: (buffer.write(chunk), buffer.flush())
+
+        return lambda chunk: (self._previous.write(chunk.decode(errors="replace")), self._previous.flush())
+
+    def _copy(self, read_fd: int) -> None:
+        with open(read_fd, "rb", buffering=0) as pipe:
+            while chunk := pipe.read(_CHUNK_SIZE):
+                self.recorded.extend(chunk)
+                self._sink(chunk)
+
+    def __exit__(self, *_: object) -> None:
+        getattr(sys, self.name).flush()
+        setattr(sys, self.name, self._previous)
+        os.dup2(self._saved_fd, self.fd)  # closes the write end of the pipe
+        self._reader.join()
+        os.close(self._saved_fd)
+
+
+@contextmanager
+def _recording() -> Iterator[tuple[_Recorder, _Recorder]]:
+    with _Recorder(1, "stdout") as stdout, _Recorder(2, "stderr") as stderr:
+        yield stdout, stderr
+
+
+def _hash_file(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class _FileHashes:
+    """Content hashes of files, re-computed only for files whose stamp has changed since the last run."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._hashes: dict[str, tuple[FileStamp, str]] = {}
+        if isinstance(cached := read_json(path), dict):
+            try:
+                self._hashes = {key: (stamp, hash_) for key, (stamp, hash_) in cached.items()}
+            except (TypeError, ValueError):  # corrupted cache
+                self._hashes = {}
+        self._changed = False
+
+    def get(self, path: Path) -> str | None:
+        if (stamp := file_stamp(path)) is None:
+            return None
+
+        key = str(path.resolve())
+        if (cached := self._hashes.get(key)) is not None and cached[0] == stamp:
+            return cached[1]
+
+        try:
+            hash_ = _hash_file(path)
+        except OSError:
+            return None
+        self._hashes[key] = (stamp, hash_)
+        self._changed = True
+        return hash_
+
+    def save(self) -> None:
+        if self._changed:
+            write_json(self._path, self._hashes)
+
+
+def _input_paths(ctx: click.Context, app_context: AppContext, inputs: Sequence[str | Path] | None) -> list[Path]:
+    """Paths the result depends on, from the config, the decorator, the ``files_folders`` option or the project.
+
+    Folders stand for their files not ignored by git, see ``_input_files``.
+    """
+    command_config = _command_config(ctx, app_context)
+    if configured := command_config.get(CACHE_INPUTS_OPTION):
+        inputs = [configured] if isinstance(configured, str) else configured
+    elif inputs is None:
+        inputs = ctx.params.get("files_folders") or [app_context.project_root]
+
+    return [Path(path) for path in cast(Sequence[str | Path], inputs)]
+
+
+def _command_config(ctx: click.Context, app_context: AppContext) -> dict[str, Any]:
+    command_config = getattr(app_context.plugin_config, ctx.command.name or "", {})
+    return command_config if isinstance(command_config, dict) else {}
+
+
+def _input_files(inputs: list[Path], state: Path) -> list[Path]:
+    """Files in the inputs (see ``list_files``), except files in the ``state`` folder not given explicitly."""
+    excluded = os.path.relpath(state) + os.sep
+    return [path for path in list_files(inputs) if path in inputs or not os.path.relpath(path).startswith(excluded)]
+
+
+def _cache_key(ctx: click.Context, app_context: AppContext, func: Callable, inputs: list[Path]) -> str:
+    state = state_folder(app_context.project_root)
+    file_hashes = _FileHashes(state / _FILE_HASHES_FILE)
+    input_hashes = {str(path): file_hashes.get(path) for path in _input_files(inputs, state)}
+
+    try:
+        source_file = inspect.getsourcefile(inspect.unwrap(func))
+    except TypeError:
+        source_file = None
+    source_hash = file_hashes.get(Path(source_file)) if source_file else None
+    file_hashes.save()
+
+    return digest(
+        _CACHE_FORMAT_VERSION,
+        ctx.command_path,
+        ctx.params,
+        app_context.plugin_config.model_dump(mode="json"),
+        source_hash,
+        input_hashes,
+    )
+
+
+def _prune(results_folder: Path, command_name: str) -> None:
+    try:
+        results = sorted(results_folder.glob(f"{command_name}-*.pickle"), key=lambda path: path.stat().st_mtime_ns)
+        for result in results[:-_MAX_RESULTS_PER_COMMAND]:
+            result.unlink()
+    except OSError as exc:
+        _LOG.debug(f"Failed to prune cached results of '{command_name}': {exc}")
+
+
+def _load_result(path: Path) -> CachedResult | None:
+    try:
+        result = pickle.loads(path.read_bytes())
+    except Exception:  # pylint: disable=broad-except  # any corrupted or outdated cache is a cache miss
+        return None
+    return result if isinstance(result, CachedResult) else None
+
+
+def _run_and_record(func: Callable, args: tuple, kwargs: dict[str, Any]) -> tuple[Any, CachedResult]:
+    exit_code, aborted, return_value = 0, False, None
+    with _recording() as (stdout, stderr):
+        try:
+            return_value = func(*args, **kwargs)
+        except click.exceptions.Exit as exc:
+            exit_code = exc.exit_code
+        except click.Abort:
+            exit_code, aborted = 1, True
+        except click.ClickException as exc:
+            exc.show()
+            exit_code = exc.exit_code
+
+    return return_value, CachedResult(exit_code, aborted, bytes(stdout.recorded), bytes(stderr.recorded))
+
+
+def cache_callback(func: _Func, inputs: Sequence[str | Path] | None = None, cache_failures: bool = False) -> _Func:
+    """Wraps a command callback to replay its cached result if its inputs haven't changed. See ``cache_result``."""
+
+    @functools.wraps(func)
+    def new_func(*args, **kwargs):
+        ctx = click.get_current_context()
+        if (app_context := ctx.find_object(AppContext)) is None or _command_config(ctx, app_context).get(
+            CACHE_OPTION, True
+        ) is False:
+            return func(*args, **kwargs)
+
+        command_name = ctx.command.name or ""
+        key = _cache_key(ctx, app_context, func, _input_paths(ctx, app_context, inputs))
+        results_folder = state_folder(app_context.project_root) / _RESULTS_FOLDER
+        result_file = results_folder / f"{command_name}-{key}.pickle"
+
+        cached_result = _load_result(result_file)
+        history.set_cache_status(hit=cached_result is not None)
+        if cached_result is not None:
+            _LOG.debug(f"Replaying cached result of '{command_name}' from '{result_file}'.")
+            click.secho(
+                f"Inputs of '{command_name}' have not changed. Replaying the cached result.", dim=True, err=True
+            )
+            cached_result.replay()
+            return None
+
+        return_value, result = _run_and_record(func, args, kwargs)
+        if cache_failures or not result.exit_code:
+            write_atomically(result_file, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            _prune(results_folder, command_name)
+
+        if result.aborted:
+            raise click.Abort()
+        if result.exit_code:
+            raise click.exceptions.Exit(result.exit_code)
+        return return_value
+
+    setattr(new_func, _WRAPPED_ATTRIBUTE, True)
+    return cast(_Func, new_func)
+
+
+def enable_result_cache(command: click.Command, command_config: Any) -> None:
+    """Caches results of a command with ``cache = true`` in its config, unless the command caches them already."""
+    if not isinstance(command_config, dict) or command_config.get(CACHE_OPTION) is not True:
+        return
+
+    if command.callback is not None and not getattr(command.callback, _WRAPPED_ATTRIBUTE, False):
+        command.callback = cache_callback(command.callback)
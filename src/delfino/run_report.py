@@ -0,0 +1,362 @@
+import functools
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime, timezone
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Final, TypeVar, cast
+
+import click
+
+from delfino.resource_usage import ResourceUsage, format_table
+from delfino.utils import exit_code_of
+
+_LOG = getLogger(__name__)
+
+_Func = TypeVar("_Func", bound=Callable[..., Any])
+
+ENV_VAR: Final[str] = "DELFINO_REPORT"
+OPTION: Final[str] = "--report"
+
+_FORMAT_VERSION: Final[int] = 1
+_WRAPPED_ATTRIBUTE: Final[str] = "__delfino_run_report__"
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+def _public(record: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in record.items() if key not in {"type", "id", "parent", "_start"}}
+
+
+class RunReport:
+    """Collects commands and programs executed in a run and writes a JSON summary of them when the run ends.
+
+    Records are appended to a temporary file with a single write as soon as they are complete,
+    so that commands running in forked worker processes add their records too.
+    """
+
+    def __init__(self, argv: list[str], path: Path | None = None, show_resources: bool = False):
+        self.argv = argv
+        self.shard: str | None = None
+        """Which part of the work of a sharded run, such as ``1/3``, the report belongs to."""
+        self.path = path
+        """Where to write the report. Only collected if not set, for example to show resources."""
+        self.show_resources = show_resources
+        """Whether to print a table of resources used by programs of each command when the run ends."""
+        self.started = time.time()
+        self.running: list[str] = []
+        """IDs of commands being executed in the current process, the innermost last."""
+
+        self._owner_pid = os.getpid()
+        self._ids = itertools.count(1)
+        file_descriptor, self._records_path = tempfile.mkstemp(prefix="delfino-report-", suffix=".jsonl")
+        os.close(file_descriptor)
+        # Unbuffered, so that each record is a single append, also from forked worker processes
+        self._records_file = open(self._records_path, "a+b", buffering=0)  # noqa: SIM115  # closed in ``close``
+
+    def new_id(self) -> str:
+        return f"{os.getpid()}-{next(self._ids)}"
+
+    def add(self, record: dict[str, Any]) -> None:
+        self._records_file.write((json.dumps(record, default=str) + "\n").encode())
+
+    def _records(self) -> list[dict[str, Any]]:
+        self._records_file.seek(0)  # appends always go to the end, regardless of the position
+        data = self._records_file.read()
+        return [json.loads(line) for line in data.decode().splitlines() if line]
+
+    def summary(self) -> dict[str, Any]:
+        """Commands ordered by their start, each with the programs it executed."""
+        records = self._records()
+        commands = sorted((record for record in records if record["type"] == "command"), key=lambda r: r["_start"])
+        names = {command["id"]: command["name"] for command in commands}
+        subprocesses: dict[str | None, list[dict[str, Any]]] = defaultdict(list)
+        for record in records:
+            if record["type"] == "subprocess":
+                subprocesses[record["parent"]].append(_public(record))
+        for command in commands:
+            command["subprocesses"] = subprocesses.pop(command["id"], [])
+            usages = [
+                ResourceUsage(**process["resources"]) for process in command["subprocesses"] if process.get("resources")
+            ]
+            command["resources"] = asdict(sum(usages, ResourceUsage())) if usages else None
+
+        ended = time.time()
+        top_level = [command for command in commands if command["parent"] is None]
+        return {
+            "version": _FORMAT_VERSION,
+            "argv": self.argv,
+            "shard": self.shard,
+            "started_at": _timestamp(self.started),
+            "ended_at": _timestamp(ended),
+            "duration": ended - self.started,
+            "exit_code": top_level[0]["exit_code"] if top_level else None,
+            "commands": [{**_public(command), "group": names.get(command["parent"])} for command in commands],
+            # Executed outside of any command, for example by a command which failed to be recorded
+            "subprocesses": [record for records_ in subprocesses.values() for record in records_],
+        }
+
+    def close(self) -> None:
+        if os.getpid() == self._owner_pid:
+            summary = self.summary()
+            if self.path is not None:
+                try:
+                    self.path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+                except OSError as exc:
+                    click.secho(f"Failed to write the run report to '{self.path}': {exc}", fg="red", err=True)
+            if self.show_resources:
+                _show_resources(summary["commands"])
+        self._records_file.close()
+        if os.getpid() == self._owner_pid:
+            try:
+                os.unlink(self._records_path)
+            except OSError as exc:
+                _LOG.debug(f"Failed to remove the temporary file '{self._records_path}': {exc}")
+
+
+def _show_resources(commands: list[dict[str, Any]]) -> None:
+    rows = [
+        (command["name"], len(command["subprocesses"]), ResourceUsage(**(command["resources"] or {})))
+        for command in commands
+        if command["status"] in {"passed", "failed"}
+    ]
+    click.echo(f"\nResources used by programs of each command:\n{format_table(rows)}", err=True)
+
+
+_REPORT: RunReport | None = None
+_SHARD: str | None = None
+
+
+def start(path: Path | None = None, show_resources: bool = False) -> RunReport:
+    """Starts collecting the report of the run, or updates the report being collected already."""
+    global _REPORT  # noqa: PLW0603
+    if _REPORT is None:
+        _REPORT = RunReport(sys.argv[1:])
+        _REPORT.shard = _SHARD
+    if path is not None:
+        _REPORT.path = path
+    _REPORT.show_resources |= show_resources
+    return _REPORT
+
+
+def set_shard(shard: str) -> None:
+    """Marks the report as a partial report of a sharded run, also if reporting is enabled later."""
+    global _SHARD  # noqa: PLW0603
+    _SHARD = shard
+    if _REPORT is not None:
+        _REPORT.shard = shard
+
+
+def stop() -> None:
+    """Writes the report, if reporting is enabled."""
+    global _REPORT  # noqa: PLW0603
+    if _REPORT is None:
+        return
+    _REPORT.close()
+    _REPORT = None
+
+
+def _timed_record(report: RunReport, record_type: str, started: float, duration: float, **fields: Any) -> None:
+    report.add(
+        {
+            "type": record_type,
+            **fields,
+            "parent": fields.get("parent", report.running[-1] if report.running else None),
+            "started_at": _timestamp(started),
+            "ended_at": _timestamp(started + duration),
+            "duration": duration,
+            "_start": started,
+        }
+    )
+
+
+@contextmanager
+def command_record(name: str, plugin: str | None) -> Iterator[None]:
+    """Records a command executed in the block with its exit code, if reporting is enabled."""
+    if (report := _REPORT) is None:
+        yield
+        return
+
+    command_id, parent = report.new_id(), report.running[-1] if report.running else None
+    report.running.append(command_id)
+    started, start_time = time.time(), time.perf_counter()
+    exit_code = 0
+    try:
+        yield
+    except BaseException as exc:
+        exit_code = exit_code_of(exc)
+        raise
+    finally:
+        report.running.pop()
+        _timed_record(
+            report,
+            "command",
+            started,
+            time.perf_counter() - start_time,
+            id=command_id,
+            parent=parent,
+            name=name,
+            plugin=plugin,
+            status="failed" if exit_code else "passed",
+            reason=None,
+            exit_code=exit_code,
+        )
+
+
+def record_skipped(name: str, plugin: str | None, status: str, reason: str) -> None:
+    """Records a command which was not executed.
+
+    Args:
+        name: Name of the command.
+        plugin: Name of the plugin of the command, if known.
+        status: ``skipped`` or ``disabled``.
+        reason: Why the command was not executed.
+    """
+    if (report := _REPORT) is not None:
+        _timed_record(
+            report,
+            "command",
+            time.time(),
+            0.0,
+            id=report.new_id(),
+            name=name,
+            plugin=plugin,
+            status=status,
+            reason=reason,
+            exit_code=None,
+        )
+
+
+@contextmanager
+def subprocess_record(args: str) -> Iterator[dict[str, Any]]:
+    """Records a program executed in the block, if reporting is enabled.
+
+    Yields:
+        A record to update with the ``exit_code`` of the program.
+    """
+    record: dict[str, Any] = {"command": args, "exit_code": None}
+    if (report := _REPORT) is None:
+        yield record
+        return
+
+    started, start_time = time.time(), time.perf_counter()
+    try:
+        yield record
+    except BaseException as exc:
+        record["error"] = type(exc).__name__
+        raise
+    finally:
+        _timed_record(report, "subprocess", started, time.perf_counter() - start_time, **record)
+
+
+def report_callback(func: _Func, command_name: str, plugin: str | None) -> _Func:
+    """Wraps a command callback to record it in the run report, if reporting is enabled."""
+
+    @functools.wraps(func)
+    def new_func(*args, **kwargs):
+        with command_record(command_name, plugin):
+            return func(*args, **kwargs)
+
+    setattr(new_func, _WRAPPED_ATTRIBUTE, True)
+    return cast(_Func, new_func)
+
+
+def enable_command_report(command: click.Command, command_name: str, plugin: str | None) -> None:
+    """Records a command resolved in a run with reporting enabled, unless it is recorded already."""
+    if _REPORT is None or command.callback is None:
+        return
+
+    if not getattr(command.callback, _WRAPPED_ATTRIBUTE, False):
+        command.callback = report_callback(command.callback, command_name, plugin)
+
+
+def _shard_index(report: dict[str, Any], source: str) -> tuple[int, int]:
+    index, _, total = str(report.get("shard") or "").partition("/")
+    if report.get("version") != _FORMAT_VERSION or not index.isdigit() or not total.isdigit():
+        raise ValueError(f"'{source}' is not a report of a shard of a run with the '--shard' option.")
+    return int(index), int(total)
+
+
+def merge_reports(reports: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """Combines partial reports of all shards of a run into one report.
+
+    Commands are listed by shard, each with the shard it ran in. Commands which were not executed
+    for the same reason in all shards, such as disabled commands, are listed only once.
+
+    Args:
+        reports: Partial reports by their file names.
+
+    Raises:
+        ValueError: If any report is not a report of a shard or the reports are of differently sharded runs.
+    """
+    shards = sorted((_shard_index(report, source), report) for source, report in reports.items())
+    if len({total for (_, total), _ in shards}) != 1:
+        raise ValueError("Reports are of runs split into different numbers of shards.")
+    if len({index for (index, _), _ in shards}) != len(shards):
+        raise ValueError("There are several reports of the same shard.")
+
+    total = shards[0][0][1]
+    missing = sorted(set(range(1, total + 1)) - {index for (index, _), _ in shards})
+    commands, skipped = [], set()
+    for _, report in shards:
+        for command in report["commands"]:
+            if command["status"] in {"skipped", "disabled"}:
+                if (key := (command["name"], command["group"], command["status"], command["reason"])) in skipped:
+                    continue
+                skipped.add(key)
+            commands.append({**command, "shard": report["shard"]})
+
+    exit_codes = [report["exit_code"] for _, report in shards if report["exit_code"] is not None]
+    started = min(datetime.fromisoformat(report["started_at"]) for _, report in shards)
+    ended = max(datetime.fromisoformat(report["ended_at"]) for _, report in shards)
+    return {
+        "version": _FORMAT_VERSION,
+        "shards": [
+            {key: report[key] for key in ("shard", "argv", "started_at", "ended_at", "duration", "exit_code")}
+            for _, report in shards
+        ],
+        "missing_shards": [f"{index}/{total}" for index in missing],
+        "started_at": started.isoformat(),
+        "ended_at": ended.isoformat(),
+        "duration": (ended - started).total_seconds(),
+        # Same as the exit code of a run of all shards one by one, which didn't stop on the first failure
+        "exit_code": next((exit_code for exit_code in exit_codes if exit_code), 1 if missing else 0),
+        "commands": commands,
+        "subprocesses": [process for _, report in shards for process in report["subprocesses"]],
+    }
+
+
+@click.command("merge-reports", short_help="Merge run reports of shards into one report.")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    required=True,
+    help="File to write the merged report to.",
+)
+@click.argument("reports", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+def merge_reports_command(output: Path, reports: tuple[Path, ...]):
+    """Merge reports written with '--report' by each shard of a run split with '--shard' into one report."""
+    try:
+        merged = merge_reports({str(path): json.loads(path.read_text(encoding="utf-8")) for path in reports})
+    except (ValueError, KeyError, TypeError) as exc:
+        raise click.ClickException(f"Failed to merge the reports: {exc}") from exc
+
+    output.write_text(json.dumps(merged, indent=2) + "\n", encoding="utf-8")
+    if merged["missing_shards"]:
+        click.secho(f"Reports of shards {', '.join(merged['missing_shards'])} are missing.", fg="yellow", err=True)
+    statuses = [command["status"] for command in merged["commands"]]
+    click.echo(
+        f"Merged {len(merged['shards'])} reports into '{output}': {statuses.count('passed')} commands passed, "
+        f"{statuses.count('failed')} failed, exit code {merged['exit_code']}."
+    )
@@ -0,0 +1,160 @@
+import heapq
+import json
+import os
+import statistics
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Final
+
+import click
+
+from delfino.utils import list_files
+
+ENV_VAR: Final[str] = "DELFINO_SHARD"
+DURATIONS_ENV_VAR: Final[str] = "DELFINO_SHARD_DURATIONS"
+
+_SHARD_META_KEY: Final[str] = "delfino.shard"
+_SHARD_FILES_META_KEY: Final[str] = "delfino.shard_files"
+_SHARD_DURATIONS_META_KEY: Final[str] = "delfino.shard_durations"
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One of ``total`` parts of the work, numbered from 1."""
+
+    index: int
+    total: int
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.total}"
+
+
+class ShardParamType(click.ParamType):
+    name = "INDEX/TOTAL"
+
+    def convert(self, value: Any, param: click.Parameter | None, ctx: click.Context | None) -> Shard:
+        if isinstance(value, Shard):
+            return value
+
+        index, _, total = str(value).partition("/")
+        try:
+            shard = Shard(int(index), int(total))
+        except ValueError:
+            self.fail(f"'{value}' is not in the INDEX/TOTAL format, such as '1/3'.", param, ctx)
+        if not 1 <= shard.index <= shard.total:
+            self.fail(f"Shard index must be between 1 and {shard.total}, got {shard.index}.", param, ctx)
+        return shard
+
+
+def enable_sharding(ctx: click.Context, shard: Shard) -> None:
+    """Runs only a part of commands of groups in the whole invocation.
+
+    Args:
+        ctx: Any context of the invocation.
+        shard: Which part of the work to run.
+    """
+    ctx.meta[_SHARD_META_KEY] = shard
+
+
+def enable_file_sharding(ctx: click.Context) -> None:
+    """Splits ``files_folders`` of commands accepting them between shards, instead of the whole commands.
+
+    It has no effect unless sharding is enabled too, regardless of the order of the calls.
+    """
+    ctx.meta[_SHARD_FILES_META_KEY] = True
+
+
+def enable_duration_balancing(ctx: click.Context, durations: dict[str, float]) -> None:
+    """Balances commands between shards by their ``durations``, which must be the same in all shards."""
+    ctx.meta[_SHARD_DURATIONS_META_KEY] = durations
+
+
+def get_shard(ctx: click.Context) -> Shard | None:
+    """Part of the work to run, or ``None`` if the work is not sharded."""
+    return ctx.meta.get(_SHARD_META_KEY)
+
+
+def shards_files(ctx: click.Context) -> bool:
+    """Whether ``files_folders`` of commands are split between shards."""
+    return get_shard(ctx) is not None and ctx.meta.get(_SHARD_FILES_META_KEY, False)
+
+
+def get_shard_durations(ctx: click.Context) -> dict[str, float]:
+    """Durations of commands to balance shards by, empty if commands are split evenly."""
+    return ctx.meta.get(_SHARD_DURATIONS_META_KEY, {})
+
+
+def durations_of_report(path: Path) -> dict[str, float]:
+    """Median durations of executed commands in a run report, written with ``--report`` or by ``merge-reports``.
+
+    Raises:
+        ValueError: If the file is not a run report.
+    """
+    try:
+        commands = json.loads(path.read_text(encoding="utf-8"))["commands"]
+        durations = defaultdict(list)
+        for command in commands:
+            if command["status"] in {"passed", "failed"}:
+                durations[command["name"]].append(float(command["duration"]))
+    except (OSError, KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"'{path}' is not a run report: {exc}") from exc
+    return {name: statistics.median(values) for name, values in durations.items()}
+
+
+def split_by_weight(items: Sequence[str], weights: Sequence[float], total: int) -> list[list[str]]:
+    """Splits items into ``total`` parts of similar total weight. The split depends only on the arguments.
+
+    Items are assigned from the heaviest one to the part with the lowest total weight so far. Ties are
+    broken by the item and by the part order.
+
+    Returns:
+        Items of each part, in the order of ``items``.
+    """
+    parts: list[list[str]] = [[] for _ in range(total)]
+    loads = [(0.0, part) for part in range(total)]
+    for weight, item in sorted(zip(weights, items, strict=True), key=lambda pair: (-pair[0], pair[1])):
+        load, part = heapq.heappop(loads)
+        parts[part].append(item)
+        heapq.heappush(loads, (load + weight, part))
+
+    order = {item: position for position, item in enumerate(items)}
+    return [sorted(part, key=order.__getitem__) for part in parts]
+
+
+def commands_of_shard(command_names: Sequence[str], durations: dict[str, float], shard: Shard) -> list[str]:
+    """Commands to run in a shard, balanced by their durations. The split depends only on the arguments.
+
+    Commands without a known duration are assumed to take the median duration of the others,
+    or all the same time if none is known, which splits them evenly in the order of their names.
+    """
+    known = sorted(durations[name] for name in command_names if name in durations)
+    default = known[len(known) // 2] if known else 1.0
+    weights = [durations.get(name, default) for name in command_names]
+    return split_by_weight(command_names, weights, shard.total)[shard.index - 1]
+
+
+def _file_size(path: str) -> int:
+    try:
+        return max(os.path.getsize(path), 1)
+    except OSError:
+        return 1
+
+
+def files_of_shard(files_folders: Sequence[str], shard: Shard, suffixes: Sequence[str] = ()) -> tuple[str, ...]:
+    """Files to pass to a command in a shard, balanced by their size.
+
+    Folders are expanded into their files not ignored by git (see ``list_files``), only those with one
+    of the ``suffixes`` if any are given. If no files or folders are given, files of the current directory
+    with the ``suffixes`` are split.
+    """
+    paths = [Path(path) for path in files_folders or (os.curdir,)]
+    files = sorted(
+        {
+            os.path.normpath(file)
+            for file in list_files(paths)
+            if not suffixes or file.suffix in suffixes or file in paths
+        }
+    )
+    return tuple(split_by_weight(files, [_file_size(file) for file in files], shard.total)[shard.index - 1])
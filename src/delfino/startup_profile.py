@@ -0,0 +1,128 @@
+import builtins
+import os
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Final, TextIO
+
+# This module is imported before anything else when profiling. It must not import anything but the standard library.
+
+ENV_VAR: Final[str] = "DELFINO_PROFILE_STARTUP"
+OPTION: Final[str] = "--profile-startup"
+
+_SECTIONS: Final[dict[str, str]] = {
+    "init": "Initialization",
+    "plugin": "Plugin entry points",
+    "command": "Command modules",
+    "import": "Imports (own time of top-level packages)",
+}
+_MAX_IMPORTS: Final[int] = 20
+
+
+class StartupProfile:
+    """Records how long the start of the program takes.
+
+    Imports are measured by wrapping ``builtins.__import__``. Time of each import statement
+    is attributed to the top-level package of the imported module, excluding time of nested
+    imports. Other timings are recorded explicitly with ``measure``.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.ready: float | None = None
+        self.timings: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._nested_import_times: list[float] = []
+        self._original_import = builtins.__import__
+
+    def install(self) -> None:
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        builtins.__import__ = self._original_import
+
+    def _timed_import(self, name, globals_=None, locals_=None, fromlist=(), level=0):
+        if level or name in sys.modules:  # relative and repeated imports are attributed to the importing module
+            return self._original_import(name, globals_, locals_, fromlist, level)
+
+        start = time.perf_counter()
+        self._nested_import_times.append(0.0)
+        try:
+            return self._original_import(name, globals_, locals_, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            own_time = elapsed - self._nested_import_times.pop()
+            if self._nested_import_times:
+                self._nested_import_times[-1] += elapsed
+            self.timings["import"][name.partition(".")[0]] += own_time
+
+    def record(self, category: str, name: str, seconds: float) -> None:
+        self.timings[category][name] += seconds
+
+    def report(self, stream: TextIO) -> None:
+        startup_time = (self.ready or time.perf_counter()) - self.started
+        stream.write(f"Startup profile, {startup_time * 1000:.1f} ms until the command started:\n")
+        for category, title in _SECTIONS.items():
+            if not (timings := self.timings.get(category)):
+                continue
+            ordered = sorted(timings.items(), key=lambda item: item[1], reverse=True)
+            stream.write(f"\n  {title}:\n")
+            for name, seconds in ordered[:_MAX_IMPORTS] if category == "import" else ordered:
+                stream.write(f"    {seconds * 1000:8.1f} ms  {name}\n")
+            if category == "import" and len(ordered) > _MAX_IMPORTS:
+                remaining = sum(seconds for _, seconds in ordered[_MAX_IMPORTS:])
+                stream.write(f"    {remaining * 1000:8.1f} ms  {len(ordered) - _MAX_IMPORTS} other packages\n")
+        stream.flush()
+
+
+_PROFILE: StartupProfile | None = None
+
+
+def requested(args: list[str]) -> bool:
+    """Whether profiling is enabled by the environment variable or the command line option."""
+    if os.environ.get(ENV_VAR, "").lower() not in {"", "0", "false", "no"}:
+        return True
+    return OPTION in args[: args.index("--") if "--" in args else None]
+
+
+def start() -> StartupProfile:
+    global _PROFILE  # noqa: PLW0603
+    _PROFILE = StartupProfile()
+    _PROFILE.install()
+    return _PROFILE
+
+
+def mark_ready() -> None:
+    """Marks the end of the startup, when the command is about to be executed."""
+    if _PROFILE is not None and _PROFILE.ready is None:
+        _PROFILE.ready = time.perf_counter()
+
+
+def stop() -> None:
+    """Stops profiling and prints the report to stderr."""
+    global _PROFILE  # noqa: PLW0603
+    if _PROFILE is None:
+        return
+    _PROFILE.uninstall()
+    _PROFILE.report(sys.stderr)
+    _PROFILE = None
+
+
+@contextmanager
+def measure(category: str, name: str) -> Iterator[None]:
+    """Records duration of the block if profiling is enabled.
+
+    Args:
+        category: One of ``init``, ``plugin`` or ``command``.
+        name: What is measured, such as a plugin name or a module name.
+    """
+    if _PROFILE is None:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        _PROFILE.record(category, name, time.perf_counter() - start_time)
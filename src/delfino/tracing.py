@@ -0,0 +1,113 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Final
+
+ENV_VAR: Final[str] = "DELFINO_TRACE"
+OPTION: Final[str] = "--trace"
+
+
+def _now() -> float:
+    """Microseconds of a monotonic clock, which is shared by forked processes."""
+    return time.perf_counter_ns() / 1000
+
+
+class Trace:
+    """Writes spans of a run into a file in the Chrome Trace Event format, viewable in Perfetto or ``chrome://tracing``.
+
+    Every event is appended to the file with a single write as soon as it ends, so that processes
+    forked to run commands in parallel write into the same file without any coordination. Each
+    process is shown separately and each thread has its own track.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._owner_pid = self._pid = os.getpid()
+        self._ids = itertools.count(1)
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        os.write(self._fd, b"[" + json.dumps(self._process_name("delfino")).encode())
+
+    def _process_name(self, name: str) -> dict[str, Any]:
+        return {"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": name}}
+
+    def add(self, *events: dict[str, Any]) -> None:
+        chunks = []
+        if os.getpid() != self._pid:  # first event in a forked process
+            self._pid = os.getpid()
+            chunks.append(self._process_name("delfino worker"))
+
+        thread_id = threading.get_native_id()
+        chunks.extend({**event, "pid": self._pid, "tid": thread_id} for event in events)
+        os.write(self._fd, "".join(",\n" + json.dumps(chunk, default=str) for chunk in chunks).encode())
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def close(self) -> None:
+        if os.getpid() == self._owner_pid:
+            os.write(self._fd, b"\n]\n")
+        os.close(self._fd)
+
+
+_TRACE: Trace | None = None
+
+
+def enabled() -> bool:
+    return _TRACE is not None
+
+
+def start(path: Path) -> Trace:
+    global _TRACE  # noqa: PLW0603
+    stop()
+    _TRACE = Trace(path)
+    return _TRACE
+
+
+def stop() -> None:
+    """Finishes the trace file, if tracing is enabled."""
+    global _TRACE  # noqa: PLW0603
+    if _TRACE is None:
+        return
+    _TRACE.close()
+    _TRACE = None
+
+
+@contextmanager
+def span(category: str, name: str, concurrent: bool = False, **args: Any) -> Iterator[dict[str, Any]]:
+    """Records duration of the block if tracing is enabled. Costs a single check otherwise.
+
+    Args:
+        category: Kind of the span, such as ``init``, ``command``, ``group`` or ``subprocess``.
+        name: What the span measures, such as a command name.
+        concurrent: Whether the span may overlap with other spans in the same thread without being
+            nested in them, for example in coroutines. It is shown on a separate track then.
+        **args: Details shown with the span.
+
+    Yields:
+        ``args``, which can be updated in the block, for example with an exit code.
+    """
+    if _TRACE is None:
+        yield args
+        return
+
+    start_time = _now()
+    try:
+        yield args
+    except BaseException as exc:
+        args.setdefault("error", type(exc).__name__)
+        if isinstance(exit_code := getattr(exc, "exit_code", None), int):  # for example ``click.exceptions.Exit``
+            args.setdefault("exit_code", exit_code)
+        raise
+    finally:
+        if (trace := _TRACE) is not None:
+            event = {"name": name, "cat": category, "ts": start_time, "args": args}
+            if concurrent:
+                span_id = trace.next_id()
+                trace.add({**event, "ph": "b", "id": span_id}, {**event, "ph": "e", "id": span_id, "ts": _now()})
+            else:
+                trace.add({**event, "ph": "X", "dur": _now() - start_time})
@@ -1,13 +1,24 @@
+import os
+import subprocess
+from collections.abc import Iterator, Sequence
+from logging import getLogger
 from pathlib import Path
+from typing import TYPE_CHECKING, Final
 
 from delfino.constants import PackageManager
-from delfino.models.pyproject_toml import PyprojectToml
+
+if TYPE_CHECKING:
+    from delfino.models.pyproject_toml import PyprojectToml
+
+_LOG = getLogger(__name__)
 
 ArgsList = list[str | bytes | Path]
 ArgsType = str | bytes | list
 
+_SKIPPED_FOLDERS: Final[frozenset[str]] = frozenset({"__pycache__", "node_modules"})
 
-def get_package_manager(project_root: Path, pyproject_toml: PyprojectToml) -> PackageManager:
+
+def get_package_manager(project_root: Path, pyproject_toml: "PyprojectToml") -> PackageManager:
     # Check build-system requires for poetry and uv
     if pyproject_toml.tool.poetry is not None or (project_root / "poetry.lock").exists():
         return PackageManager.POETRY
@@ -26,3 +37,72 @@ def get_package_manager(project_root: Path, pyproject_toml: PyprojectToml) -> Pa
         return PackageManager.PIPENV
 
     return PackageManager.UNKNOWN
+
+
+def iter_files(path: Path) -> Iterator[Path]:
+    """The file itself or files in the folder in a stable order, skipping hidden folders and caches."""
+    if path.is_file():
+        yield path
+        return
+
+    for root, folders, files in os.walk(path):
+        folders[:] = sorted(
+            folder for folder in folders if not folder.startswith(".") and folder not in _SKIPPED_FOLDERS
+        )
+        for file in sorted(files):
+            yield Path(root, file)
+
+
+def list_files(paths: Sequence[Path]) -> list[Path]:
+    """Sorted files given explicitly and files in the folders tracked by git or untracked but not ignored.
+
+    Outside of a git repository, all files in the folders are used, except hidden folders and caches
+    (see ``iter_files``). Files given explicitly are kept even if ignored.
+    """
+    files = {path for path in paths if path.is_file()}
+    if not (folders := [path for path in paths if path not in files]):
+        return sorted(files)
+
+    try:
+        listed = subprocess.run(
+            ["git", "ls-files", "--cached", "--others", "--exclude-standard", "-z", "--", *map(str, folders)],
+            capture_output=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as exc:
+        _LOG.debug(f"Failed to list files not ignored by git, using all files of the folders: {exc}")
+        files.update(file for folder in folders for file in iter_files(folder))
+    else:
+        files.update(Path(os.fsdecode(path)) for path in listed.split(b"\0") if path)
+    return sorted(files)
+
+
+def exit_code_of(exc: BaseException) -> int:
+    """Exit code of the program if the exception is not handled."""
+    if isinstance(exc, SystemExit):
+        return exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+    exit_code = getattr(exc, "exit_code", None)  # for example ``click.exceptions.Exit``
+    return exit_code if isinstance(exit_code, int) else 1
+
+
+def format_table(header: Sequence[str], rows: Sequence[Sequence[str]], footer: Sequence[str] | None = None) -> str:
+    """Formats rows as a plain text table. The first column is aligned to the left and the others to the right.
+
+    Args:
+        header: Names of the columns.
+        rows: Cells of each row.
+        footer: Cells of a row separated from the others, such as a total.
+    """
+    table = [header, *rows, *([footer] if footer is not None else [])]
+    widths = [max(len(row[column]) for row in table) for column in range(len(header))]
+    separator = "  ".join("-" * width for width in widths)
+    lines = [
+        "  ".join(
+            cell.ljust(width) if column == 0 else cell.rjust(width)
+            for column, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in table
+    ]
+    if footer is None:
+        return "\n".join([lines[0], separator, *lines[1:]])
+    return "\n".join([lines[0], separator, *lines[1:-1], separator, lines[-1]])
@@ -0,0 +1,264 @@
+import hmac
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+from dataclasses import asdict
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Final
+
+import click
+
+from delfino.execution import execute_job
+from delfino.executors import Job, JobResult, OutputCallback
+from delfino.resource_usage import ResourceUsage
+
+_LOG = getLogger(__name__)
+
+TOKEN_ENV_VAR: Final[str] = "DELFINO_WORKER_TOKEN"
+"""Environment variable with a secret shared by workers and their clients. Required to listen on TCP."""
+
+_FRAME_HEADER: Final[struct.Struct] = struct.Struct("!cI")
+_JOB: Final[bytes] = b"J"
+_RESULT: Final[bytes] = b"R"
+_STREAMS: Final[dict[str, bytes]] = {"stdout": b"O", "stderr": b"E"}
+_STREAM_NAMES: Final[dict[bytes, str]] = {kind: name for name, kind in _STREAMS.items()}
+_MAX_JOB_SIZE: Final[int] = 16 * 1024 * 1024
+_CONNECT_TIMEOUT: Final[float] = 10.0
+
+
+class WorkerError(click.ClickException):
+    """A job could not be run by a remote worker."""
+
+
+def parse_address(address: str) -> tuple[str, Any]:
+    """Splits ``tcp://HOST:PORT`` or ``unix://PATH`` into the scheme and an address for ``socket``.
+
+    Raises:
+        ValueError: If the address has neither form.
+    """
+    scheme, separator, location = address.partition("://")
+    if separator and scheme == "unix" and location:
+        return scheme, location
+    host, _, port = location.rpartition(":")
+    if separator and scheme == "tcp" and host and port.isdigit():
+        return scheme, (host.strip("[]"), int(port))
+    raise ValueError(f"Invalid address of a worker '{address}', expected 'tcp://HOST:PORT' or 'unix://PATH'.")
+
+
+def connect(address: str) -> socket.socket:
+    scheme, location = parse_address(address)
+    if scheme == "tcp":
+        connection = socket.create_connection(location, _CONNECT_TIMEOUT)
+    else:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.settimeout(_CONNECT_TIMEOUT)
+        try:
+            connection.connect(location)
+        except OSError:
+            connection.close()
+            raise
+    connection.settimeout(None)  # programs may run for a long time without any output
+    return connection
+
+
+def _send_frame(connection: socket.socket, kind: bytes, payload: bytes) -> None:
+    connection.sendall(_FRAME_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    while view:
+        if not (received := connection.recv_into(view)):
+            raise ConnectionError("Connection closed by the other side.")
+        view = view[received:]
+    return bytes(buffer)
+
+
+def _receive_frame(connection: socket.socket, max_size: int | None = None) -> tuple[bytes, bytes]:
+    kind, size = _FRAME_HEADER.unpack(_receive_exactly(connection, _FRAME_HEADER.size))
+    if max_size is not None and size > max_size:
+        raise ConnectionError(f"Frame of {size} bytes is over the limit of {max_size} bytes.")
+    return kind, _receive_exactly(connection, size)
+
+
+def request(connection: socket.socket, job: Job, token: str, on_output: OutputCallback) -> JobResult:
+    """Sends a job to a worker and passes output of its program to ``on_output`` until it finishes.
+
+    Raises:
+        subprocess.TimeoutExpired: If the program didn't finish within the timeout of the job.
+        WorkerError: If the worker refused or failed to run the job.
+        OSError: If the connection failed.
+    """
+    _send_frame(connection, _JOB, json.dumps({"token": token, "job": asdict(job)}).encode())
+    while (frame := _receive_frame(connection))[0] != _RESULT:
+        if (name := _STREAM_NAMES.get(frame[0])) is None:
+            raise ConnectionError(f"Unexpected frame {frame[0]!r} from the worker.")
+        on_output(name, frame[1])
+
+    result = json.loads(frame[1])
+    if result.get("timeout"):
+        raise subprocess.TimeoutExpired(job.args, job.timeout or 0)
+    if "error" in result:
+        raise WorkerError(f"Worker failed to run the program: {result['error']}")
+    resources = ResourceUsage(**result["resources"]) if result["resources"] else None
+    return JobResult(result["returncode"], resources)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "_JobServer"
+
+    def _job(self, message: dict[str, Any]) -> Job:
+        job = Job(**message["job"])
+        cwd = os.path.normpath(os.path.join(self.server.root, job.cwd or os.curdir))
+        if os.path.commonpath([cwd, self.server.root]) != self.server.root:
+            raise ValueError(f"Working directory '{job.cwd}' is outside of the project.")
+        return Job(**{**asdict(job), "cwd": cwd})
+
+    def _run(self, job: Job) -> dict[str, Any]:
+        lock = threading.Lock()
+        disconnected = False
+
+        def _on_output(name: str, chunk: bytes) -> None:
+            nonlocal disconnected
+            with lock:
+                if disconnected:
+                    return
+                try:
+                    _send_frame(self.request, _STREAMS[name], chunk)
+                except OSError:  # the program still has to finish, its output is dropped
+                    disconnected = True
+
+        with self.server.slots:
+            try:
+                result = execute_job(job, _on_output)
+            except subprocess.TimeoutExpired:
+                return {"error": f"Timed out after {job.timeout} seconds.", "timeout": True}
+            except OSError as exc:  # for example when the program doesn't exist
+                return {"error": str(exc)}
+        return {"returncode": result.returncode, "resources": asdict(result.resources) if result.resources else None}
+
+    def handle(self) -> None:
+        try:
+            message = json.loads(_receive_frame(self.request, _MAX_JOB_SIZE)[1])
+        except (OSError, ValueError) as exc:
+            _LOG.warning(f"Invalid job from {self.client_address or 'a client'}: {exc}")
+            return
+
+        if not hmac.compare_digest(str(message.get("token", "")).encode(), self.server.token.encode()):
+            _LOG.warning(f"Job with an invalid token from {self.client_address or 'a client'}.")
+            result: dict[str, Any] = {"error": "Invalid token."}
+        else:
+            try:
+                job = self._job(message)
+            except (KeyError, TypeError, ValueError) as exc:
+                result = {"error": f"Invalid job: {exc}"}
+            else:
+                _LOG.info(f"Running {job.args!r} in '{job.cwd}'.")
+                result = self._run(job)
+
+        try:
+            _send_frame(self.request, _RESULT, json.dumps(result).encode())
+        except OSError as exc:
+            _LOG.warning(f"Result of a job could not be sent: {exc}")
+
+
+class _JobServer(socketserver.ThreadingMixIn, socketserver.BaseServer):
+    daemon_threads = True
+    root: str
+    token: str
+    slots: threading.BoundedSemaphore
+
+
+class _TCPServer(_JobServer, socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+class _UnixServer(_JobServer, socketserver.UnixStreamServer):
+    pass
+
+
+class Worker:
+    """Server running programs of jobs sent by ``RemoteExecutor``, at most ``jobs`` of them at a time.
+
+    Anyone who can connect to the worker and knows the token can run any program as the user of the worker.
+    """
+
+    def __init__(self, address: str, root: Path, jobs: int, token: str):
+        scheme, location = parse_address(address)
+        if scheme == "tcp" and not token:
+            raise ValueError(f"Set {TOKEN_ENV_VAR} to listen on TCP, anyone could run any program otherwise.")
+
+        self._location = location
+        self._server: _TCPServer | _UnixServer
+        if scheme == "tcp":
+            self._server = _TCPServer(location, _Handler)
+        else:
+            Path(location).unlink(missing_ok=True)  # left behind by a killed worker
+            self._server = _UnixServer(location, _Handler)
+        self._server.root = os.path.abspath(root)
+        self._server.token = token
+        self._server.slots = threading.BoundedSemaphore(jobs)
+
+    @property
+    def address(self) -> str:
+        """Address of the worker, with the port chosen by the system if listening on port 0."""
+        if isinstance(self._server, _TCPServer):
+            return f"tcp://{self._location[0]}:{self._server.server_address[1]}"
+        return f"unix://{self._location}"
+
+    def serve(self) -> None:
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self._server, _UnixServer):
+            Path(self._location).unlink(missing_ok=True)
+
+
+@click.command("worker", short_help="Run programs sent by remote executors.")
+@click.option(
+    "--listen",
+    "address",
+    required=True,
+    help="Address to listen on, 'tcp://HOST:PORT' or 'unix://PATH'. Listening on TCP requires "
+    f"{TOKEN_ENV_VAR} to be set.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default="number of CPUs",
+    help="Maximum number of programs running at once.",
+)
+@click.option(
+    "--root",
+    type=click.Path(exists=True, file_okay=False),
+    default=os.curdir,
+    help="Checkout of the project, which working directories of jobs are relative to. [default: current directory]",
+)
+def worker_command(address: str, jobs: int, root: str):
+    """Run programs sent by 'delfino --executor remote:ADDRESS' from other machines or processes."""
+    try:
+        worker = Worker(address, Path(root), jobs, os.environ.get(TOKEN_ENV_VAR, ""))
+    except ValueError as exc:
+        raise click.UsageError(str(exc)) from exc
+    except OSError as exc:
+        raise click.ClickException(f"Cannot listen on '{address}': {exc}") from exc
+
+    click.echo(f"Delfino worker listening on {worker.address} ({jobs} jobs).")
+    sys.stdout.flush()  # the address with a port chosen by the system is read by whoever started the worker
+    try:
+        worker.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.shutdown()
@@ -27,10 +27,10 @@ class FakeCommandFile(BaseModel):
 
 
 @contextmanager
-def demo_commands(
+def demo_commands_folder(
     folder_name: Path = DEFAULT_LOCAL_COMMAND_FOLDERS[0],
     fake_command_files: Iterable[FakeCommandFile] = (FakeCommandFile(),),
-) -> Iterator[list[str]]:
+) -> Iterator[Path]:
     with tempfile.TemporaryDirectory() as tmpdir:
         root_dir = tmpdir / folder_name
         root_dir.mkdir(exist_ok=True)
@@ -39,6 +39,15 @@ def demo_commands(
             (root_dir / fake_command_file.filename).write_text(fake_command_file.content)
         sys.path.append(tmpdir)
         try:
-            yield [fake_command_file.command_name for fake_command_file in fake_command_files]
+            yield root_dir
         finally:
             sys.path.pop()
+
+
+@contextmanager
+def demo_commands(
+    folder_name: Path = DEFAULT_LOCAL_COMMAND_FOLDERS[0],
+    fake_command_files: Iterable[FakeCommandFile] = (FakeCommandFile(),),
+) -> Iterator[list[str]]:
+    with demo_commands_folder(folder_name, fake_command_files):
+        yield [fake_command_file.command_name for fake_command_file in fake_command_files]
@@ -0,0 +1,232 @@
+import logging
+import subprocess
+from pathlib import Path
+
+import click
+import pytest
+
+from delfino.click_utils.command_groups import execute_commands_group
+from delfino.decorators import files_folders_option, pass_app_context
+from delfino.models import AppContext, PluginConfig
+
+
+@click.group()
+def root():
+    pass
+
+
+@root.command()
+@files_folders_option(defaults=["src", "tests"], suffixes=[".py"])
+def lint(files_folders):
+    click.echo(" ".join(files_folders))
+
+
+@root.command()
+@files_folders_option
+def spell(files_folders):
+    click.echo(" ".join(files_folders) or "everything")
+
+
+@root.command()
+def typecheck(**kwargs):
+    del kwargs  # options of the group command
+    click.echo("typecheck")
+
+
+@root.command()
+@files_folders_option
+@click.pass_context
+@pass_app_context()
+def verify(click_context: click.Context, app_context: AppContext, **kwargs):
+    execute_commands_group("verify", click_context, app_context, **kwargs)
+
+
+def _git(*args: str) -> None:
+    subprocess.run(["git", *args], check=True, capture_output=True)
+
+
+def _write(path: str, content: str = "") -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(content)
+
+
+@pytest.fixture()
+def repository(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _git("init", "-q", "-b", "main")
+    _git("config", "user.email", "test@example.com")
+    _git("config", "user.name", "Test")
+    for path in ["src/a.py", "src/b.py", "tests/test_a.py", "README.md"]:
+        _write(path)
+    _git("add", ".")
+    _git("commit", "-q", "-m", "Initial commit")
+    return tmp_path
+
+
+@pytest.fixture()
+def invoke(runner, context_obj, repository):
+    def _invoke(*args: str, config: dict | None = None, members: tuple[str, ...] = ()):
+        context_obj.plugin_config = PluginConfig(command_groups={"verify": ["lint", *members]}, **(config or {}))
+        return runner.invoke(root, list(args), obj=context_obj)
+
+    return _invoke
+
+
+class TestChangedFilesMode:
+    @staticmethod
+    def test_should_pass_changed_and_untracked_files(invoke):
+        _write("src/a.py", "changed")
+        _write("src/new.py")
+        Path("src/b.py").unlink()
+
+        result = invoke("lint", "--changed")
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == "src/a.py src/new.py\n"
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "args, config, expected",
+        [
+            pytest.param(["-f", "tests"], None, "tests/test_a.py", id="command line"),
+            pytest.param([], {"lint": {"files_folders": ["tests"]}}, "tests/test_a.py", id="config"),
+            pytest.param(["-f", "src/a.py"], None, "src/a.py", id="file"),
+        ],
+    )
+    def test_should_restrict_changed_files_to_files_folders(invoke, args, config, expected):
+        _write("src/a.py", "changed")
+        _write("tests/test_a.py", "changed")
+
+        result = invoke("lint", "--changed", *args, config=config)
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == f"{expected}\n"
+
+    @staticmethod
+    def test_should_skip_command_without_changed_files(invoke):
+        _write("README.md", "changed")
+
+        result = invoke("lint", "--changed", "-f", "src")
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == ""
+        assert "No changed files to run 'lint' on" in result.stderr
+
+    @staticmethod
+    def test_should_restrict_changed_files_to_defaults_and_suffixes_of_command(invoke):
+        _write("README.md", "changed")
+        _write("docs/conf.py", "changed")
+
+        result = invoke("lint", "--changed")
+
+        assert result.exit_code == 0, result.output
+        assert "No changed files to run 'lint' on" in result.stderr
+
+    @staticmethod
+    def test_should_not_restrict_files_of_command_without_defaults(invoke):
+        _write("src/a.py", "changed")
+
+        result = invoke("spell", "--changed")
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == "everything\n"
+
+    @staticmethod
+    def test_should_pass_files_changed_since_common_ancestor(invoke):
+        _git("checkout", "-q", "-b", "feature")
+        _write("src/a.py", "committed on feature")
+        _git("commit", "-q", "-am", "Feature")
+        _git("checkout", "-q", "main")
+        _write("src/b.py", "committed on main")
+        _git("commit", "-q", "-am", "Main")
+        _git("checkout", "-q", "feature")
+
+        result = invoke("lint", "--since", "main", "--changed")
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == "src/a.py\n"
+
+    @staticmethod
+    def test_should_fail_on_unknown_ref(invoke):
+        result = invoke("lint", "--since", "unknown")
+
+        assert result.exit_code == click.UsageError.exit_code
+        assert "Failed to list changed files" in result.output
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "args, config, expected",
+        [
+            pytest.param([], None, "src/a.py tests/test_a.py\n", id="all changed"),
+            pytest.param(["-f", "tests"], None, "tests/test_a.py\n", id="group files folders"),
+            pytest.param([], {"lint": {"files_folders": ["src"]}}, "src/a.py\n", id="member config"),
+        ],
+    )
+    def test_should_pass_changed_files_to_group_members(invoke, args, config, expected):
+        _write("src/a.py", "changed")
+        _write("tests/test_a.py", "changed")
+
+        result = invoke("verify", "--changed", *args, config=config)
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == expected
+
+    @staticmethod
+    def test_should_run_group_members_without_defaults_on_all_files(invoke):
+        _write("src/a.py", "changed")
+
+        result = invoke("verify", "--changed", members=("spell",))
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == "src/a.py\neverything\n"
+
+    @staticmethod
+    def test_should_skip_group_members_without_changed_files(invoke):
+        _write("src/a.py", "changed")
+
+        result = invoke("verify", "--changed", config={"lint": {"files_folders": ["tests"]}})
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == ""
+        assert "No changed files to run 'lint' on" in result.stderr
+
+
+class TestPathFilteredGroupMembers:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "paths",
+        [
+            pytest.param(["src"], id="folder"),
+            pytest.param("src/", id="single folder"),
+            pytest.param(["*.py"], id="glob"),
+        ],
+    )
+    def test_should_run_command_when_its_paths_changed(invoke, paths):
+        _write("src/a.py", "changed")
+
+        result = invoke("verify", "--changed", members=("typecheck",), config={"typecheck": {"paths": paths}})
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == "src/a.py\ntypecheck\n"
+
+    @staticmethod
+    def test_should_skip_command_when_none_of_its_paths_changed(invoke, caplog):
+        caplog.set_level(logging.INFO)
+        _write("src/a.py", "changed")
+
+        result = invoke(
+            "verify", "--changed", members=("typecheck",), config={"typecheck": {"paths": ["clients", "*.ts"]}}
+        )
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == "src/a.py\n"
+        assert (
+            "Skipping command 'typecheck' because none of its paths (clients, *.ts) changed since 'HEAD'" in caplog.text
+        )
+
+    @staticmethod
+    def test_should_ignore_paths_without_changed_files_mode(invoke):
+        result = invoke("verify", members=("typecheck",), config={"typecheck": {"paths": ["clients"]}})
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout == "\ntypecheck\n"
@@ -0,0 +1,190 @@
+import time
+from pathlib import Path
+
+import click
+import pytest
+
+from delfino.click_utils.command_groups import execute_commands_group
+from delfino.decorators import fast_first_option, jobs_option, pass_app_context
+from delfino.history import History, Invocation
+from delfino.models import AppContext, PluginConfig
+
+
+class GroupPluginConfig(PluginConfig):
+    verify: dict = {}
+
+
+FAIL_EXIT_CODE = 3
+_MARKERS_FOLDER: dict[str, Path] = {}
+
+
+def _write_marker(name: str, sleep: float = 0.0) -> None:
+    """Records when the command finished, also from worker processes which don't share the test output."""
+    time.sleep(sleep)
+    (_MARKERS_FOLDER["path"] / name).write_text(str(time.monotonic()))
+
+
+@click.group()
+@click.pass_context
+def root(click_context: click.Context):
+    del click_context
+
+
+@root.command()
+def slow():
+    click.echo("slow started")
+    _write_marker("slow", sleep=0.5)
+    click.echo("slow finished")
+
+
+@root.command()
+def fast():
+    click.echo("fast started")
+    _write_marker("fast", sleep=0.5)
+    click.echo("fast finished", err=True)
+
+
+@root.command()
+def abort():
+    _write_marker("abort")
+    raise click.Abort()
+
+
+@root.command()
+def fail():
+    _write_marker("fail")
+    raise click.exceptions.Exit(FAIL_EXIT_CODE)
+
+
+@root.command()
+@jobs_option
+@fast_first_option
+@click.pass_context
+@pass_app_context(GroupPluginConfig)
+def verify(click_context: click.Context, app_context: AppContext, **kwargs):
+    execute_commands_group("verify", click_context, app_context, **kwargs)
+
+
+@pytest.fixture()
+def invoke_group(runner, context_obj, tmp_path):
+    def _invoke(members: list[str], *args: str, group_config: dict | None = None):
+        context_obj.plugin_config = GroupPluginConfig(command_groups={"verify": members}, verify=group_config or {})
+        _MARKERS_FOLDER["path"] = tmp_path
+        start = time.monotonic()
+        result = runner.invoke(root, ["verify", *args], obj=context_obj)
+        return result, time.monotonic() - start
+
+    return _invoke
+
+
+@pytest.fixture()
+def record_durations(context_obj, tmp_path):
+    """Stores durations of commands in the history of a new project."""
+
+    def _record(**durations: float) -> None:
+        context_obj.project_root = tmp_path
+        history = History.of_project(tmp_path)
+        for command, duration in durations.items():
+            history.add(Invocation(command, None, "verify", time.time(), duration, 0))
+
+    return _record
+
+
+class TestExecuteCommandsGroup:
+    @staticmethod
+    def test_should_run_commands_one_by_one_by_default(invoke_group, tmp_path):
+        result, duration = invoke_group(["slow", "fast"])
+
+        assert result.exit_code == 0, result.output
+        assert duration >= 1.0
+        assert float((tmp_path / "slow").read_text()) < float((tmp_path / "fast").read_text())
+
+    @staticmethod
+    def test_should_stop_on_first_failure_in_sequential_mode(invoke_group, tmp_path):
+        result, _ = invoke_group(["fail", "fast"])
+
+        assert result.exit_code == FAIL_EXIT_CODE
+        assert not (tmp_path / "fast").exists()
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "args, group_config",
+        [
+            pytest.param(["--jobs", "2"], None, id="jobs option"),
+            pytest.param([], {"parallel": True}, id="parallel config"),
+            pytest.param([], {"jobs": 2}, id="jobs config"),
+        ],
+    )
+    def test_should_run_commands_in_parallel(invoke_group, tmp_path, monkeypatch, args, group_config):
+        monkeypatch.setattr("os.cpu_count", lambda: 8)
+        result, duration = invoke_group(["slow", "fast"], *args, group_config=group_config)
+
+        assert result.exit_code == 0, result.output
+        assert duration < 1.0
+        assert (tmp_path / "slow").exists()
+        assert (tmp_path / "fast").exists()
+
+    @staticmethod
+    def test_should_prefer_jobs_option_over_parallel_config(invoke_group):
+        _, duration = invoke_group(["slow", "fast"], "--jobs", "1", group_config={"parallel": True})
+
+        assert duration >= 1.0
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "members, expected_exit_code",
+        [
+            pytest.param(["fast", "fail", "abort"], FAIL_EXIT_CODE, id="exit"),
+            pytest.param(["fast", "abort", "fail"], 1, id="abort"),
+        ],
+    )
+    def test_should_exit_with_first_failure_in_group_order_after_all_commands_finish(
+        invoke_group, tmp_path, members, expected_exit_code
+    ):
+        result, _ = invoke_group(members, "--jobs", "3")
+
+        assert result.exit_code == expected_exit_code
+        assert all((tmp_path / member).exists() for member in members)
+
+    @staticmethod
+    def test_should_show_output_of_parallel_commands_in_group_order(invoke_group):
+        result, _ = invoke_group(["slow", "fast"], "--jobs", "2")
+
+        assert result.exit_code == 0, result.output
+        assert result.output.splitlines() == ["slow started", "slow finished", "fast started", "fast finished"]
+
+    @staticmethod
+    def test_should_keep_standard_error_of_parallel_commands_separate(invoke_group):
+        result, _ = invoke_group(["slow", "fast"], "--jobs", "2")
+
+        assert result.exit_code == 0, result.output
+        assert result.stdout.splitlines() == ["slow started", "slow finished", "fast started"]
+        assert result.stderr == "fast finished\n"
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "durations, fail_finished_last",
+        [
+            pytest.param({"slow": 10.0, "fast": 5.0, "fail": 1.0}, True, id="history"),
+            pytest.param({}, False, id="no history"),
+        ],
+    )
+    def test_should_start_longest_commands_first_in_parallel(
+        invoke_group, record_durations, tmp_path, durations, fail_finished_last
+    ):
+        record_durations(**durations)
+
+        result, _ = invoke_group(["fail", "fast", "slow"], "--jobs", "2")
+
+        assert result.exit_code == FAIL_EXIT_CODE
+        assert (float((tmp_path / "fail").read_text()) > float((tmp_path / "fast").read_text())) == fail_finished_last
+
+    @staticmethod
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_should_run_and_show_fastest_commands_first_with_fast_first(invoke_group, record_durations, jobs):
+        record_durations(slow=1.0, fast=5.0)
+
+        result, _ = invoke_group(["fast", "slow"], "--jobs", jobs, "--fast-first")
+
+        assert result.exit_code == 0, result.output
+        assert result.output.splitlines() == ["slow started", "slow finished", "fast started", "fast finished"]
@@ -0,0 +1,90 @@
+import os
+import pstats
+import subprocess
+import sys
+
+import pytest
+
+from delfino.daemon import DISABLE_ENV_VAR
+
+_COMMANDS = """
+import click
+
+from delfino.click_utils.command_groups import execute_commands_group
+from delfino.decorators import jobs_option, pass_app_context
+from delfino.models import PluginConfig
+
+
+def busy_lint():
+    return sum(range(1000))
+
+
+def busy_test():
+    return sum(range(1000))
+
+
+@click.command()
+def lint():
+    busy_lint()
+
+
+@click.command()
+def test():
+    busy_test()
+
+
+@click.command()
+@jobs_option
+@click.pass_context
+@pass_app_context(PluginConfig)
+def verify(click_context, app_context, **kwargs):
+    execute_commands_group("verify", click_context, app_context, **kwargs)
+"""
+
+
+@pytest.fixture()
+def project_root(tmp_path):
+    (tmp_path / "commands").mkdir()
+    (tmp_path / "commands" / "__init__.py").write_text(_COMMANDS)
+    (tmp_path / "pyproject.toml").write_text('[tool.delfino]\ncommand_groups = { verify = ["lint", "test"] }\n')
+    return tmp_path
+
+
+def _delfino(project_root, *args: str) -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        [sys.executable, "-m", "delfino.main", *args],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, DISABLE_ENV_VAR: "1"},
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def _functions(path) -> set[str]:
+    return {function for _, _, function in pstats.Stats(str(path)).stats}  # type: ignore[attr-defined]
+
+
+class TestProfile:
+    @staticmethod
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_should_save_profile_of_each_command_of_group(project_root, jobs):
+        result = _delfino(project_root, "--profile", "verify", "--jobs", jobs)
+        profiles = project_root / ".delfino" / "profiles"
+
+        for command in ("lint", "test", "verify"):
+            # Output of commands running in parallel is multiplexed into stdout
+            assert f"Profile of '{command}' saved to '{profiles / command}.pstats'" in result.stdout + result.stderr
+        assert "busy_lint" in _functions(profiles / "lint.pstats")
+        assert "busy_test" in _functions(profiles / "test.pstats")
+        assert not {"busy_lint", "busy_test"} & _functions(profiles / "verify.pstats")
+
+    @staticmethod
+    def test_should_print_only_top_functions_of_own_code(project_root):
+        result = _delfino(project_root, "--profile-own-code", "--profile-top", "1", "lint")
+        listed = result.stderr.split("filename:lineno(function)")[1].strip().splitlines()
+
+        assert len(listed) == 1
+        assert os.path.join("commands", "__init__.py") in listed[0]
@@ -1,5 +1,6 @@
 import logging
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -10,6 +11,7 @@ from tests.integration.fixtures import (
     ALL_PLUGINS_ALL_COMMANDS,
     FakeCommandFile,
     demo_commands,
+    demo_commands_folder,
 )
 
 
@@ -270,3 +272,96 @@ class TestCommandRegistryLocalCommands:
         with demo_commands(module_path) as command_names:
             registry = CommandRegistry({}, **kwargs)
             assert set(command_names) <= {command.name for command in registry.visible_commands}
+
+
+class TestCommandRegistryLazyLoading:
+    @staticmethod
+    def test_should_not_import_command_modules_until_command_is_accessed():
+        model_path = Path("lazy_not_imported")
+        fake_command_files = [
+            FakeCommandFile(
+                content_template="import click\n"
+                '@click.command()\ndef {command_name}():\n    """Demo help."""\n'
+                "raise ImportError('Module imported')\n"
+            )
+        ]
+        with demo_commands(model_path, fake_command_files):
+            registry = CommandRegistry({}, local_command_folders=[model_path], lazy=True)
+
+            command = registry["demo"]
+            assert not command.is_loaded
+            assert command.summary.get_short_help_str() == "Demo help."
+            with pytest.raises(ImportError, match="Module imported"):
+                _ = command.command
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "model_path, content_template",
+        [
+            pytest.param(
+                Path("lazy_imported"), "import click\n{command_name} = click.Command('demo')\n", id="assignment"
+            ),
+            pytest.param(
+                Path("lazy_imported_block"),
+                "import click\nif True:\n    @click.command()\n    def {command_name}():\n        pass\n",
+                id="definition in a block",
+            ),
+        ],
+    )
+    def test_should_import_command_modules_which_cannot_be_inspected(model_path, content_template):
+        fake_command_files = [FakeCommandFile(content_template=content_template)]
+        with demo_commands(model_path, fake_command_files):
+            registry = CommandRegistry({}, local_command_folders=[model_path], lazy=True)
+
+            assert registry["demo"].is_loaded
+
+    @staticmethod
+    def test_should_restore_commands_from_snapshot_without_importing_them(tmp_path):
+        model_path = Path("lazy_snapshot")
+        snapshot_file = tmp_path / "registry.json"
+        with demo_commands(model_path):
+            CommandRegistry({}, local_command_folders=[model_path], snapshot_file=snapshot_file, lazy=True)
+            registry = CommandRegistry({}, local_command_folders=[model_path], snapshot_file=snapshot_file, lazy=True)
+
+            assert not registry["demo"].is_loaded
+            assert registry["demo"].command.name == "demo"
+
+
+class TestCommandRegistrySnapshot:
+    @staticmethod
+    def test_should_restore_commands_without_discovering_them_again(tmp_path):
+        model_path = Path("snapshot_restore")
+        snapshot_file = tmp_path / "registry.json"
+        with demo_commands(model_path) as command_names:
+            CommandRegistry({}, local_command_folders=[model_path], snapshot_file=snapshot_file)
+
+            with patch("delfino.click_utils.command.find_commands", side_effect=AssertionError("Not cached")):
+                registry = CommandRegistry({}, local_command_folders=[model_path], snapshot_file=snapshot_file)
+
+            assert {command.name for command in registry.visible_commands} == set(command_names)
+
+    @staticmethod
+    def test_should_discover_commands_again_when_command_files_change(tmp_path):
+        model_path = Path("snapshot_files_change")
+        snapshot_file = tmp_path / "registry.json"
+        with demo_commands_folder(model_path) as root_dir:
+            CommandRegistry({}, local_command_folders=[model_path], snapshot_file=snapshot_file)
+            new_command_file = FakeCommandFile(filename="other.py", command_name="other")
+            (root_dir / new_command_file.filename).write_text(new_command_file.content)
+
+            registry = CommandRegistry({}, local_command_folders=[model_path], snapshot_file=snapshot_file)
+
+            assert {command.name for command in registry.visible_commands} == {"demo", "other"}
+
+    @staticmethod
+    def test_should_discover_commands_again_when_config_changes(tmp_path):
+        model_path = Path("snapshot_config_change")
+        snapshot_file = tmp_path / "registry.json"
+        with demo_commands(model_path) as command_names:
+            CommandRegistry({}, local_command_folders=[model_path], snapshot_file=snapshot_file)
+
+            plugins_configs = {CommandRegistry.LOCAL_PLUGIN_NAME: PluginConfig(disable_commands=set(command_names))}
+            registry = CommandRegistry(plugins_configs, local_command_folders=[model_path], snapshot_file=snapshot_file)
+
+            assert not registry.visible_commands
+            assert {command.name for command in registry.hidden_commands} == set(command_names)
@@ -0,0 +1,187 @@
+import os
+import signal
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from delfino.daemon import DISABLE_ENV_VAR, socket_path, supported
+
+pytestmark = pytest.mark.skipif(not supported(), reason="Daemon requires Unix sockets with file descriptor passing.")
+
+FAIL_EXIT_CODE = 3
+PRIVATE_MODE = 0o700
+ABORTED_EXIT_CODE = 1
+TIMEOUT = 10.0
+_CLI = [sys.executable, "-c", "import sys; from delfino.cli import main; sys.argv[0] = 'delfino'; main()"]
+_COMMANDS = """
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import click
+
+@click.command()
+@click.option("--fail", is_flag=True)
+def hello(fail):
+    click.echo(f"{GREETING} {os.environ.get('WHO')} from {os.getpid()}")
+    subprocess.run(["echo", "from subprocess"], check=True)
+    click.echo("to stderr", err=True)
+    sys.exit(FAIL_EXIT_CODE if fail else 0)
+
+@click.command()
+@click.argument("pid_file")
+def sleep_forever(pid_file):
+    child = subprocess.Popen(["sleep", "60"])
+    Path(pid_file + ".tmp").write_text(str(child.pid))
+    Path(pid_file + ".tmp").rename(pid_file)
+    time.sleep(60)
+"""
+
+
+def _write_commands(project_root: Path, greeting: str) -> None:
+    (project_root / "commands" / "__init__.py").write_text(
+        f"GREETING = {greeting!r}\nFAIL_EXIT_CODE = {FAIL_EXIT_CODE}\n{_COMMANDS}"
+    )
+
+
+@pytest.fixture()
+def project_root(tmp_path):
+    (tmp_path / "commands").mkdir()
+    (tmp_path / "pyproject.toml").write_text("[tool.delfino]\n")
+    _write_commands(tmp_path, "hello")
+    return tmp_path
+
+
+@pytest.fixture()
+def delfino(project_root):
+    def _delfino(*args: str, **env: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [*_CLI, *args],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            env={**os.environ, **env},
+            check=False,
+        )
+
+    yield _delfino
+    _delfino("daemon", "stop")
+
+
+def _daemon_pid(result: subprocess.CompletedProcess) -> int:
+    return int(result.stdout.split(" from ")[1].split()[0])
+
+
+def _wait_until(condition) -> bool:
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.1)
+    return True
+
+
+def _is_running(pid: int) -> bool:
+    state = subprocess.run(["ps", "-o", "stat=", "-p", str(pid)], capture_output=True, text=True, check=False)
+    return bool(state.stdout.strip()) and not state.stdout.strip().startswith("Z")
+
+
+class TestDaemon:
+    @staticmethod
+    def test_should_manage_daemon_lifecycle(delfino, project_root):
+        assert delfino("daemon", "status").returncode == 1
+
+        started = delfino("daemon", "start")
+        assert started.returncode == 0, started.stderr
+        assert socket_path(project_root).exists()
+        assert "is running" in delfino("daemon", "status").stdout
+        assert "already running" in delfino("daemon", "start").stdout
+
+        stopped = delfino("daemon", "stop")
+        assert stopped.stdout == "Delfino daemon stopped.\n"
+        assert not socket_path(project_root).exists()
+        assert delfino("daemon", "status").returncode == 1
+
+    @staticmethod
+    def test_should_run_commands_in_daemon_with_client_env_and_streams(delfino):
+        delfino("daemon", "start")
+
+        first, second = delfino("hello", WHO="first"), delfino("hello", WHO="second")
+
+        assert first.returncode == 0, first.stderr
+        assert first.stdout.startswith("hello first from ")
+        assert first.stdout.endswith("from subprocess\n")
+        assert first.stderr == "to stderr\n"
+        assert second.stdout.startswith("hello second from ")
+        assert _daemon_pid(first) != _daemon_pid(second)  # each command runs in a new worker
+
+    @staticmethod
+    def test_should_return_exit_code_of_command(delfino):
+        delfino("daemon", "start")
+
+        assert delfino("hello", "--fail").returncode == FAIL_EXIT_CODE
+
+    @staticmethod
+    def test_should_reload_when_commands_change(delfino, project_root):
+        delfino("daemon", "start")
+        _write_commands(project_root, "changed")
+
+        # The first invocation may run in the client while the daemon restarts
+        assert delfino("hello").stdout.startswith("changed ")
+        time.sleep(1.5)
+        assert delfino("hello").stdout.startswith("changed ")
+
+    @staticmethod
+    def test_should_not_restart_when_files_are_added_to_project_root(delfino, project_root):
+        delfino("daemon", "start")
+        (project_root / "newfile.txt").touch()
+
+        time.sleep(1.5)
+        assert "up 0 s" not in delfino("daemon", "status").stdout  # a restart keeps the pid, but resets the uptime
+
+    @staticmethod
+    def test_should_run_in_client_when_disabled(delfino):
+        delfino("daemon", "start")
+        client_pid_marker = delfino("hello", **{DISABLE_ENV_VAR: "1"})
+
+        assert client_pid_marker.returncode == 0
+        assert client_pid_marker.stdout.startswith("hello ")
+
+    @staticmethod
+    def test_should_ignore_socket_accessible_by_other_users(delfino, project_root):
+        delfino("daemon", "start")
+        socket_path(project_root).parent.chmod(0o755)
+
+        assert delfino("daemon", "status").returncode == 1
+        assert "already running" in delfino("daemon", "start").stdout  # restores the permissions
+        assert stat.S_IMODE(socket_path(project_root).parent.stat().st_mode) == PRIVATE_MODE
+
+    @staticmethod
+    def test_should_not_use_daemon_of_another_interpreter(delfino, project_root):
+        delfino("daemon", "start")
+
+        assert socket_path(project_root).exists()
+        with patch.object(sys, "executable", "/other/venv/bin/python"):
+            assert not socket_path(project_root).exists()
+
+    @staticmethod
+    def test_should_interrupt_programs_started_by_the_command(delfino, project_root, tmp_path_factory):
+        delfino("daemon", "start")
+        pid_file = tmp_path_factory.mktemp("interrupt") / "pid"
+        client = subprocess.Popen([*_CLI, "sleep-forever", str(pid_file)], cwd=project_root)
+
+        try:
+            assert _wait_until(pid_file.exists)
+            client.send_signal(signal.SIGINT)
+
+            assert client.wait(timeout=TIMEOUT) == ABORTED_EXIT_CODE  # as ``click`` exits on Ctrl+C
+            assert _wait_until(lambda: not _is_running(int(pid_file.read_text())))
+        finally:
+            client.kill()
@@ -1,6 +1,12 @@
+import os
+import subprocess
+import sys
+
 import toml
 
+from delfino.built_in_commands import BUILT_IN_COMMANDS, load_built_in_command
 from delfino.constants import ENTRY_POINT, PYPROJECT_TOML_FILENAME
+from delfino.daemon import DISABLE_ENV_VAR
 from delfino.models.pyproject_toml import PyprojectToml
 from tests.constants import PROJECT_ROOT
 
@@ -12,3 +18,83 @@ class TestEntrypointConstant:
 
         assert pyproject_toml.project
         assert ENTRY_POINT in pyproject_toml.project.scripts
+
+
+class TestEntrypointImports:
+    @staticmethod
+    def test_should_not_import_config_dependencies_for_version():
+        code = (
+            "import sys\n"
+            "from delfino.cli import main\n"
+            "sys.argv = ['delfino', '--version']\n"
+            "try:\n"
+            "    main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sorted({'pydantic', 'toml', 'shellingham', 'delfino.execution'} & set(sys.modules)))\n"
+        )
+
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.splitlines()[-1] == "[]"
+
+
+class TestBuiltInCommands:
+    @staticmethod
+    def test_should_have_the_same_short_help_as_the_commands():
+        for name, built_in in BUILT_IN_COMMANDS.items():
+            assert load_built_in_command(name).short_help == built_in.short_help
+
+    @staticmethod
+    def test_should_be_listed_in_help_and_run_from_main_module(tmp_path):
+        (tmp_path / "pyproject.toml").write_text("[tool.delfino]\n")
+
+        help_output = _main(tmp_path, "--help").stdout
+        result = _main(tmp_path, "stats")
+
+        assert all(f"  {name} " in help_output for name in BUILT_IN_COMMANDS)
+        assert result.returncode == 0, result.stderr
+        assert "No commands have been recorded" in result.stdout
+
+    @staticmethod
+    def test_should_be_overridden_by_commands_of_the_project(tmp_path):
+        (tmp_path / "pyproject.toml").write_text("[tool.delfino]\n")
+        (tmp_path / "commands").mkdir()
+        (tmp_path / "commands" / "stats.py").write_text(
+            'import click\n\n\n@click.command()\ndef stats():\n    """Project stats."""\n    click.echo("project")\n'
+        )
+
+        help_output = _main(tmp_path, "--help").stdout
+
+        assert _main(tmp_path, "stats").stdout == "project\n"
+        assert "Project stats." in help_output
+        assert "failure and cache hit rates" not in help_output
+
+
+class TestConfigErrors:
+    @staticmethod
+    def test_should_report_invalid_lazily_validated_section_without_traceback(tmp_path):
+        (tmp_path / "pyproject.toml").write_text("[tool.poetry]\npackage-mode = false\n")
+        (tmp_path / "commands").mkdir()
+        (tmp_path / "commands" / "hello.py").write_text(
+            'import click\n\n\n@click.command()\ndef hello():\n    click.echo("hello")\n'
+        )
+
+        result = _main(tmp_path, "hello")
+
+        assert result.returncode == 1
+        assert "Delfino appears to be misconfigured in" in result.stderr
+        assert "section 'tool.poetry'" in result.stderr
+        assert "Traceback" not in result.stderr
+        assert result.stdout == ""
+
+
+def _main(project_root, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "delfino.main", *args],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, DISABLE_ENV_VAR: "1"},
+        check=False,
+    )
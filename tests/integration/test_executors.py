@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+from collections.abc import Iterator
+
+import pytest
+
+from delfino.daemon import DISABLE_ENV_VAR
+
+TOKEN = "secret"
+FAIL_EXIT_CODE = 3
+USAGE_ERROR_EXIT_CODE = 2
+_DELFINO = [sys.executable, "-c", "import sys; from delfino.cli import main; sys.argv[0] = 'delfino'; main()"]
+_COMMANDS = f"""
+import os
+import sys
+
+import click
+
+from delfino.execution import OnError, run, run_chunked
+
+_PRINT_WORKER = "import os, sys; print(os.environ['WORKER'], *sys.argv[1:]); import time; time.sleep(0.5)"
+
+
+@click.command()
+def check():
+    run([sys.executable, "-c", _PRINT_WORKER], on_error=OnError.PASS)
+    run([sys.executable, "-c", "import sys; sys.exit({FAIL_EXIT_CODE})"], on_error=OnError.EXIT)
+
+
+@click.command()
+def lint():
+    run_chunked([sys.executable, "-c", _PRINT_WORKER], ["a.py", "b.py"], jobs=2, on_error=OnError.EXIT)
+"""
+
+
+@pytest.fixture()
+def project_root(tmp_path):
+    (tmp_path / "commands").mkdir()
+    (tmp_path / "commands" / "__init__.py").write_text(_COMMANDS)
+    (tmp_path / "pyproject.toml").write_text("[tool.delfino]\nhistory = { enabled = false }\n")
+    return tmp_path
+
+
+def _env(**env: str) -> dict[str, str]:
+    return {**os.environ, DISABLE_ENV_VAR: "1", "DELFINO_WORKER_TOKEN": TOKEN, **env}
+
+
+@pytest.fixture()
+def workers(project_root, tmp_path_factory) -> Iterator[list[str]]:
+    """Addresses of two local workers, one listening on a Unix socket, the other on TCP."""
+    socket_path = tmp_path_factory.mktemp("sockets") / "worker.sock"
+    processes = [
+        subprocess.Popen(  # pylint: disable=consider-using-with
+            [*_DELFINO, "worker", "--listen", address, "--root", str(project_root)],
+            stdout=subprocess.PIPE,
+            text=True,
+            env=_env(WORKER=name),
+        )
+        for name, address in (("unix", f"unix://{socket_path}"), ("tcp", "tcp://127.0.0.1:0"))
+    ]
+    try:
+        # The first line is "Delfino worker listening on ADDRESS (JOBS jobs)."
+        yield [process.stdout.readline().split()[4] for process in processes]  # type: ignore[union-attr]
+    finally:
+        for process in processes:
+            process.terminate()
+            process.communicate()
+
+
+def _delfino(project_root, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [*_DELFINO, *args], cwd=project_root, capture_output=True, text=True, env=_env(WORKER="client"), check=False
+    )
+
+
+class TestRemoteExecutor:
+    @staticmethod
+    def test_should_run_programs_on_workers_and_return_their_exit_codes(project_root, workers):
+        result = _delfino(project_root, "--executor", f"remote:{','.join(workers)}", "check")
+
+        assert result.returncode == FAIL_EXIT_CODE, result.stderr
+        assert result.stdout.splitlines()[0] == "unix"
+        assert f"Error ({FAIL_EXIT_CODE})" in result.stdout
+
+    @staticmethod
+    def test_should_spread_chunks_over_workers(project_root, workers):
+        result = _delfino(project_root, "--executor", f"remote:{','.join(workers)}", "lint")
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == ["unix a.py", "tcp b.py"]
+
+    @staticmethod
+    def test_should_reject_invalid_executor(project_root):
+        result = _delfino(project_root, "--executor", "remote:nowhere", "check")
+
+        assert result.returncode == USAGE_ERROR_EXIT_CODE
+        assert "Invalid address of a worker 'nowhere'" in result.stderr
@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from delfino.daemon import DISABLE_ENV_VAR
+from delfino.history import History
+
+FAIL_EXIT_CODE = 3
+RUNS = 2
+_COMMANDS = f"""
+import click
+
+from delfino.click_utils.command_groups import execute_commands_group
+from delfino.decorators import cache_result, jobs_option, pass_app_context
+from delfino.models import PluginConfig
+
+
+@click.command()
+@cache_result(inputs=[])
+def lint():
+    pass
+
+
+@click.command()
+def test():
+    raise click.exceptions.Exit({FAIL_EXIT_CODE})
+
+
+@click.command()
+@jobs_option
+@click.pass_context
+@pass_app_context(PluginConfig)
+def verify(click_context, app_context, **kwargs):
+    execute_commands_group("verify", click_context, app_context, **kwargs)
+"""
+
+
+@pytest.fixture()
+def project_root(tmp_path):
+    (tmp_path / "commands").mkdir()
+    (tmp_path / "commands" / "__init__.py").write_text(_COMMANDS)
+    (tmp_path / "pyproject.toml").write_text('[tool.delfino]\ncommand_groups = { verify = ["lint", "test"] }\n')
+    return tmp_path
+
+
+def _delfino(project_root, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", "import sys; from delfino.cli import main; sys.argv[0] = 'delfino'; main()", *args],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, DISABLE_ENV_VAR: "1"},
+        check=False,
+    )
+
+
+class TestHistory:
+    @staticmethod
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_should_record_commands_and_group_members(project_root, jobs):
+        for _ in range(RUNS):
+            assert _delfino(project_root, "verify", "--jobs", jobs).returncode == FAIL_EXIT_CODE
+
+        invocations = History.of_project(project_root).invocations()
+        by_command = {
+            command: [invocation for invocation in invocations if invocation.command == command]
+            for command in ("verify", "lint", "test")
+        }
+
+        assert len(invocations) == RUNS * len(by_command)
+        assert [invocation.cache for invocation in by_command["lint"]] == ["miss", "hit"]
+        assert {invocation.group for invocation in by_command["lint"] + by_command["test"]} == {"verify"}
+        assert {invocation.exit_code for invocation in by_command["test"]} == {FAIL_EXIT_CODE}
+        assert {invocation.exit_code for invocation in by_command["verify"]} == {FAIL_EXIT_CODE}
+        assert all(invocation.duration > 0 for invocation in invocations)
+
+    @staticmethod
+    def test_should_show_stats_of_recorded_commands(project_root):
+        assert "No commands" in _delfino(project_root, "stats").stdout
+
+        for _ in range(RUNS):
+            _delfino(project_root, "verify")
+        result = _delfino(project_root, "stats", "lint", "test")
+
+        assert result.returncode == 0, result.stderr
+        rows = {line.split()[0]: line.split() for line in result.stdout.splitlines()[2:]}
+        assert rows.keys() == {"lint", "test"}
+        assert rows["lint"][1] == str(RUNS)
+        assert rows["test"][-1] == "100%"
+
+    @staticmethod
+    def test_should_not_record_when_disabled(project_root):
+        with open(project_root / "pyproject.toml", "a", encoding="utf-8") as file:
+            file.write("history = { enabled = false }\n")
+
+        _delfino(project_root, "verify")
+
+        assert not History.of_project(project_root).path.exists()
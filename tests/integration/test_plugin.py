@@ -1,8 +1,11 @@
+import sys
 from types import ModuleType
+from unittest.mock import patch
 
 import pytest
 
 from delfino.click_utils.command import CommandRegistry
+from delfino.click_utils.plugin_index import PluginIndex
 from tests.integration.fixtures import ALL_PLUGINS_ALL_COMMANDS
 
 
@@ -25,3 +28,36 @@ class TestPlugin:
         assert isinstance(fake_plugin_a_package.package, ModuleType)
         assert isinstance(fake_plugin_a_package.package.__package__, str)
         assert "fake_plugin_a.commands" in fake_plugin_a_package.package.__package__
+
+
+@pytest.mark.usefixtures("install_fake_plugins")
+class TestPluginIndex:
+    @staticmethod
+    def test_should_index_installed_plugins():
+        index = PluginIndex.build()
+
+        assert index.version("fake_plugin_a") == "0.0.1"
+        assert index.plugins["fake_plugin_b"].entry_point == "fake_plugin_b.commands"
+        assert "fake_plugin_without_entry_point" not in index.plugins
+
+    @staticmethod
+    def test_should_load_index_from_cache(tmp_path):
+        cache_file = tmp_path / "plugins.json"
+        index = PluginIndex.load(cache_file)
+
+        with patch.object(PluginIndex, "build", side_effect=AssertionError("Not cached")):
+            assert PluginIndex.load(cache_file) == index
+
+    @staticmethod
+    def test_should_rebuild_cached_index_when_import_paths_change(tmp_path):
+        cache_file = tmp_path / "plugins.json"
+        PluginIndex.load(cache_file)
+
+        sys.path.append(str(tmp_path))
+        try:
+            with patch.object(PluginIndex, "build", return_value=PluginIndex()) as build:
+                PluginIndex.load(cache_file)
+        finally:
+            sys.path.remove(str(tmp_path))
+
+        build.assert_called_once()
@@ -0,0 +1,167 @@
+import subprocess
+from pathlib import Path
+
+import click
+import pytest
+
+from delfino.decorators import cache_result
+from delfino.models import PluginConfig
+from delfino.result_cache import enable_result_cache
+
+FAIL_EXIT_CODE = 3
+_RUNS: list[str] = []
+
+
+@click.group()
+def root():
+    pass
+
+
+@root.command()
+@click.option("--fail", is_flag=True)
+@cache_result(inputs=["src"])
+def check(fail: bool):
+    _RUNS.append("check")
+    click.echo("checked")
+    subprocess.run(["echo", "from subprocess"], check=True)
+    click.echo("warning", err=True)
+    if fail:
+        raise click.exceptions.Exit(FAIL_EXIT_CODE)
+
+
+@root.command()
+@cache_result(inputs=["src"], cache_failures=True)
+def always_fail():
+    _RUNS.append("always_fail")
+    raise click.exceptions.Exit(FAIL_EXIT_CODE)
+
+
+@root.command()
+def plain():
+    _RUNS.append("plain")
+    click.echo("plain")
+
+
+@pytest.fixture()
+def invoke(runner, context_obj, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "module.py").write_text("x = 1")
+    _RUNS.clear()
+
+    def _invoke(*args: str, config: dict | None = None):
+        context_obj.project_root = tmp_path
+        context_obj.plugin_config = PluginConfig(**(config or {}))
+        return runner.invoke(root, list(args), obj=context_obj)
+
+    return _invoke
+
+
+class TestCacheResult:
+    @staticmethod
+    def test_should_replay_output_when_inputs_have_not_changed(invoke):
+        first = invoke("check")
+        second = invoke("check")
+
+        assert first.exit_code == second.exit_code == 0, first.output
+        assert _RUNS == ["check"]
+        assert first.stdout == second.stdout == "checked\nfrom subprocess\n"
+        assert "warning" in second.stderr
+
+    @staticmethod
+    def test_should_run_failed_command_again(invoke):
+        first = invoke("check", "--fail")
+        second = invoke("check", "--fail")
+
+        assert first.exit_code == second.exit_code == FAIL_EXIT_CODE
+        assert _RUNS == ["check", "check"]
+
+    @staticmethod
+    def test_should_replay_exit_code_when_failures_are_cached(invoke):
+        first = invoke("always-fail")
+        second = invoke("always-fail")
+
+        assert first.exit_code == second.exit_code == FAIL_EXIT_CODE
+        assert _RUNS == ["always_fail"]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "change",
+        [
+            pytest.param(lambda: Path("src/module.py").write_text("x = 2"), id="modified input"),
+            pytest.param(lambda: Path("src/new.py").touch(), id="new input"),
+        ],
+    )
+    def test_should_run_again_when_inputs_change(invoke, change):
+        invoke("check")
+        change()
+        invoke("check")
+
+        assert _RUNS == ["check", "check"]
+
+    @staticmethod
+    def test_should_not_depend_on_files_outside_of_inputs(invoke):
+        invoke("check")
+        Path("README.md").write_text("changed")
+        invoke("check")
+
+        assert _RUNS == ["check"]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "change, expected_runs",
+        [
+            pytest.param(lambda: Path("src/debug.log").write_text("x"), ["check"], id="ignored file"),
+            pytest.param(lambda: Path("src/new.py").touch(), ["check", "check"], id="untracked file"),
+            pytest.param(lambda: Path("src/module.py").write_text("x = 2"), ["check", "check"], id="tracked file"),
+        ],
+    )
+    def test_should_depend_only_on_files_not_ignored_by_git(invoke, change, expected_runs):
+        Path(".gitignore").write_text("*.log\n")
+        subprocess.run(["git", "init", "-q"], check=True)
+        subprocess.run(["git", "add", "src"], check=True)
+
+        invoke("check")
+        change()
+        invoke("check")
+
+        assert _RUNS == expected_runs
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "first_args, first_config, second_args, second_config",
+        [
+            pytest.param([], {}, ["--fail"], {}, id="options"),
+            pytest.param([], {}, [], {"check": {"other": 1}}, id="plugin config"),
+            pytest.param([], {}, [], {"check": {"cache_inputs": ["README.md"]}}, id="inputs from config"),
+        ],
+    )
+    def test_should_run_again_when_key_changes(invoke, first_args, first_config, second_args, second_config):
+        Path("README.md").touch()
+        invoke("check", *first_args, config=first_config)
+        invoke("check", *second_args, config=second_config)
+
+        assert _RUNS == ["check", "check"]
+
+    @staticmethod
+    def test_should_not_cache_when_disabled_in_config(invoke):
+        invoke("check", config={"check": {"cache": False}})
+        invoke("check", config={"check": {"cache": False}})
+
+        assert _RUNS == ["check", "check"]
+
+    @staticmethod
+    @pytest.mark.parametrize("git_repository", [pytest.param(False, id="no git"), pytest.param(True, id="git")])
+    def test_should_cache_undecorated_command_when_enabled_in_config(invoke, git_repository):
+        if git_repository:
+            subprocess.run(["git", "init", "-q"], check=True)
+        config = {"plain": {"cache": True}}
+        enable_result_cache(plain, config["plain"])
+        try:
+            first = invoke("plain", config=config)
+            second = invoke("plain", config=config)
+        finally:
+            plain.callback = plain.callback.__wrapped__  # type: ignore[union-attr]
+
+        assert first.stdout == second.stdout == "plain\n"
+        assert _RUNS == ["plain"]
@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from delfino.daemon import DISABLE_ENV_VAR
+
+FAIL_EXIT_CODE = 3
+_COMMANDS = f"""
+import sys
+
+import click
+
+from delfino.click_utils.command_groups import execute_commands_group
+from delfino.decorators import jobs_option, pass_app_context
+from delfino.execution import OnError, run
+from delfino.models import PluginConfig
+
+
+@click.command()
+def lint():
+    run([sys.executable, "-c", "pass"], on_error=OnError.EXIT)
+
+
+@click.command()
+def test():
+    run([sys.executable, "-c", "exit({FAIL_EXIT_CODE})"], on_error=OnError.EXIT)
+
+
+@click.command()
+@jobs_option
+@click.pass_context
+@pass_app_context(PluginConfig)
+def verify(click_context, app_context, **kwargs):
+    execute_commands_group("verify", click_context, app_context, **kwargs)
+"""
+
+
+@pytest.fixture()
+def project_root(tmp_path):
+    (tmp_path / "commands").mkdir()
+    (tmp_path / "commands" / "__init__.py").write_text(_COMMANDS)
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.delfino]\ncommand_groups = { verify = ["lint", "missing", "test"] }\n'
+    )
+    return tmp_path
+
+
+def _delfino(project_root, *args: str, **env: str) -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        [sys.executable, "-m", "delfino.main", *args],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, DISABLE_ENV_VAR: "1", **env},
+        check=False,
+    )
+    assert result.returncode == FAIL_EXIT_CODE, result.stderr
+    return result
+
+
+class TestRunReport:
+    @staticmethod
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_should_report_commands_of_group_with_their_subprocesses(project_root, jobs):
+        _delfino(project_root, "--report", "report.json", "verify", "--jobs", jobs)
+
+        report = json.loads((project_root / "report.json").read_text())
+        commands = {command["name"]: command for command in report["commands"]}
+
+        assert report["argv"] == ["--report", "report.json", "verify", "--jobs", jobs]
+        assert report["exit_code"] == FAIL_EXIT_CODE
+        assert commands["verify"]["plugin"] == "local"
+        assert (commands["verify"]["group"], commands["verify"]["status"]) == (None, "failed")
+        assert (commands["lint"]["group"], commands["lint"]["status"], commands["lint"]["exit_code"]) == (
+            "verify",
+            "passed",
+            0,
+        )
+        assert (commands["test"]["status"], commands["test"]["exit_code"]) == ("failed", FAIL_EXIT_CODE)
+        assert (commands["missing"]["status"], commands["missing"]["reason"]) == ("skipped", "Command does not exist.")
+        assert [process["exit_code"] for process in commands["test"]["subprocesses"]] == [FAIL_EXIT_CODE]
+        assert commands["lint"]["subprocesses"][0]["duration"] <= commands["lint"]["duration"]
+        assert commands["verify"]["started_at"] <= commands["lint"]["started_at"] <= commands["verify"]["ended_at"]
+
+    @staticmethod
+    def test_should_remove_temporary_file_of_records(project_root, tmp_path_factory):
+        temporary_folder = tmp_path_factory.mktemp("temporary")
+
+        _delfino(project_root, "--report", "report.json", "verify", "--jobs", "2", TMPDIR=str(temporary_folder))
+
+        assert (project_root / "report.json").exists()
+        assert not list(temporary_folder.iterdir())
+
+    @staticmethod
+    def test_should_aggregate_resources_of_subprocesses_per_command(project_root):
+        result = _delfino(project_root, "--resources", "--report", "report.json", "verify", "--jobs", "2")
+
+        report = json.loads((project_root / "report.json").read_text())
+        commands = {command["name"]: command for command in report["commands"]}
+        table_lines = result.stderr.partition("Resources used by programs of each command:")[2].splitlines()
+        table = {line.split()[0]: line.split()[1] for line in table_lines if line[:1].isalpha()}
+
+        assert commands["lint"]["resources"]["max_rss"] > 0
+        assert commands["lint"]["resources"] == commands["lint"]["subprocesses"][0]["resources"]
+        assert commands["verify"]["resources"] is None
+        assert table == {"Command": "Programs", "verify": "0", "lint": "1", "test": "1", "Total": "2"}
@@ -0,0 +1,184 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from delfino.daemon import DISABLE_ENV_VAR
+
+TOTAL = 2
+FAIL_EXIT_CODE = 3
+USAGE_ERROR_EXIT_CODE = 2
+_COMMANDS = f"""
+import click
+
+from delfino.click_utils.command_groups import execute_commands_group
+from delfino.decorators import files_folders_option, pass_app_context
+from delfino.models import PluginConfig
+
+
+@click.command()
+@files_folders_option
+def lint(files_folders):
+    click.echo(f"lint {{' '.join(files_folders)}}")
+
+
+@click.command()
+def test():
+    click.echo("test")
+    raise click.exceptions.Exit({FAIL_EXIT_CODE})
+
+
+@click.command()
+def docs():
+    click.echo("docs")
+
+
+@click.command()
+@files_folders_option(defaults=["src"], suffixes=[".py"])
+def fmt(files_folders):
+    click.echo(f"fmt {{' '.join(files_folders)}}")
+
+
+@click.command()
+@files_folders_option
+def spell(files_folders):
+    click.echo(f"spell {{' '.join(files_folders) or 'everything'}}")
+
+
+@click.command()
+@click.pass_context
+@pass_app_context(PluginConfig)
+def verify(click_context, app_context):
+    execute_commands_group("verify", click_context, app_context)
+
+
+@click.command()
+@click.pass_context
+@pass_app_context(PluginConfig)
+def check(click_context, app_context):
+    execute_commands_group("check", click_context, app_context)
+"""
+_SOURCES = {"big.py": 100, "a.py": 40, "b.py": 40, "notes.txt": 1000}
+
+
+@pytest.fixture()
+def project_root(tmp_path):
+    (tmp_path / "commands").mkdir()
+    (tmp_path / "commands" / "__init__.py").write_text(_COMMANDS)
+    (tmp_path / "pyproject.toml").write_text(
+        # The history changes between shards running on the same machine, which would change the split
+        "[tool.delfino]\nhistory = { enabled = false }\n"
+        'command_groups = { verify = ["lint", "docs", "test", "disabled"], check = ["fmt", "spell"] }\n'
+        '[tool.delfino.plugins.local]\ndisable_commands = ["disabled"]\n'
+        '[tool.delfino.plugins.local.lint]\nfiles_folders = ["src"]\n'
+    )
+    (tmp_path / "src").mkdir()
+    for name, size in _SOURCES.items():
+        (tmp_path / "src" / name).write_text("x" * size)
+    return tmp_path
+
+
+def _delfino(project_root, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", "import sys; from delfino.cli import main; sys.argv[0] = 'delfino'; main()", *args],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        env={**os.environ, DISABLE_ENV_VAR: "1"},
+        check=False,
+    )
+
+
+def _shards(project_root, *args: str) -> list[list[str]]:
+    """Output lines of each shard."""
+    return [
+        _delfino(project_root, "--shard", f"{index}/{TOTAL}", *args).stdout.splitlines()
+        for index in range(1, TOTAL + 1)
+    ]
+
+
+class TestSharding:
+    @staticmethod
+    def test_should_run_each_group_member_in_one_shard(project_root):
+        outputs = _shards(project_root, "verify")
+
+        assert sorted(line.split()[0] for output in outputs for line in output) == ["docs", "lint", "test"]
+        assert all(outputs)
+
+    @staticmethod
+    def test_should_split_commands_evenly_by_name_without_durations(project_root):
+        assert _shards(project_root, "verify") == [["docs", "test"], ["lint src"]]
+
+    @staticmethod
+    def test_should_balance_shards_by_durations_in_a_report(project_root):
+        report = {"commands": [{"name": name, "status": "passed", "duration": 1.0} for name in ("lint", "docs")]}
+        report["commands"].append({"name": "test", "status": "failed", "duration": 60.0})
+        (project_root / "durations.json").write_text(json.dumps(report))
+
+        assert _shards(project_root, "--shard-durations", "durations.json", "verify") == [
+            ["test"],
+            ["lint src", "docs"],
+        ]
+
+    @staticmethod
+    def test_should_reject_durations_file_which_is_not_a_report(project_root):
+        (project_root / "durations.json").write_text("[]")
+
+        result = _delfino(project_root, "--shard", f"1/{TOTAL}", "--shard-durations", "durations.json", "verify")
+
+        assert result.returncode == USAGE_ERROR_EXIT_CODE
+        assert "is not a run report" in result.stderr
+
+    @staticmethod
+    def test_should_split_files_of_members_accepting_them(project_root):
+        outputs = _shards(project_root, "--shard-files", "verify")
+
+        lint_files = [line.split()[1:] for output in outputs for line in output if line.startswith("lint")]
+        assert lint_files == [["src/notes.txt"], ["src/a.py", "src/b.py", "src/big.py"]]
+        assert sorted(line for output in outputs for line in output if not line.startswith("lint")) == [
+            "docs",
+            "test",
+        ]
+
+    @staticmethod
+    def test_should_split_default_files_of_members_and_run_members_without_them_in_the_first_shard(project_root):
+        outputs = _shards(project_root, "--shard-files", "check")
+
+        assert outputs == [["fmt src/big.py", "spell everything"], ["fmt src/a.py src/b.py"]]
+
+    @staticmethod
+    def test_should_merge_reports_of_shards(project_root):
+        for index in range(1, TOTAL + 1):
+            _delfino(project_root, "--shard", f"{index}/{TOTAL}", "--report", f"report-{index}.json", "verify")
+
+        result = _delfino(project_root, "merge-reports", "-o", "report.json", "report-2.json", "report-1.json")
+
+        assert result.returncode == 0, result.stderr
+        report = json.loads((project_root / "report.json").read_text())
+        members = {command["name"]: command for command in report["commands"] if command["group"] == "verify"}
+        assert [shard["shard"] for shard in report["shards"]] == ["1/2", "2/2"]
+        assert report["missing_shards"] == []
+        assert report["exit_code"] == FAIL_EXIT_CODE
+        assert sorted(members) == ["disabled", "docs", "lint", "test"]
+        assert [command["name"] for command in report["commands"]].count("disabled") == 1
+        assert [command["name"] for command in report["commands"]].count("verify") == TOTAL
+
+    @staticmethod
+    def test_should_report_missing_shards(project_root):
+        _delfino(project_root, "--shard", f"1/{TOTAL}", "--report", "report-1.json", "docs")
+
+        result = _delfino(project_root, "merge-reports", "-o", "report.json", "report-1.json")
+
+        assert "shards 2/2 are missing" in result.stderr
+        assert json.loads((project_root / "report.json").read_text())["missing_shards"] == ["2/2"]
+
+    @staticmethod
+    def test_should_refuse_to_merge_reports_of_unsharded_runs(project_root):
+        _delfino(project_root, "--report", "report.json", "docs")
+
+        result = _delfino(project_root, "merge-reports", "-o", "merged.json", "report.json")
+
+        assert result.returncode == 1
+        assert "is not a report of a shard" in result.stderr
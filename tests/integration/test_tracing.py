@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from delfino.daemon import DISABLE_ENV_VAR
+
+_COMMANDS = """
+import sys
+
+import click
+
+from delfino.click_utils.command_groups import execute_commands_group
+from delfino.decorators import jobs_option, pass_app_context
+from delfino.models import PluginConfig
+from delfino.execution import OnError, run
+
+
+@click.command()
+def lint():
+    run([sys.executable, "-c", "pass"], on_error=OnError.EXIT)
+
+
+@click.command()
+def test():
+    run([sys.executable, "-c", "exit(0)"], on_error=OnError.EXIT)
+
+
+@click.command()
+@jobs_option
+@click.pass_context
+@pass_app_context(PluginConfig)
+def verify(click_context, app_context, **kwargs):
+    execute_commands_group("verify", click_context, app_context, **kwargs)
+"""
+
+
+@pytest.fixture()
+def project_root(tmp_path):
+    (tmp_path / "commands").mkdir()
+    (tmp_path / "commands" / "__init__.py").write_text(_COMMANDS)
+    (tmp_path / "pyproject.toml").write_text('[tool.delfino]\ncommand_groups = { verify = ["lint", "test"] }\n')
+    return tmp_path
+
+
+class TestTrace:
+    @staticmethod
+    def test_should_write_spans_of_parallel_group_members_and_subprocesses(project_root):
+        result = subprocess.run(
+            [sys.executable, "-m", "delfino.main", "--trace", "trace.json", "verify", "--jobs", "2"],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            env={**os.environ, DISABLE_ENV_VAR: "1"},
+            check=False,
+        )
+        assert result.returncode == 0, result.stderr
+
+        events = json.loads((project_root / "trace.json").read_text())
+        spans = {(event["cat"], event["name"]): event for event in events if event["ph"] == "X"}
+
+        assert {("init", "load config"), ("init", "discover commands"), ("command", "resolve verify")} <= set(spans)
+        assert spans["group", "lint"]["args"]["exit_code"] == 0
+        assert (
+            spans["group", "lint"]["pid"] != spans["group", "test"]["pid"] != spans["command", "resolve verify"]["pid"]
+        )
+        subprocesses = [event for event in events if event.get("cat") == "subprocess"]
+        assert sorted(event["pid"] for event in subprocesses) == sorted(
+            (spans["group", "lint"]["pid"], spans["group", "test"]["pid"])
+        )
+        assert all(event["args"]["exit_code"] == 0 for event in subprocesses)
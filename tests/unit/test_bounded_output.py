@@ -0,0 +1,46 @@
+from delfino.bounded_output import BoundedOutput
+
+HEAD_SIZE = 4
+TAIL_SIZE = 8
+
+
+class TestBoundedOutput:
+    @staticmethod
+    def test_should_keep_short_output_in_memory_only():
+        output = BoundedOutput("stdout", HEAD_SIZE, TAIL_SIZE)
+        output.write(b"0123")
+        output.write(b"456789ab")
+        output.close()
+
+        assert output.getvalue() == b"0123456789ab"
+        assert output.log_file is None
+
+    @staticmethod
+    def test_should_keep_head_and_tail_and_spill_everything_into_log_file():
+        output = BoundedOutput("stdout", HEAD_SIZE, TAIL_SIZE)
+        content = bytes(range(ord("a"), ord("z") + 1)) * 10
+        for index in range(0, len(content), 3):
+            output.write(content[index : index + 3])
+        output.close(keep_log_file=True)
+
+        assert output.log_file is not None
+        try:
+            head, marker, tail = output.getvalue(keep_log_file=True).split(b"\n")
+            assert head == content[:HEAD_SIZE]
+            assert tail == content[-TAIL_SIZE:]
+            assert f"{len(content) - HEAD_SIZE - TAIL_SIZE} bytes omitted".encode() in marker
+            assert str(output.log_file).encode() in marker
+            assert output.log_file.read_bytes() == content
+        finally:
+            output.log_file.unlink()
+
+    @staticmethod
+    def test_should_remove_log_file_on_close():
+        output = BoundedOutput("stdout", HEAD_SIZE, TAIL_SIZE)
+        output.write(b"x" * (HEAD_SIZE + TAIL_SIZE + 1))
+        output.close()
+
+        assert output.log_file is not None
+        assert not output.log_file.exists()
+        assert b"1 bytes omitted ...]" in output.getvalue()
+        assert str(output.log_file).encode() not in output.getvalue()
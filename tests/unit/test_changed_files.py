@@ -0,0 +1,34 @@
+import pytest
+
+from delfino.click_utils.changed_files import restrict_to_changed
+
+CHANGED_FILES = frozenset({"src/a.py", "src/sub/b.py", "srcs/c.py", "README.md"})
+
+
+class TestRestrictToChanged:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "files_folders, expected",
+        [
+            pytest.param([], ("README.md", "src/a.py", "src/sub/b.py", "srcs/c.py"), id="all changed"),
+            pytest.param(["."], ("README.md", "src/a.py", "src/sub/b.py", "srcs/c.py"), id="current folder"),
+            pytest.param(["src"], ("src/a.py", "src/sub/b.py"), id="folder without prefix matches"),
+            pytest.param(["./src/sub/"], ("src/sub/b.py",), id="normalized folder"),
+            pytest.param(["src/a.py", "README.md"], ("README.md", "src/a.py"), id="files"),
+            pytest.param(["tests"], (), id="nothing changed"),
+        ],
+    )
+    def test_should_keep_changed_files_under_files_folders(files_folders, expected):
+        assert restrict_to_changed(files_folders, CHANGED_FILES) == expected
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "files_folders, expected",
+        [
+            pytest.param([], ("src/a.py", "src/sub/b.py", "srcs/c.py"), id="all changed"),
+            pytest.param(["src"], ("src/a.py", "src/sub/b.py"), id="folder"),
+            pytest.param(["README.md"], ("README.md",), id="file with another suffix"),
+        ],
+    )
+    def test_should_keep_changed_files_with_suffixes_in_folders(files_folders, expected):
+        assert restrict_to_changed(files_folders, CHANGED_FILES, [".py"]) == expected
@@ -0,0 +1,131 @@
+from pathlib import Path
+
+import click
+import pytest
+from click.shell_completion import ShellComplete
+
+from delfino.completion_manifest import CompletionManifest, manifest_path
+
+
+@click.group()
+@click.option("--log-level", type=click.Choice(["debug", "info"]), help="Log level.")
+@click.option("--version", is_flag=True, help="Show the version.")
+def main_group(log_level, version):
+    del log_level, version
+
+
+@main_group.command(help="Build the project.")
+@click.option("--fast", is_flag=True, help="Go fast.")
+@click.option("--target", multiple=True, help="Target.")
+def build(fast, target):
+    del fast, target
+
+
+@main_group.command(help="Lint files.")
+@click.argument("path", type=click.Path())
+def lint(path):
+    del path
+
+
+@main_group.command(hidden=True)
+def secret():
+    pass
+
+
+@pytest.fixture()
+def manifest(tmp_path) -> CompletionManifest:
+    ctx = click.Context(main_group)
+    commands = {"build": build, "lint": lint}
+    manifest = CompletionManifest.create(
+        tmp_path / "completion.json",
+        tmp_path,
+        {},
+        ctx,
+        {name: command.get_short_help_str() for name, command in commands.items()},
+    )
+    for name, command in commands.items():
+        manifest.add_command(ctx, name, command)
+    return manifest
+
+
+def click_completions(args: list[str], incomplete: str) -> list[tuple[str, str, str | None]]:
+    completions = ShellComplete(main_group, {}, "delfino", "_DELFINO_COMPLETE").get_completions(args, incomplete)
+    return [(completion.type, completion.value, completion.help) for completion in completions]
+
+
+class TestCompletionManifest:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "args, incomplete",
+        [
+            pytest.param([], "", id="commands"),
+            pytest.param([], "b", id="command prefix"),
+            pytest.param([], "--", id="main options"),
+            pytest.param(["--version"], "-", id="used main option"),
+            pytest.param(["--log-level", "debug"], "", id="option with value"),
+            pytest.param(["--log-level=debug"], "", id="option with inline value"),
+            pytest.param(["build"], "--", id="command options"),
+            pytest.param(["build", "--fast", "--target", "x"], "-", id="used and multiple command options"),
+            pytest.param(["build"], "", id="no arguments"),
+        ],
+    )
+    def test_should_complete_same_as_click(manifest, args, incomplete):
+        assert manifest.complete(args, incomplete) == click_completions(args, incomplete)
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "args, incomplete",
+        [
+            pytest.param(["lint"], "", id="command arguments"),
+            pytest.param(["--log-level"], "", id="option value"),
+            pytest.param([], "--log-level=", id="inline option value"),
+            pytest.param(["--unknown"], "", id="unknown option"),
+            pytest.param(["unknown"], "", id="unknown command"),
+        ],
+    )
+    def test_should_defer_to_click(manifest, args, incomplete):
+        assert manifest.complete(args, incomplete) is None
+
+    @staticmethod
+    def test_should_defer_to_click_until_command_options_are_known(tmp_path):
+        ctx = click.Context(main_group)
+        manifest = CompletionManifest.create(
+            tmp_path / "completion.json", tmp_path, {}, ctx, {"build": "Build the project."}
+        )
+
+        assert manifest.lacks_options("build")
+        assert manifest.complete(["build"], "--") is None
+
+    @staticmethod
+    def test_should_be_loaded_only_if_up_to_date(manifest, tmp_path):
+        source_file = tmp_path / "commands.py"
+        source_file.write_text("")
+        stale_manifest = CompletionManifest.create(
+            manifest.path, tmp_path, {str(source_file): [0, 0]}, click.Context(main_group), {}
+        )
+
+        manifest.save()
+        loaded = CompletionManifest.load(manifest.path)
+        assert loaded is not None
+        assert loaded.data == manifest.data
+
+        stale_manifest.save()
+        assert CompletionManifest.load(manifest.path) is None
+
+    @staticmethod
+    def test_should_stay_up_to_date_when_files_are_added_to_project_root(tmp_path, monkeypatch):
+        monkeypatch.syspath_prepend(str(tmp_path))
+        path = manifest_path(tmp_path)
+        CompletionManifest.create(path, tmp_path, {}, click.Context(main_group), {}).save()
+
+        (tmp_path / "newfile.txt").touch()
+
+        assert CompletionManifest.load(path) is not None
+
+    @staticmethod
+    def test_should_not_load_missing_or_corrupted_file(tmp_path):
+        path: Path = tmp_path / "completion.json"
+        assert CompletionManifest.load(path) is None
+
+        path.write_text("{")
+        assert CompletionManifest.load(path) is None
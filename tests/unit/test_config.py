@@ -76,3 +76,54 @@ class TestLoadConfig:
 
             with pytest.raises(ConfigValidationError, match=expected_exc_msg):
                 load_config(Path())
+
+    @staticmethod
+    def test_should_name_the_file_in_validation_errors_of_lazily_validated_sections():
+        with mock_rc_files([{"tool": {"poetry": {"package-mode": False}}}]) as rc_files:
+            config = load_config(Path())
+
+        with pytest.raises(ConfigValidationError, match=f"misconfigured in '{rc_files[0]}', section 'tool.poetry'"):
+            _ = config.tool.poetry
+
+
+class TestLoadConfigCache:
+    @staticmethod
+    def test_should_load_cached_config_without_parsing_files(tmp_path):
+        cache_file = tmp_path / "config.pickle"
+        with mock_rc_files([Delfino(command_groups={"1": ["cached"]})]):
+            config = load_config(Path(), cache_file=cache_file)
+
+            with patch("delfino.config._load_toml", side_effect=AssertionError("Config should not be parsed")):
+                cached_config = load_config(Path(), cache_file=cache_file)
+
+        assert cached_config == config
+        assert cached_config.tool.delfino.command_groups == {"1": ["cached"]}
+
+    @staticmethod
+    def test_should_reload_config_when_a_file_changes(tmp_path):
+        cache_file = tmp_path / "config.pickle"
+        with mock_rc_files([Delfino(command_groups={"1": ["old"]})]) as rc_files:
+            load_config(Path(), cache_file=cache_file)
+            rc_files[0].write_text(toml.dumps({"tool": {"delfino": {"command_groups": {"1": ["new", "longer"]}}}}))
+
+            config = load_config(Path(), cache_file=cache_file)
+
+        assert config.tool.delfino.command_groups == {"1": ["new", "longer"]}
+
+    @staticmethod
+    def test_should_ignore_corrupted_cache(tmp_path):
+        cache_file = tmp_path / "config.pickle"
+        cache_file.write_bytes(b"not a pickle")
+        with mock_rc_files([Delfino(command_groups={"1": ["valid"]})]):
+            config = load_config(Path(), cache_file=cache_file)
+
+        assert config.tool.delfino.command_groups == {"1": ["valid"]}
+
+    @staticmethod
+    def test_should_not_cache_invalid_config(tmp_path):
+        cache_file = tmp_path / "config.pickle"
+        with mock_rc_files([{"tool": {"delfino": {"command_groups": {"2": "invalid"}}}}]):
+            with pytest.raises(ConfigValidationError):
+                load_config(Path(), cache_file=cache_file)
+
+        assert not cache_file.exists()
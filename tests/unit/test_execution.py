@@ -0,0 +1,336 @@
+import asyncio
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+import pytest
+
+from delfino import execution
+from delfino.execution import (
+    BOUNDED_PIPE,
+    RUNNING_HOOK_INTERVAL,
+    OnError,
+    gather_runs,
+    run,
+    run_async,
+    run_chunked,
+    split_into_chunks,
+)
+
+MAX_DURATION = 5.0
+OUTPUT_SIZE = 1_000_000
+LARGE_OUTPUT_SIZE = 100_000_000
+ALLOCATED_MEMORY = 50_000_000
+CHILD_DURATION = 10.0
+FAIL_EXIT_CODE = 3
+MANY_FILES = 400_000
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+class TestRunningHook:
+    @staticmethod
+    def test_should_call_hook_on_tick_while_process_runs():
+        calls: list[float] = []
+
+        run(
+            _python("import time; time.sleep(0.5)"),
+            on_error=OnError.EXIT,
+            running_hook=lambda: calls.append(time.monotonic()),
+            running_hook_interval=0.05,
+        )
+
+        assert 0.5 / 0.05 / 2 <= len(calls) <= 0.5 / 0.05 + 2
+
+    @staticmethod
+    def test_should_notice_process_exit_without_waiting_for_tick():
+        start = time.monotonic()
+        run(_python("pass"), on_error=OnError.EXIT, running_hook=lambda: None, running_hook_interval=10)
+
+        assert time.monotonic() - start < MAX_DURATION
+
+    @staticmethod
+    def test_should_not_deadlock_on_full_pipes():
+        result = run(
+            _python(f"print('x' * {OUTPUT_SIZE})"),
+            on_error=OnError.EXIT,
+            stdout=subprocess.PIPE,
+            running_hook=lambda: None,
+            running_hook_interval=0.01,
+        )
+
+        assert len(result.stdout) > OUTPUT_SIZE
+
+    @staticmethod
+    def test_should_reraise_exception_from_hook():
+        def _hook():
+            raise RuntimeError("hook failed")
+
+        with pytest.raises(RuntimeError, match="hook failed"):
+            run(
+                _python("import time; time.sleep(0.2)"),
+                on_error=OnError.EXIT,
+                running_hook=_hook,
+                running_hook_interval=0.01,
+            )
+
+    @staticmethod
+    @pytest.mark.parametrize("stdout", [pytest.param(None, id="no pipes"), pytest.param(subprocess.PIPE, id="pipes")])
+    def test_should_kill_process_on_timeout(stdout):
+        start = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired):
+            run(_python("import time; time.sleep(10)"), on_error=OnError.EXIT, stdout=stdout, timeout=0.2)
+
+        assert time.monotonic() - start < MAX_DURATION
+
+
+@pytest.mark.slow
+class TestWaitBenchmark:
+    @staticmethod
+    def test_parent_should_be_idle_while_waiting_for_child():
+        ticks: list[float] = []
+        cpu_start, wall_start = time.process_time(), time.monotonic()
+
+        run(["sleep", str(CHILD_DURATION)], on_error=OnError.EXIT, running_hook=lambda: ticks.append(time.monotonic()))
+
+        cpu_time, wall_time = time.process_time() - cpu_start, time.monotonic() - wall_start
+        print(f"\nWaited {wall_time:.2f} s using {cpu_time * 1000:.1f} ms of CPU time with {len(ticks)} hook calls")
+        assert wall_time < CHILD_DURATION + 0.5
+        assert cpu_time < CHILD_DURATION * 0.02
+        assert len(ticks) >= CHILD_DURATION / RUNNING_HOOK_INTERVAL - 10
+
+
+class TestRunAsync:
+    @staticmethod
+    def test_should_capture_output_with_updated_env():
+        result = asyncio.run(
+            run_async(
+                _python("import os; print(os.environ['DELFINO_TEST'])"),
+                on_error=OnError.EXIT,
+                env_update={"DELFINO_TEST": "value"},
+                stdout=subprocess.PIPE,
+            )
+        )
+
+        assert result.returncode == 0
+        assert result.stdout.decode().strip() == "value"
+
+    @staticmethod
+    def test_should_run_shell_commands():
+        result = asyncio.run(run_async("echo $0 | wc -c", on_error=OnError.EXIT, shell=True, stdout=subprocess.PIPE))
+
+        assert int(result.stdout) > 0
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "on_error, exception",
+        [
+            pytest.param(OnError.EXIT, click.exceptions.Exit, id="exit"),
+            pytest.param(OnError.ABORT, click.Abort, id="abort"),
+        ],
+    )
+    def test_should_raise_on_error(on_error, exception):
+        with pytest.raises(exception):
+            asyncio.run(run_async(_python(f"raise SystemExit({FAIL_EXIT_CODE})"), on_error=on_error))
+
+    @staticmethod
+    def test_should_pass_return_code():
+        result = asyncio.run(run_async(_python(f"raise SystemExit({FAIL_EXIT_CODE})"), on_error=OnError.PASS))
+
+        assert result.returncode == FAIL_EXIT_CODE
+
+    @staticmethod
+    def test_should_kill_process_on_timeout():
+        with pytest.raises(subprocess.TimeoutExpired):
+            asyncio.run(run_async(_python("import time; time.sleep(10)"), on_error=OnError.EXIT, timeout=0.2))
+
+
+class TestGatherRuns:
+    @staticmethod
+    def test_should_return_results_in_submission_order_with_limited_concurrency():
+        delays = [0.4, 0.1, 0.3, 0.2]
+        start = time.monotonic()
+
+        results = asyncio.run(
+            gather_runs(
+                *(
+                    run_async(
+                        _python(f"import time; time.sleep({delay}); print({delay})"),
+                        on_error=OnError.EXIT,
+                        stdout=subprocess.PIPE,
+                    )
+                    for delay in delays
+                ),
+                limit=2,
+            )
+        )
+
+        assert [float(result.stdout) for result in results] == delays
+        assert time.monotonic() - start >= sum(delays) / 2  # would be max(delays) without the limit
+
+    @staticmethod
+    def test_should_raise_first_failure_after_all_runs_finish(tmp_path):
+        marker = tmp_path / "marker"
+
+        with pytest.raises(click.exceptions.Exit) as exc_info:
+            asyncio.run(
+                gather_runs(
+                    run_async(_python(f"raise SystemExit({FAIL_EXIT_CODE})"), on_error=OnError.EXIT),
+                    run_async(_python("raise SystemExit(1)"), on_error=OnError.EXIT),
+                    run_async(
+                        _python(f"import time, pathlib; time.sleep(0.2); pathlib.Path({str(marker)!r}).touch()"),
+                        on_error=OnError.EXIT,
+                    ),
+                )
+            )
+
+        assert exc_info.value.exit_code == FAIL_EXIT_CODE
+        assert marker.exists()
+
+
+class TestSplitIntoChunks:
+    @staticmethod
+    def test_should_balance_chunks_by_weight_and_keep_order():
+        weights = {"a": 10, "b": 1, "c": 1, "d": 8}
+
+        assert split_into_chunks(list(weights), 2, weight=weights.__getitem__) == [["a"], ["b", "c", "d"]]
+
+    @staticmethod
+    def test_should_split_into_more_chunks_to_fit_length_limit():
+        files = ["a.py", "b.py", "c.py", "d.py"]
+
+        chunks = split_into_chunks(files, 1, max_length=len("a.py b.py "), weight=lambda _: 1)
+
+        assert sorted(file for chunk in chunks for file in chunk) == files
+        assert [len(chunk) for chunk in chunks] == [2, 2]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "files, expected", [pytest.param([], [], id="no files"), pytest.param(["a"], [["a"]], id="one file")]
+    )
+    def test_should_not_create_empty_chunks(files, expected):
+        assert split_into_chunks(files, 4) == expected
+
+
+class TestRunChunked:
+    PRINT_ARGS = "import sys; print(' '.join(sys.argv[1:])); sys.exit(int('fail' in sys.argv))"
+
+    def test_should_merge_output_of_chunks_in_order(self):
+        files = [f"file_{index}" for index in range(6)]
+
+        result = run_chunked(_python(self.PRINT_ARGS), files, on_error=OnError.EXIT, jobs=3, stdout=subprocess.PIPE)
+
+        assert result.returncode == 0
+        assert result.stdout.decode().split() == files
+        assert result.stdout.decode().splitlines() == ["file_0 file_1", "file_2 file_3", "file_4 file_5"]
+
+    def test_should_show_output_when_not_captured(self, capfd):
+        run_chunked(_python(self.PRINT_ARGS), ["a", "b"], on_error=OnError.EXIT, jobs=2)
+
+        assert capfd.readouterr().out == "a\nb\n"
+
+    def test_should_fail_with_first_failed_chunk(self):
+        with pytest.raises(click.exceptions.Exit) as exc_info:
+            run_chunked(_python(self.PRINT_ARGS), ["ok", "fail"], on_error=OnError.EXIT, jobs=2)
+
+        assert exc_info.value.exit_code == 1
+
+    COUNT_ARGS = "import sys; print(len(sys.argv) - 1)"
+
+    def test_should_fit_many_files_into_the_system_limit(self):
+        files = [f"file_{index:05}" for index in range(MANY_FILES)]
+
+        result = run_chunked(_python(self.COUNT_ARGS), files, on_error=OnError.EXIT, jobs=1, stdout=subprocess.PIPE)
+
+        assert sum(map(int, result.stdout.split())) == MANY_FILES
+
+    def test_should_split_chunks_rejected_by_the_system(self, monkeypatch):
+        monkeypatch.setattr(execution, "_command_line_budget", lambda _: sys.maxsize)
+        files = [f"file_{index:05}" for index in range(MANY_FILES)]
+
+        result = run_chunked(_python(self.COUNT_ARGS), files, on_error=OnError.EXIT, jobs=1, stdout=subprocess.PIPE)
+
+        assert len(result.stdout.split()) > 1
+        assert sum(map(int, result.stdout.split())) == MANY_FILES
+
+    def test_should_run_once_without_files(self):
+        result = run_chunked(_python(self.PRINT_ARGS), [], on_error=OnError.EXIT, stdout=subprocess.PIPE)
+
+        assert result.stdout == b"\n"
+
+
+class TestBoundedPipe:
+    @staticmethod
+    def test_should_return_short_output_unchanged_in_text_mode():
+        result = run(
+            _python("import sys; print('out'); print('err', file=sys.stderr)"),
+            on_error=OnError.EXIT,
+            stdout=BOUNDED_PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+
+        assert (result.stdout, result.stderr) == ("out\n", "err\n")
+
+    @staticmethod
+    def test_should_keep_memory_flat_and_point_to_full_log_on_error(capsys):
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        code = f"import sys; sys.stdout.write('head' + 'x' * {LARGE_OUTPUT_SIZE} + 'tail'); sys.exit({FAIL_EXIT_CODE})"
+
+        with pytest.raises(click.exceptions.Exit) as exc_info:
+            run(_python(code), on_error=OnError.EXIT, stdout=BOUNDED_PIPE, stderr=subprocess.STDOUT)
+
+        rss_growth_bytes = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) * 1024
+        shown = capsys.readouterr().out
+        log_file = Path(re.search(r"full output in '([^']+)'", shown).group(1))  # type: ignore[union-attr]
+        try:
+            assert exc_info.value.exit_code == FAIL_EXIT_CODE
+            assert rss_growth_bytes < LARGE_OUTPUT_SIZE / 2
+            assert len(shown) < LARGE_OUTPUT_SIZE / 100
+            assert shown.lstrip().startswith("Error") and "head" in shown and "tail" in shown
+            assert log_file.stat().st_size == LARGE_OUTPUT_SIZE + len("headtail")
+        finally:
+            log_file.unlink()
+
+    @staticmethod
+    @pytest.mark.parametrize("exit_code", [0, FAIL_EXIT_CODE])
+    def test_should_remove_log_file_and_not_point_to_it_when_output_is_returned(exit_code, tmp_path, monkeypatch):
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+        code = f"import sys; sys.stdout.write('x' * {LARGE_OUTPUT_SIZE}); sys.exit({exit_code})"
+
+        result = run(_python(code), on_error=OnError.PASS, stdout=BOUNDED_PIPE, text=True)
+
+        assert result.returncode == exit_code
+        assert "bytes omitted ...]" in result.stdout
+        assert "full output in" not in result.stdout
+        assert not list(tmp_path.iterdir())
+
+
+class TestResourceUsage:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            pytest.param({}, id="no pipes"),
+            pytest.param({"stdout": subprocess.PIPE, "text": True}, id="pipes"),
+            pytest.param({"timeout": MAX_DURATION}, id="timeout"),
+        ],
+    )
+    def test_should_return_resources_used_by_process(kwargs):
+        code = f"data = bytearray({ALLOCATED_MEMORY}); print(sum(range(10 ** 6)))"
+
+        result = run(_python(code), on_error=OnError.EXIT, **kwargs)
+
+        assert result.returncode == 0
+        assert result.resources is not None
+        assert result.resources.max_rss >= ALLOCATED_MEMORY
+        assert result.resources.user_time + result.resources.system_time > 0
+        if "stdout" in kwargs:
+            assert result.stdout == f"{sum(range(10**6))}\n"
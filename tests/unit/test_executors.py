@@ -0,0 +1,152 @@
+import subprocess
+import sys
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from delfino import executors
+from delfino.execution import BOUNDED_PIPE, OnError, run, run_chunked
+from delfino.executors import Job, RemoteExecutor, create
+from delfino.worker import Worker, WorkerError
+
+TOKEN = "secret"
+FAIL_EXIT_CODE = 3
+TIMEOUT = 0.5
+_PROGRAM = [
+    sys.executable,
+    "-c",
+    "import os, sys; print(os.getcwd(), os.environ['GREETING']); print('err', file=sys.stderr); sys.exit(3)",
+]
+
+
+def _collect(executor: executors.Executor, job: Job) -> tuple[int, dict[str, bytes]]:
+    output = {"stdout": b"", "stderr": b""}
+
+    def _on_output(name: str, chunk: bytes) -> None:
+        output[name] += chunk
+
+    return executor.submit(job, _on_output).result().returncode, output
+
+
+@pytest.fixture()
+def worker_root(tmp_path):
+    (tmp_path / "worker" / "sub").mkdir(parents=True)
+    (tmp_path / "client" / "sub").mkdir(parents=True)
+    return tmp_path / "worker"
+
+
+@pytest.fixture()
+def worker_address(worker_root, tmp_path, monkeypatch) -> Iterator[str]:
+    monkeypatch.chdir(tmp_path / "client")
+    worker = Worker("tcp://127.0.0.1:0", worker_root, jobs=2, token=TOKEN)
+    thread = threading.Thread(target=worker.serve, daemon=True)
+    thread.start()
+    yield worker.address
+    worker.shutdown()
+    thread.join()
+
+
+@pytest.fixture()
+def remote(worker_address, monkeypatch) -> Iterator[None]:
+    monkeypatch.setenv("DELFINO_WORKER_TOKEN", TOKEN)
+    executors.use(f"remote:{worker_address}")
+    yield
+    executors.shutdown()
+
+
+class TestExecutors:
+    @staticmethod
+    @pytest.mark.parametrize("spec", ["local", "threads:2", "processes:2"])
+    def test_should_run_job_and_pass_its_output(spec, tmp_path):
+        executor = create(spec)
+        try:
+            returncode, output = _collect(executor, Job(_PROGRAM, cwd=str(tmp_path), env_update={"GREETING": "hi"}))
+        finally:
+            executor.shutdown()
+
+        assert returncode == FAIL_EXIT_CODE
+        assert output == {"stdout": f"{tmp_path} hi\n".encode(), "stderr": b"err\n"}
+
+    @staticmethod
+    @pytest.mark.parametrize("spec", ["remote", "threads:0", "processes:x", "elsewhere", "remote:localhost:80"])
+    def test_should_reject_invalid_spec(spec):
+        with pytest.raises(ValueError, match="Invalid"):
+            create(spec)
+
+
+class TestRemoteExecutor:
+    @staticmethod
+    def test_should_run_job_in_checkout_of_worker(worker_address, worker_root):
+        executor = RemoteExecutor([worker_address], token=TOKEN)
+        try:
+            returncode, output = _collect(executor, Job(_PROGRAM, cwd="sub", env_update={"GREETING": "hi"}))
+        finally:
+            executor.shutdown()
+
+        assert returncode == FAIL_EXIT_CODE
+        assert output == {"stdout": f"{worker_root / 'sub'} hi\n".encode(), "stderr": b"err\n"}
+
+    @staticmethod
+    def test_should_skip_unreachable_workers(worker_address, tmp_path):
+        executor = RemoteExecutor([f"unix://{tmp_path / 'missing.sock'}", worker_address], token=TOKEN)
+        try:
+            returncode, _ = _collect(executor, Job(_PROGRAM, merge_stderr=True, env_update={"GREETING": "hi"}))
+        finally:
+            executor.shutdown()
+
+        assert returncode == FAIL_EXIT_CODE
+
+    @staticmethod
+    def test_should_refuse_job_with_invalid_token(worker_address):
+        executor = RemoteExecutor([worker_address], token="guess")
+        try:
+            with pytest.raises(WorkerError, match="Invalid token"):
+                _collect(executor, Job(_PROGRAM))
+        finally:
+            executor.shutdown()
+
+    @staticmethod
+    def test_should_refuse_to_listen_on_tcp_without_token():
+        with pytest.raises(ValueError, match="DELFINO_WORKER_TOKEN"):
+            Worker("tcp://127.0.0.1:0", Path(), jobs=1, token="")
+
+
+@pytest.mark.usefixtures("remote")
+class TestRunRemotely:
+    @staticmethod
+    def test_should_capture_output_like_popen(worker_root):
+        result = run(
+            _PROGRAM,
+            cwd="sub",
+            env_update={"GREETING": "hi"},
+            stdout=BOUNDED_PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            on_error=OnError.PASS,
+        )
+
+        assert result.returncode == FAIL_EXIT_CODE
+        assert result.stdout.splitlines() == [f"{worker_root / 'sub'} hi", "err"]
+        assert result.resources is not None
+
+    @staticmethod
+    def test_should_kill_program_on_timeout():
+        with pytest.raises(subprocess.TimeoutExpired):
+            run(
+                [sys.executable, "-c", f"import time; time.sleep({TIMEOUT * 10})"],
+                timeout=TIMEOUT,
+                on_error=OnError.PASS,
+            )
+
+    @staticmethod
+    def test_should_run_chunks_on_workers(capfd, worker_root):
+        run_chunked(
+            [sys.executable, "-c", "import os, sys; print(os.getcwd(), *sys.argv[1:])"],
+            ["a.py", "b.py"],
+            jobs=2,
+            on_error=OnError.EXIT,
+        )
+
+        assert capfd.readouterr().out.splitlines() == [f"{worker_root} a.py", f"{worker_root} b.py"]
@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from delfino.history import History, Invocation, format_stats
+
+WRITERS = 4
+WRITES_PER_WRITER = 25
+MAX_ENTRIES = 3
+MAX_AGE_DAYS = 1
+
+
+def _invocation(command: str = "lint", duration: float = 1.0, exit_code: int = 0, **kwargs) -> Invocation:
+    return Invocation(command, "plugin", None, kwargs.pop("started", time.time()), duration, exit_code, **kwargs)
+
+
+def _write(path, writer: int) -> None:
+    history = History(path)
+    for _ in range(WRITES_PER_WRITER):
+        history.add(_invocation(f"writer-{writer}"))
+
+
+@pytest.fixture()
+def history(tmp_path):
+    return History(tmp_path / "history.db")
+
+
+class TestHistory:
+    @staticmethod
+    def test_should_return_stored_invocations_filtered_by_command_and_start(history):
+        old = _invocation("lint", started=time.time() - 60, cache="hit", revision="abc")
+        new = _invocation("test", exit_code=1)
+        history.add(old)
+        history.add(new)
+
+        assert history.invocations() == [old, new]
+        assert history.invocations(["lint"]) == [old]
+        assert history.invocations(since=time.time() - 30) == [new]
+
+    @staticmethod
+    def test_should_not_create_database_when_reading(history):
+        assert history.invocations() == []
+        assert not history.path.exists()
+
+    @staticmethod
+    def test_should_prune_oldest_invocations_over_max_entries(history):
+        invocations = [_invocation(duration=index) for index in range(MAX_ENTRIES + 2)]
+        for invocation in invocations:
+            history.add(invocation, max_entries=MAX_ENTRIES)
+
+        assert history.invocations() == invocations[-MAX_ENTRIES:]
+
+    @staticmethod
+    def test_should_prune_invocations_older_than_max_age(history):
+        expired = _invocation(started=time.time() - (MAX_AGE_DAYS + 1) * 24 * 60 * 60)
+        recent = _invocation()
+        history.add(expired)
+        history.add(recent, max_age_days=MAX_AGE_DAYS)
+
+        assert history.invocations() == [recent]
+
+    @staticmethod
+    def test_should_return_median_duration_of_most_recent_invocations(history):
+        for duration in [100.0] * 10 + [1.0, 2.0, 3.0] * 3 + [4.0]:
+            history.add(_invocation("lint", duration))
+        history.add(_invocation("test", 7.0))
+
+        assert history.typical_durations(["lint", "format"]) == {"lint": 2.0}
+
+    @staticmethod
+    def test_should_keep_all_writes_of_concurrent_processes(history):
+        with ProcessPoolExecutor(WRITERS) as executor:
+            list(executor.map(_write, [history.path] * WRITERS, range(WRITERS)))
+
+        assert len(history.invocations()) == WRITERS * WRITES_PER_WRITER
+
+
+class TestFormatStats:
+    @staticmethod
+    def test_should_show_percentiles_failure_and_cache_hit_rates_per_command():
+        invocations = [
+            *(_invocation("lint", duration=index + 1.0) for index in range(20)),
+            _invocation("test", duration=5.0, exit_code=1, cache="miss"),
+            _invocation("test", duration=1.0, cache="hit"),
+        ]
+
+        header, _, lint, test = format_stats(invocations).splitlines()
+
+        assert header.split() == ["Command", "Runs", "p50", "p95", "Failures", "Cache", "hits", "Trend"]
+        assert lint.split() == ["lint", "20", "10.00", "s", "19.00", "s", "0%", "+200%"]
+        assert test.split() == ["test", "2", "1.00", "s", "5.00", "s", "50%", "50%"]
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from delfino.click_utils.output_multiplexer import OutputMultiplexer
+
+
+def _write(multiplexer: OutputMultiplexer, index: int, text: str, stream: str = "stdout") -> None:
+    # Workers write through the shared file descriptor, not the file object
+    os.write(multiplexer.outputs[index].fileno(stream), text.encode())
+
+
+@pytest.fixture()
+def multiplexer():
+    multiplexer = OutputMultiplexer(["first", "second"], live_status=False)
+    yield multiplexer
+    multiplexer.close()
+
+
+class TestOutputMultiplexer:
+    @staticmethod
+    def test_should_stream_only_front_command(multiplexer, capfd):
+        _write(multiplexer, 0, "first 1\n")
+        _write(multiplexer, 1, "second 1\n")
+        multiplexer.pump()
+        _write(multiplexer, 0, "first 2\n")
+        multiplexer.pump()
+
+        assert capfd.readouterr().out == "first 1\nfirst 2\n"
+
+    @staticmethod
+    def test_should_replay_next_command_after_front_one_finishes(multiplexer, capfd):
+        _write(multiplexer, 1, "second 1\n")
+        multiplexer.finished(1)
+        _write(multiplexer, 0, "first 1\n")
+        multiplexer.pump()
+        multiplexer.finished(0)
+        multiplexer.pump()
+
+        assert capfd.readouterr().out == "first 1\nsecond 1\n"
+
+    @staticmethod
+    def test_should_replay_standard_error_to_standard_error(multiplexer, capfd):
+        _write(multiplexer, 0, "first out\n")
+        _write(multiplexer, 0, "first err\n", stream="stderr")
+        multiplexer.finished(0)
+        _write(multiplexer, 1, "second err\n", stream="stderr")
+        multiplexer.pump()
+
+        assert capfd.readouterr() == ("first out\n", "first err\nsecond err\n")
+
+    @staticmethod
+    def test_should_show_status_of_other_running_commands(capfd):
+        multiplexer = OutputMultiplexer(["first", "second", "third"], live_status=True)
+        for index in range(3):
+            multiplexer.started(index)
+        multiplexer.finished(2)
+        multiplexer.pump()
+
+        assert capfd.readouterr().err.endswith("[1/3 done] Also running: second")
+
+        multiplexer.close()
+        assert capfd.readouterr().err == "\r\033[K"
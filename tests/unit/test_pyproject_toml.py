@@ -0,0 +1,56 @@
+import pytest
+
+from delfino.config import ConfigValidationError
+from delfino.models.pyproject_toml import Poetry, Project, PyprojectToml
+
+
+class TestPyprojectTomlLazySubTrees:
+    @staticmethod
+    def test_should_validate_only_delfino_config_on_creation():
+        pyproject_toml = PyprojectToml(
+            **{
+                "project": {"name": ["not", "a", "string"]},
+                "build-system": {"requires": "not a list"},
+                "tool": {"poetry": {"dependencies": {}}, "delfino": {"command_groups": {"lint": ["ruff"]}}},
+            }
+        )
+
+        assert pyproject_toml.tool.delfino.command_groups == {"lint": ["ruff"]}
+
+        with pytest.raises(ConfigValidationError, match="section 'project'"):
+            _ = pyproject_toml.project
+        with pytest.raises(ConfigValidationError, match="section 'build-system'"):
+            _ = pyproject_toml.build_system
+        with pytest.raises(ConfigValidationError, match="section 'tool.poetry'"):
+            _ = pyproject_toml.tool.poetry
+
+    @staticmethod
+    def test_should_validate_sub_trees_on_first_access():
+        pyproject_toml = PyprojectToml(
+            **{
+                "project": {"name": "delfino", "dependencies": ["click"]},
+                "build-system": {"requires": ["uv_build"], "build-backend": "uv_build"},
+                "tool": {"uv": {"dev_dependencies": ["pytest"]}},
+            }
+        )
+
+        assert pyproject_toml.project_name == "delfino"
+        assert pyproject_toml.project_dependencies == ["click"]
+        assert pyproject_toml.project is pyproject_toml.project
+        assert pyproject_toml.build_system and pyproject_toml.build_system.build_backend == "uv_build"
+        assert pyproject_toml.tool.uv and pyproject_toml.tool.uv.dev_dependencies == ["pytest"]
+        assert pyproject_toml.tool.poetry is None
+
+    @staticmethod
+    def test_should_accept_models_in_constructor_and_assignment():
+        pyproject_toml = PyprojectToml(project=Project(name="first"))
+        assert pyproject_toml.project_name == "first"
+
+        pyproject_toml.project = None
+        pyproject_toml.tool.poetry = Poetry(name="second", version="1.0.0")
+
+        assert pyproject_toml.project_name == "second"
+        assert pyproject_toml.model_dump(exclude_defaults=True)["tool"]["poetry"] == {
+            "name": "second",
+            "version": "1.0.0",
+        }
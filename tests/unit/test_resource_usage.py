@@ -0,0 +1,37 @@
+from delfino.resource_usage import ResourceUsage, format_table
+
+SMALL = ResourceUsage(
+    user_time=1.0,
+    system_time=0.5,
+    max_rss=100 * 1024 * 1024,
+    block_input=1,
+    block_output=2,
+    voluntary_context_switches=3,
+    involuntary_context_switches=4,
+)
+LARGE = ResourceUsage(user_time=2.0, max_rss=300 * 1024 * 1024, voluntary_context_switches=10)
+
+
+class TestResourceUsage:
+    @staticmethod
+    def test_should_add_up_usage_with_maximum_of_memory():
+        assert SMALL + LARGE == ResourceUsage(
+            user_time=3.0,
+            system_time=0.5,
+            max_rss=300 * 1024 * 1024,
+            block_input=1,
+            block_output=2,
+            voluntary_context_switches=13,
+            involuntary_context_switches=4,
+        )
+
+
+class TestFormatTable:
+    @staticmethod
+    def test_should_format_aligned_rows_with_total():
+        lines = format_table([("lint", 1, SMALL), ("test", 2, LARGE)]).splitlines()
+
+        assert lines[0].split()[:3] == ["Command", "Programs", "User"]
+        assert lines[2].split()[:5] == ["lint", "1", "1.00", "s", "0.50"]
+        assert lines[-1].split()[:7] == ["Total", "3", "3.00", "s", "0.50", "s", "300.0"]
+        assert len({len(line) for line in lines}) == 1
@@ -0,0 +1,126 @@
+import json
+import subprocess
+
+import click
+import pytest
+
+from delfino.sharding import (
+    Shard,
+    ShardParamType,
+    commands_of_shard,
+    durations_of_report,
+    files_of_shard,
+    split_by_weight,
+)
+
+TOTAL = 3
+COMMANDS = ["lint", "mypy", "test", "format", "docs"]
+
+
+class TestSplitByWeight:
+    @staticmethod
+    def test_should_balance_parts_and_keep_order_of_items():
+        parts = split_by_weight(["a", "b", "c", "d", "e"], [1, 5, 2, 3, 3], 2)
+
+        assert parts == [["b", "c"], ["a", "d", "e"]]
+
+    @staticmethod
+    def test_should_break_ties_by_items():
+        assert split_by_weight(["b", "a", "c"], [1, 1, 1], TOTAL) == [["a"], ["b"], ["c"]]
+
+
+class TestCommandsOfShard:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "durations",
+        [
+            pytest.param({"test": 60.0, "lint": 5.0, "mypy": 20.0}, id="partial history"),
+            pytest.param({}, id="no history"),
+        ],
+    )
+    def test_should_run_each_command_in_exactly_one_shard(durations):
+        shards = [commands_of_shard(COMMANDS, durations, Shard(index, TOTAL)) for index in range(1, TOTAL + 1)]
+
+        assert sorted(name for shard in shards for name in shard) == sorted(COMMANDS)
+        assert all(shards)
+
+    @staticmethod
+    def test_should_run_the_longest_command_alone():
+        durations = {"test": 60.0, "lint": 5.0, "mypy": 20.0, "format": 1.0, "docs": 10.0}
+
+        assert commands_of_shard(COMMANDS, durations, Shard(1, TOTAL)) == ["test"]
+
+
+class TestFilesOfShard:
+    @staticmethod
+    def test_should_split_files_in_folders_by_size(tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "big.py").write_text("x" * 100)
+        for name in ("a.py", "b.py"):
+            (tmp_path / "src" / name).write_text("x" * 40)
+        (tmp_path / "setup.py").write_text("x")
+
+        assert files_of_shard(["src", "setup.py"], Shard(1, 2)) == ("src/big.py",)
+        assert files_of_shard(["src", "setup.py"], Shard(2, 2)) == ("setup.py", "src/a.py", "src/b.py")
+
+    @staticmethod
+    def test_should_split_only_files_with_suffixes(tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "src").mkdir()
+        for name in ("a.py", "b.py", "notes.txt"):
+            (tmp_path / "src" / name).write_text("x")
+
+        assert files_of_shard([], Shard(1, 2), [".py"]) == ("src/a.py",)
+        assert files_of_shard(["src"], Shard(2, 2), [".py"]) == ("src/b.py",)
+
+    @staticmethod
+    def test_should_not_split_files_ignored_by_git(tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        subprocess.run(["git", "init", "-q"], check=True)
+        (tmp_path / ".gitignore").write_text("venv/\n")
+        for path in ("src/a.py", "venv/lib/module.py"):
+            (tmp_path / path).parent.mkdir(parents=True)
+            (tmp_path / path).write_text("x")
+
+        assert files_of_shard([], Shard(1, 1), [".py"]) == ("src/a.py",)
+
+
+class TestDurationsOfReport:
+    @staticmethod
+    def test_should_use_median_durations_of_executed_commands(tmp_path):
+        report = tmp_path / "report.json"
+        report.write_text(
+            json.dumps(
+                {
+                    "commands": [
+                        {"name": "lint", "status": "passed", "duration": 1.0},
+                        {"name": "lint", "status": "failed", "duration": 3.0},
+                        {"name": "lint", "status": "passed", "duration": 8.0},
+                        {"name": "docs", "status": "skipped", "duration": 0.0},
+                    ]
+                }
+            )
+        )
+
+        assert durations_of_report(report) == {"lint": 3.0}
+
+    @staticmethod
+    def test_should_reject_file_which_is_not_a_report(tmp_path):
+        report = tmp_path / "report.json"
+        report.write_text("not json")
+
+        with pytest.raises(ValueError, match="is not a run report"):
+            durations_of_report(report)
+
+
+class TestShardParamType:
+    @staticmethod
+    def test_should_parse_shard():
+        assert ShardParamType().convert("2/3", None, None) == Shard(2, TOTAL)
+
+    @staticmethod
+    @pytest.mark.parametrize("value", ["3", "a/3", "0/3", "4/3"])
+    def test_should_reject_invalid_shard(value):
+        with pytest.raises(click.BadParameter):
+            ShardParamType().convert(value, None, None)
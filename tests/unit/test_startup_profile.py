@@ -0,0 +1,70 @@
+import io
+import sys
+
+import pytest
+
+from delfino import startup_profile
+
+
+@pytest.fixture()
+def profile():
+    profile = startup_profile.start()
+    try:
+        yield profile
+    finally:
+        profile.uninstall()
+        startup_profile._PROFILE = None  # pylint: disable=protected-access
+
+
+class TestRequested:
+    @staticmethod
+    @pytest.mark.parametrize(
+        "args, env_value, expected",
+        [
+            pytest.param(["--profile-startup", "build"], None, True, id="option"),
+            pytest.param(["build", "--", "--profile-startup"], None, False, id="option passed to command"),
+            pytest.param(["build"], "1", True, id="env var"),
+            pytest.param(["build"], "0", False, id="env var disabled"),
+            pytest.param(["build"], None, False, id="not requested"),
+        ],
+    )
+    def test_should_detect_request_before_parsing_args(monkeypatch, args, env_value, expected):
+        if env_value is None:
+            monkeypatch.delenv(startup_profile.ENV_VAR, raising=False)
+        else:
+            monkeypatch.setenv(startup_profile.ENV_VAR, env_value)
+
+        assert startup_profile.requested(args) is expected
+
+
+class TestStartupProfile:
+    @staticmethod
+    def test_should_not_record_anything_when_not_started():
+        with startup_profile.measure("init", "config"):
+            pass
+
+        assert startup_profile._PROFILE is None  # pylint: disable=protected-access
+
+    @staticmethod
+    def test_should_record_measured_blocks_and_new_imports(profile, monkeypatch):
+        monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+        with startup_profile.measure("plugin", "delfino-core"):
+            import colorsys  # noqa: F401, PLC0415
+
+        assert profile.timings["plugin"]["delfino-core"] > 0
+        assert "colorsys" in profile.timings["import"]
+
+    @staticmethod
+    def test_should_report_sections_sorted_by_duration(profile):
+        profile.record("command", "commands.fast", 0.001)
+        profile.record("command", "commands.slow", 0.002)
+        startup_profile.mark_ready()
+        output = io.StringIO()
+
+        profile.report(output)
+
+        report = output.getvalue()
+        assert report.startswith("Startup profile, ")
+        assert "Command modules:" in report
+        assert report.index("commands.slow") < report.index("commands.fast")
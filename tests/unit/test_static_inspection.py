@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import pytest
+
+from delfino.click_utils.static_inspection import StaticCommand, StaticInspectionError, inspect_module
+
+
+@pytest.fixture()
+def module_file(tmp_path) -> Path:
+    return tmp_path / "module.py"
+
+
+class TestInspectModule:
+    @staticmethod
+    def test_should_find_commands_defined_by_decorators(module_file):
+        module_file.write_text(
+            "import click\n"
+            "from click import command\n"
+            "@click.command()\n"
+            "def lint_cmd():\n"
+            '    """Run linters."""\n'
+            "@command('type-check', help='Run type checks.', hidden=True)\n"
+            "@click.option('--fix', is_flag=True)\n"
+            "def typecheck(fix):\n"
+            "    pass\n"
+            "def helper():\n"
+            "    pass\n"
+        )
+
+        assert inspect_module(module_file) == [
+            StaticCommand(func_name="lint_cmd", name="lint", help="Run linters."),
+            StaticCommand(func_name="typecheck", name="type-check", help="Run type checks.", hidden=True),
+        ]
+
+    @staticmethod
+    def test_should_find_sub_commands_of_groups(module_file):
+        module_file.write_text(
+            "import click\n"
+            "@click.group()\ndef outer():\n    pass\n"
+            "@outer.group()\ndef inner():\n    pass\n"
+            "@inner.command()\ndef sub_command():\n    pass\n"
+            "@click.command()\ndef standalone():\n    pass\n"
+            "outer.add_command(standalone)\n"
+        )
+
+        assert {command.func_name: command.sub_commands for command in inspect_module(module_file)} == {
+            "outer": ("inner", "standalone"),
+            "inner": ("sub_command",),
+            "sub_command": (),
+            "standalone": (),
+        }
+
+    @staticmethod
+    def test_should_ignore_private_commands(module_file):
+        module_file.write_text(
+            "import click\nfrom ._private import demo as _demo\n@click.command()\ndef _hidden():\n    pass\n"
+        )
+
+        assert not inspect_module(module_file)
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param("import click\nlint = click.Command('lint')\n", id="command created by assignment"),
+            pytest.param("from . import lint\n", id="import from the package"),
+            pytest.param("from ._private import lint\n", id="import from a private module"),
+            pytest.param("from .nested.module import lint\n", id="import from a nested module"),
+            pytest.param("from .module import *\n", id="star import"),
+            pytest.param("import click\n@click.command(NAME)\ndef lint():\n    pass\n", id="non-literal name"),
+            pytest.param("import click\n@click.command(cls=Custom)\ndef lint():\n    pass\n", id="custom class"),
+            pytest.param("from groups import outer\n@outer.command()\ndef lint():\n    pass\n", id="imported group"),
+            pytest.param("def broken(:\n", id="syntax error"),
+            pytest.param("from helpers.cmds import shared\n", id="absolute import from another package"),
+            pytest.param(
+                "import click\nif True:\n    @click.command()\n    def lint():\n        pass\n", id="if block"
+            ),
+            pytest.param("try:\n    from helpers import lint\nexcept ImportError:\n    pass\n", id="try block"),
+            pytest.param("with open('x'):\n    pass\n", id="with block"),
+            pytest.param(
+                "import click\ndef _impl():\n    pass\nlint = click.command(name='lint')(_impl)\n",
+                id="command created by a decorator call",
+            ),
+            pytest.param("import other_pkg\n", id="import of another package"),
+            pytest.param(
+                "from .helpers import make_command as _make\ntypecheck = _make()\n", id="assignment of a call"
+            ),
+            pytest.param("from .helpers import COMMANDS\nlint = COMMANDS.lint\n", id="assignment of an attribute"),
+            pytest.param("import click\n@click.command()\ndef lint():\n    pass\nalias = lint\n", id="command alias"),
+        ],
+    )
+    def test_should_require_import_of_modules_with(module_file, content):
+        module_file.write_text(content)
+
+        with pytest.raises(StaticInspectionError):
+            inspect_module(module_file)
+
+    @staticmethod
+    def test_should_allow_imports_type_checking_blocks_and_standard_library_values(module_file):
+        module_file.write_text(
+            "from __future__ import annotations\n"
+            "from pathlib import Path\n"
+            "from typing import TYPE_CHECKING\n"
+            "from click import command\n"
+            "from delfino.decorators import pass_app_context\n"
+            "import os\n"
+            "from logging import getLogger\n"
+            "if TYPE_CHECKING:\n"
+            "    from helpers import Config\n"
+            "_LOG = getLogger(__name__)\n"
+            "TIMEOUT = int(os.environ.get('TIMEOUT', '10')) * 2\n"
+            "ROOT = Path(__file__).parent / 'data'\n"
+            "SUFFIXES = ('.py', '.pyi')\n"
+            "@command()\n"
+            "def lint():\n"
+            "    pass\n"
+        )
+
+        assert [command.name for command in inspect_module(module_file)] == ["lint"]
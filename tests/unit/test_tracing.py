@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import sys
+
+import click
+import pytest
+
+from delfino import tracing
+from delfino.execution import OnError, gather_runs, run, run_async
+
+FAIL_EXIT_CODE = 3
+
+
+@pytest.fixture()
+def trace_file(tmp_path):
+    path = tmp_path / "trace.json"
+    tracing.start(path)
+    try:
+        yield path
+    finally:
+        tracing.stop()
+
+
+def _events(trace_file) -> list[dict]:
+    tracing.stop()
+    return json.loads(trace_file.read_text())
+
+
+def _spans(trace_file) -> list[dict]:
+    return [event for event in _events(trace_file) if event["ph"] != "M"]
+
+
+class TestSpan:
+    @staticmethod
+    def test_should_not_record_anything_when_disabled():
+        with tracing.span("init", "config", detail=1) as args:
+            args["exit_code"] = 0
+
+        assert not tracing.enabled()
+        assert args == {"detail": 1, "exit_code": 0}
+
+    @staticmethod
+    def test_should_record_nested_spans_with_args(trace_file):
+        with tracing.span("command", "outer"), tracing.span("init", "inner", detail=1) as args:
+            args["exit_code"] = 0
+
+        inner, outer = _spans(trace_file)
+
+        assert (outer["name"], outer["ph"], inner["name"], inner["args"]) == (
+            "outer",
+            "X",
+            "inner",
+            {"detail": 1, "exit_code": 0},
+        )
+        assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+        assert outer["pid"] == inner["pid"] == os.getpid()
+
+    @staticmethod
+    def test_should_record_exit_code_of_exception(trace_file):
+        with pytest.raises(click.exceptions.Exit), tracing.span("command", "failing"):
+            raise click.exceptions.Exit(FAIL_EXIT_CODE)
+
+        assert _spans(trace_file)[0]["args"] == {"error": "Exit", "exit_code": FAIL_EXIT_CODE}
+
+    @staticmethod
+    def test_should_record_spans_of_forked_processes_as_separate_process(trace_file):
+        if (pid := os.fork()) == 0:
+            with tracing.span("group", "worker"):
+                pass
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        events = _events(trace_file)
+
+        assert {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "delfino worker"}} in events
+        assert [event["pid"] for event in events if event["ph"] == "X"] == [pid]
+
+
+class TestTracedExecution:
+    @staticmethod
+    def test_should_record_subprocess_with_command_and_exit_code(trace_file):
+        run([sys.executable, "-c", f"exit({FAIL_EXIT_CODE})"], on_error=OnError.PASS)
+
+        (span,) = _spans(trace_file)
+
+        assert span["cat"] == "subprocess"
+        assert span["name"] == os.path.basename(sys.executable)
+        assert span["args"]["exit_code"] == FAIL_EXIT_CODE
+        assert span["args"]["command"].endswith(f"'exit({FAIL_EXIT_CODE})'")
+
+    @staticmethod
+    def test_should_record_concurrent_runs_as_async_spans(trace_file):
+        asyncio.run(gather_runs(*(run_async([sys.executable, "-c", "pass"], on_error=OnError.PASS) for _ in range(2))))
+
+        spans = _spans(trace_file)
+
+        assert sorted(span["ph"] for span in spans) == ["b", "b", "e", "e"]
+        assert len({span["id"] for span in spans}) == len(spans) // 2